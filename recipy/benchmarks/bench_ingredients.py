@@ -0,0 +1,70 @@
+"""
+Compare parsing ingredient lines one at a time against parsing them in
+batches with IngredientParser.parse_ingredients.
+
+usage: bench_ingredients.py [-h] [--lines LINES] [--model MODEL]
+                            [--batch-sizes N [N ...]] [--repeat REPEAT]
+"""
+import argparse
+import os
+import time
+
+import pint
+import spacy
+
+from recipy.ingredient_parser import IngredientParser
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    '--lines', default=os.path.join(DATA_DIR, 'ingredient_lines.txt'),
+    help='file with one ingredient line per line')
+parser.add_argument('--model', default='en_core_web_md')
+parser.add_argument('--batch-sizes', nargs='+', type=int,
+                    default=[1, 8, 32, 128])
+parser.add_argument('--repeat', type=int, default=5)
+args = parser.parse_args()
+
+with open(args.lines, encoding='utf-8') as file:
+    lines = [line.strip() for line in file if line.strip()]
+
+print('Loading spacy package...')
+ingredient_parser = IngredientParser(
+    pint.UnitRegistry(), spacy.load(args.model))
+print('done.')
+
+
+def best_time(func):
+    """Return the fastest of args.repeat runs of func, in seconds."""
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def per_line():
+    return [ingredient_parser.parse_ingredient(line, i)
+            for i, line in enumerate(lines)]
+
+
+def batched(batch_size):
+    return ingredient_parser.parse_ingredients(lines, batch_size=batch_size)
+
+
+# both approaches should produce the same ingredients
+assert ([repr(i) for i in per_line()] ==
+        [repr(i) for i in batched(max(args.batch_sizes))])
+
+baseline = best_time(per_line)
+print(f'{len(lines)} ingredient lines, best of {args.repeat} runs')
+print(f'{"mode":<16}{"seconds":>10}{"lines/s":>12}{"speedup":>10}')
+print(f'{"per line":<16}{baseline:>10.4f}{len(lines) / baseline:>12.0f}'
+      f'{1:>10.2f}')
+for batch_size in args.batch_sizes:
+    seconds = best_time(lambda: batched(batch_size))
+    print(f'{"batch " + str(batch_size):<16}{seconds:>10.4f}'
+          f'{len(lines) / seconds:>12.0f}{baseline / seconds:>10.2f}')
@@ -0,0 +1,71 @@
+"""
+Measure the load time and per-document latency of the spacy pipeline
+profiles in recipy.recipy, against the full pipeline.
+
+usage: bench_pipelines.py [-h] [--model MODEL] [--repeat REPEAT]
+"""
+import argparse
+import csv
+import os
+import statistics
+import time
+
+import spacy
+
+from recipy.recipy import EXCLUDED_COMPONENTS, PIPELINE_PROFILES, Pipeline
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+SAMPLE_DATASET = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'full_sample_dataset.csv')
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--model', default='en_core_web_md')
+parser.add_argument('--repeat', type=int, default=3)
+args = parser.parse_args()
+
+with open(os.path.join(DATA_DIR, 'ingredient_lines.txt'),
+          encoding='utf-8') as file:
+    ingredient_lines = [line.strip().lower() for line in file if line.strip()]
+with open(SAMPLE_DATASET, encoding='utf-8') as file:
+    instructions = [row['instructions'] for row in csv.DictReader(file)]
+
+
+def load_time(**kwargs):
+    start = time.perf_counter()
+    nlp = spacy.load(args.model, **kwargs)
+    return nlp, time.perf_counter() - start
+
+
+def latencies(nlp, texts):
+    """Return the time in ms to process each text, best of args.repeat."""
+    best = [float('inf')] * len(texts)
+    for _ in range(args.repeat):
+        for i, text in enumerate(texts):
+            start = time.perf_counter()
+            nlp(text)
+            best[i] = min(best[i], (time.perf_counter() - start) * 1000)
+    return best
+
+
+def report(name, times):
+    times = sorted(times)
+    p95 = times[int(0.95 * (len(times) - 1))]
+    print(f'{name:<28}{statistics.mean(times):>10.3f}'
+          f'{statistics.median(times):>10.3f}{p95:>10.3f}')
+
+
+# load once first so that both timings are with a warm file cache
+spacy.load(args.model)
+full_nlp, full_load = load_time()
+slim_nlp, slim_load = load_time(exclude=EXCLUDED_COMPONENTS)
+print(f'load time, all components:    {full_load:.2f} s')
+print(f'load time, excluding {EXCLUDED_COMPONENTS}: {slim_load:.2f} s')
+print()
+
+print(f'{"per document (ms)":<28}{"mean":>10}{"median":>10}{"p95":>10}')
+for profile, texts in [('ingredients', ingredient_lines),
+                       ('instructions', instructions)]:
+    report(f'{profile}: all components', latencies(full_nlp, texts))
+    report(f'{profile}: profile',
+           latencies(Pipeline(slim_nlp, PIPELINE_PROFILES[profile]), texts))
@@ -0,0 +1,134 @@
+"""
+Compare the precompiled quantity lexer against the regex loop that
+IngredientParser.parse_ingredient used before it.
+
+Unit lookups are replaced by a set of known unit words in both versions so
+that only the text processing is measured.
+
+usage: bench_quantity_lexer.py [-h] [--lines LINES] [--repeat REPEAT]
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+
+from recipy.quantity_lexer import lex_quantity
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+UNITS = {
+    'cup', 'cups', 'tbsp', 'tablespoon', 'tablespoons', 'tsp', 'teaspoon',
+    'teaspoons', 'oz', 'ounce', 'ounces', 'pound', 'pounds', 'g', 'gram',
+    'grams', 'gallon', 'gallons', 'inch'
+}
+
+
+def legacy_parse(text):
+    """The previous parse_ingredient, minus pint and the Ingredient."""
+    unicode_fracs = {
+        '½': '1/2',
+        '⅓': '1/3',
+        '⅔': '2/3',
+        '¼': '1/4',
+        '¾': '3/4',
+        '⅛': '1/8',
+        '⅜': '3/8',
+        '⅝': '5/8',
+        '⅞': '7/8'
+    }
+    for char, replacement in unicode_fracs.items():
+        text = re.sub(rf'\s?{char}', f' {replacement}', text)
+    text = text.strip()
+
+    integer = r'(\d+)'
+    fraction = f'{integer}/{integer}'
+    mixed_fraction = f'{integer}(?: | and |-)?{fraction}'
+    decimal = rf'({integer}\.{integer})'
+    word = r'\S+'
+
+    number_parse = {
+        integer: lambda match: float(match[1]),
+        decimal: lambda match: float(match[1]),
+        fraction: lambda match: float(match[1]) / float(match[2]),
+        mixed_fraction: lambda match: (
+            float(match[1]) + float(match[2]) / float(match[3]))
+    }
+
+    def match_number(pattern, text):
+        for num_pattern in [mixed_fraction, fraction, decimal, integer]:
+            match = re.match(re.compile(pattern.format(
+                num_pattern=num_pattern, word=word)), text)
+            if match:
+                magnitude = number_parse[num_pattern](match)
+                if match['unit'] and match['unit'].lower() in UNITS:
+                    return (magnitude, match['unit']), match['tail']
+                return (magnitude, None), match['remainder']
+        return None, None
+
+    quantity_a, remainder_a = match_number(
+        '{num_pattern} ?(?P<remainder>(?P<unit>{word}) ?(?P<tail>.*))', text)
+    if not quantity_a:
+        return None, text
+    quantity_b, remainder_b = match_number(
+        '(?:- ?|to ){num_pattern} ?'
+        '(?P<remainder>(?P<unit>{word})(?P<tail>.*))',
+        remainder_a)
+    if quantity_b:
+        return ((quantity_a[0] + quantity_b[0]) / 2,
+                quantity_b[1]), remainder_b
+    quantity_c, remainder_c = match_number(
+        r' ?\((?P<n>{num_pattern}) ?(?P<unit>{word})?\)'
+        '(?P<tail>(?P<remainder>.*))',
+        remainder_a)
+    if quantity_c:
+        return quantity_a, remainder_c
+    return quantity_a, remainder_a
+
+
+def lexer_parse(text):
+    """The same job done with the precompiled lexer."""
+    tokens = lex_quantity(text)
+    if tokens is None:
+        return None, text
+    is_unit = tokens.unit is not None and tokens.unit.lower() in UNITS
+    amount = tokens.amount
+    if tokens.range_amount is not None:
+        amount = (amount + tokens.range_amount) / 2
+    if is_unit:
+        return (amount, tokens.unit), tokens.name
+    if tokens.unit is None:
+        return (amount, None), tokens.name
+    return (amount, None), tokens.remainder
+
+
+def median_time(func, lines, repeat):
+    """Return the median time of repeat runs of func over lines, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--lines', default=os.path.join(DATA_DIR, 'ingredient_lines.txt'),
+        help='file with one ingredient line per line')
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    with open(args.lines, encoding='utf-8') as file:
+        lines = [line.strip() for line in file if line.strip()]
+
+    legacy = median_time(legacy_parse, lines, args.repeat)
+    lexer = median_time(lexer_parse, lines, args.repeat)
+    print(f'{len(lines)} ingredient lines, median of {args.repeat} runs')
+    print(f'{"mode":<10}{"seconds":>10}{"lines/s":>12}')
+    print(f'{"legacy":<10}{legacy:>10.4f}{len(lines) / legacy:>12.0f}')
+    print(f'{"lexer":<10}{lexer:>10.4f}{len(lines) / lexer:>12.0f}')
+    print(f'speedup: {legacy / lexer:.1f}x')
@@ -0,0 +1,72 @@
+"""
+Measure the parse time and peak memory of scraping saved pages, with the
+whole page parsed from decoded text (the old way) and with only the recipe
+containers parsed from the raw bytes.
+
+usage: bench_scraper_memory.py [-h] [--pages PAGES] [--repeat REPEAT]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from recipy.scraper import parse_page, scrape_recipe_html
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    '--pages', default=os.path.join(DATA_DIR, 'pages'),
+    help='directory of saved pages, with a pages.json mapping each file '
+         'name to the URL it was saved from')
+parser.add_argument('--repeat', type=int, default=5)
+args = parser.parse_args()
+
+with open(os.path.join(args.pages, 'pages.json'), encoding='utf-8') as file:
+    urls = json.load(file)
+pages = []
+for file_name, url in urls.items():
+    with open(os.path.join(args.pages, file_name), 'rb') as file:
+        pages.append((file_name, url, file.read()))
+
+
+def full_parse(body, url):
+    # the whole tree, from text that was decoded up front
+    index = parse_page(body.decode('utf-8', errors='replace'))
+    index.soup.decompose()
+
+
+def partial_parse(body, url):
+    scrape_recipe_html(body, url)
+
+
+def measure(function, body, url):
+    """Return the median time in ms and the peak traced memory in KiB."""
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        function(body, url)
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    function(body, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+print(f'{"page":<28}{"KiB":>8}{"full ms":>10}{"partial ms":>12}'
+      f'{"full KiB":>10}{"partial KiB":>13}')
+totals = [0, 0, 0, 0]
+for file_name, url, body in pages:
+    full_time, full_peak = measure(full_parse, body, url)
+    partial_time, partial_peak = measure(partial_parse, body, url)
+    for i, value in enumerate(
+            [full_time, partial_time, full_peak, partial_peak]):
+        totals[i] += value
+    print(f'{file_name:<28}{len(body) / 1024:>8.0f}{full_time:>10.1f}'
+          f'{partial_time:>12.1f}{full_peak:>10.0f}{partial_peak:>13.0f}')
+print(f'{"total":<28}{"":>8}{totals[0]:>10.1f}{totals[1]:>12.1f}'
+      f'{totals[2]:>10.0f}{totals[3]:>13.0f}')
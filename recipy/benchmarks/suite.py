@@ -0,0 +1,243 @@
+"""
+Benchmark each stage of recipy on fixed, committed inputs, and compare the
+results against a stored baseline.
+
+Stages:
+    lex_quantity      quantity_lexer.lex_quantity, per ingredient line
+    parse_ingredient  IngredientParser.parse_ingredient, per ingredient line
+    scrape            scraper.scrape_recipe_html, per saved page
+    yield_clauses     RecipeParser.yield_clauses, per parsed instructions
+    identify_object   RecipeParser.identify_object, per annotated sentence
+    parse_recipe      RecipeParser.parse, building the graph per recipe
+
+Inputs, all read from disk so the suite runs offline:
+    data/ingredient_lines.txt   ingredient lines
+    data/pages/                 saved pages for each scraper, listed in
+                                pages.json with the URL each came from
+    full_sample_dataset.csv     instructions of the sample recipes
+    training_data.json          annotated instruction sentences
+
+usage: suite.py [-h] [--stages STAGE [STAGE ...]] [--repeat REPEAT]
+                [--model MODEL] [--baseline BASELINE]
+                [--save-baseline SAVE_BASELINE] [--tolerance TOLERANCE]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from recipy.quantity_lexer import lex_quantity
+from recipy.reference_index import ReferenceIndex
+from recipy.scraper import scrape_recipe_html
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+STAGES = [
+    'lex_quantity', 'parse_ingredient', 'scrape', 'yield_clauses',
+    'identify_object', 'parse_recipe']
+PERCENTILES = [50, 90, 99]
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+parser.add_argument('--repeat', type=int, default=5)
+parser.add_argument('--model', default='en_core_web_md')
+parser.add_argument(
+    '--baseline', default=os.path.join(DATA_DIR, 'baseline.json'),
+    help='results to compare against. Without one, the suite only reports '
+         'the results and warns that nothing was compared.')
+parser.add_argument(
+    '--save-baseline', help='write the results to this file as a baseline')
+parser.add_argument(
+    '--tolerance', type=float, default=0.2,
+    help='fraction a stage can slow down before it counts as a regression')
+args = parser.parse_args()
+
+
+def load_ingredient_lines():
+    with open(os.path.join(DATA_DIR, 'ingredient_lines.txt'),
+              encoding='utf-8') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def load_pages():
+    pages_dir = os.path.join(DATA_DIR, 'pages')
+    with open(os.path.join(pages_dir, 'pages.json'), encoding='utf-8') as file:
+        urls = json.load(file)
+    pages = []
+    for file_name, url in urls.items():
+        with open(os.path.join(pages_dir, file_name), 'rb') as file:
+            pages.append((file.read(), url))
+    return pages
+
+
+def load_instructions():
+    """Return the instructions of each recipe in the sample dataset."""
+    recipes = []
+    with open(os.path.join(ROOT_DIR, 'full_sample_dataset.csv'),
+              encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            # the first row of each recipe has its page number
+            if row['page number']:
+                recipes.append([])
+            recipes[-1].append(row['instructions'].strip())
+    return [' '.join(steps) for steps in recipes]
+
+
+def load_sentences():
+    """Return the raw text of each annotated sentence."""
+    with open(os.path.join(ROOT_DIR, 'training_data.json'),
+              encoding='utf-8') as file:
+        text = file.read()
+    # the file is a series of JSON objects rather than one array
+    decoder = json.JSONDecoder()
+    sentences, position = [], 0
+    while True:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position == len(text):
+            return sentences
+        document, position = decoder.raw_decode(text, position)
+        sentences.extend(
+            paragraph['raw'] for paragraph in document['paragraphs'])
+
+
+def time_items(function, items):
+    """Time function on each item, keeping the best of args.repeat runs.
+
+    Returns:
+        list[float]: seconds per item
+    """
+    function(items[0])  # warm up caches and lazy loading
+    best = [float('inf')] * len(items)
+    for _ in range(args.repeat):
+        for i, item in enumerate(items):
+            start = time.perf_counter()
+            function(item)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best
+
+
+def summarize(times):
+    times = sorted(times)
+    summary = {
+        'items': len(times),
+        'per_second': len(times) / sum(times)
+    }
+    for percentile in PERCENTILES:
+        index = round(percentile / 100 * (len(times) - 1))
+        summary[f'p{percentile}_ms'] = times[index] * 1000
+    return summary
+
+
+class Stages:
+    """Set up and run each stage, loading spacy only if a stage needs it."""
+
+    def __init__(self):
+        self._recipy = None
+        self._ingredients = None
+
+    @property
+    def recipy(self):
+        if self._recipy is None:
+            from recipy.recipy import Recipy
+            # without a Doc cache, so repeats measure the pipeline itself
+            self._recipy = Recipy(args.model, cache_size=0)
+        return self._recipy
+
+    @property
+    def ingredients(self):
+        """All the ingredient lines, parsed as one big recipe."""
+        if self._ingredients is None:
+            self._ingredients = self.recipy.ingredient_parser(
+                ).parse_ingredients(load_ingredient_lines())
+        return self._ingredients
+
+    def lex_quantity(self):
+        return time_items(lex_quantity, load_ingredient_lines())
+
+    def parse_ingredient(self):
+        ingredient_parser = self.recipy.ingredient_parser()
+        return time_items(
+            ingredient_parser.parse_ingredient, load_ingredient_lines())
+
+    def scrape(self):
+        return time_items(lambda page: scrape_recipe_html(*page), load_pages())
+
+    def yield_clauses(self):
+        recipe_parser = self.recipy.recipe_parser()
+        docs = list(recipe_parser.nlp.pipe(load_instructions()))
+        return time_items(
+            lambda doc: list(recipe_parser.yield_clauses(doc)), docs)
+
+    def identify_object(self):
+        recipe_parser = self.recipy.recipe_parser()
+        recipe_parser.index = ReferenceIndex(self.ingredients)
+        docs = list(recipe_parser.nlp.pipe(load_sentences()))
+
+        def identify_nouns(doc):
+            for token in doc:
+                if token.pos_ in ('NOUN', 'PROPN'):
+                    recipe_parser.identify_object(token)
+
+        return time_items(identify_nouns, docs)
+
+    def parse_recipe(self):
+        recipe_parser = self.recipy.recipe_parser()
+        return time_items(
+            lambda text: recipe_parser.parse(self.ingredients, text),
+            load_instructions())
+
+
+def compare(results, baseline):
+    """Print each stage's change from the baseline.
+
+    Returns:
+        list[str]: stages that slowed down by more than args.tolerance
+    """
+    print()
+    print(f'{"vs baseline":<18}{"per second":>12}{"p50":>10}{"p99":>10}')
+    regressions = []
+    for stage, result in results.items():
+        if stage not in baseline:
+            continue
+        old = baseline[stage]
+        throughput = result['per_second'] / old['per_second']
+        p50 = result['p50_ms'] / old['p50_ms']
+        p99 = result['p99_ms'] / old['p99_ms']
+        flag = ''
+        if throughput < 1 / (1 + args.tolerance) or p50 > 1 + args.tolerance:
+            regressions.append(stage)
+            flag = '  REGRESSION'
+        print(f'{stage:<18}{throughput:>11.2f}x{p50:>9.2f}x{p99:>9.2f}x{flag}')
+    return regressions
+
+
+stages = Stages()
+results = {}
+print(f'{"stage":<18}{"items":>7}{"per second":>12}'
+      + ''.join(f'{"p" + str(p) + " ms":>10}' for p in PERCENTILES))
+for stage in args.stages:
+    results[stage] = summarize(getattr(stages, stage)())
+    result = results[stage]
+    print(f'{stage:<18}{result["items"]:>7}{result["per_second"]:>12.1f}'
+          + ''.join(f'{result[f"p{p}_ms"]:>10.3f}' for p in PERCENTILES))
+
+if args.save_baseline:
+    with open(args.save_baseline, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+        file.write('\n')
+    print(f'\nSaved baseline to {args.save_baseline}')
+
+if not os.path.exists(args.baseline):
+    print(f'\nWarning: no baseline at {args.baseline}, so nothing was '
+          'compared. Save one with --save-baseline.', file=sys.stderr)
+elif args.baseline != args.save_baseline:
+    with open(args.baseline, encoding='utf-8') as file:
+        regressions = compare(results, json.load(file))
+    if regressions:
+        print(f'\n{len(regressions)} stage(s) slower than the baseline: '
+              f'{", ".join(regressions)}')
+        sys.exit(1)
@@ -0,0 +1,243 @@
+"""
+Average the ingredient proportions of many recipes for the same dish.
+"""
+
+import itertools
+
+import numpy as np
+
+
+# plural endings and what replaces them, checked in order
+PLURAL_ENDINGS = (
+    ('ies', 'y'),  # berries
+    ('oes', 'o'),  # tomatoes
+    ('ches', 'ch'),  # peaches
+    ('shes', 'sh'),  # radishes
+    ('xes', 'x'),  # boxes
+    ('sses', 'sses'),  # molasses, not a plural
+    ('ss', 'ss'),  # watercress
+    ('us', 'us'),  # asparagus
+    ('s', '')
+)
+
+
+def singular(noun):
+    """Guess the singular form of a lowercase English noun.
+
+    This only handles the regular endings, as a fallback for pipelines
+    without a lemmatizer.
+    """
+    for ending, replacement in PLURAL_ENDINGS:
+        if noun.endswith(ending) and len(noun) > len(ending) + 2:
+            return noun[:-len(ending)] + replacement
+    return noun
+
+
+def ingredient_key(ingredient):
+    """Return the name that ingredients are aligned by across recipes.
+
+    This is the lemma of the ingredient's base noun, or the singular of the
+    noun itself if the pipeline has no lemmatizer, so 'large eggs' and
+    'egg' line up either way.
+    """
+    base = ingredient.base
+    if base.lemma_:
+        return base.lemma_.lower()
+    return singular(base.text.lower())
+
+
+class ProportionAverager:
+
+    def __init__(self, bins=100):
+        """Keep running statistics of each ingredient's share of a recipe.
+
+        Recipes are added in batches and then dropped, so memory depends on
+        the number of distinct ingredients, not the number of recipes. Means
+        and variances are merged per batch with Chan's parallel update; the
+        median is read from a histogram of shares per ingredient.
+
+        Statistics cover the recipes where an ingredient is measured, that
+        is, has a share above 0. Ingredients that are only counted, like
+        '2 eggs', still count towards frequency.
+
+        Args:
+            bins (int): histogram bins over shares from 0 to 1. Medians are
+                accurate to about 1 / bins.
+        """
+        self.bins = bins
+        self.columns = {}  # ingredient key -> index into the arrays
+        self.keys = []
+        self.recipes = 0
+        capacity = 16
+        self.present = np.zeros(capacity, dtype=int)
+        self.count = np.zeros(capacity, dtype=int)
+        self.mean = np.zeros(capacity)
+        self.m2 = np.zeros(capacity)
+        self.histogram = np.zeros((capacity, bins), dtype=int)
+
+    def _grow(self):
+        """Double the number of ingredients the arrays can hold."""
+        for name in ('present', 'count', 'mean', 'm2', 'histogram'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+
+    def _column(self, key):
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = len(self.keys)
+            self.keys.append(key)
+            if column == len(self.present):
+                self._grow()
+        return column
+
+    def add(self, ingredients):
+        """Add one recipe.
+
+        Args:
+            ingredients (list[Ingredient]): with Ingredient.percent set
+        """
+        self.add_many([ingredients])
+
+    def add_many(self, ingredient_lists):
+        """Add a batch of recipes, updating the statistics all at once.
+
+        Ingredients of a recipe with the same key are added together.
+
+        Args:
+            ingredient_lists (list[list[Ingredient]]): one list per recipe,
+                with Ingredient.percent set
+        """
+        columns, shares = [], []
+        for ingredients in ingredient_lists:
+            recipe = {}
+            for ingredient in ingredients:
+                column = self._column(ingredient_key(ingredient))
+                share = ingredient.percent / 100
+                recipe[column] = recipe.get(column, 0) + share
+            columns.extend(recipe)
+            shares.extend(recipe.values())
+        self.recipes += len(ingredient_lists)
+        if not columns:
+            return
+
+        size = len(self.keys)
+        columns = np.array(columns, dtype=int)
+        shares = np.array(shares, dtype=float)
+        self.present[:size] += np.bincount(columns, minlength=size)
+
+        measured = shares > 0
+        columns, shares = columns[measured], shares[measured]
+        batch_count = np.bincount(columns, minlength=size)
+        batch_sum = np.bincount(columns, weights=shares, minlength=size)
+        batch_mean = np.divide(
+            batch_sum, batch_count,
+            out=np.zeros(size), where=batch_count > 0)
+        batch_m2 = np.bincount(
+            columns, weights=(shares - batch_mean[columns]) ** 2,
+            minlength=size)
+
+        old_count = self.count[:size]
+        total = old_count + batch_count
+        updated = total > 0
+        delta = batch_mean - self.mean[:size]
+        weight = np.divide(
+            batch_count, total, out=np.zeros(size), where=updated)
+        self.mean[:size] += delta * weight
+        self.m2[:size] += batch_m2 + delta ** 2 * old_count * weight
+        self.count[:size] = total
+
+        bins = np.minimum((shares * self.bins).astype(int), self.bins - 1)
+        np.add.at(self.histogram, (columns, bins), 1)
+
+    def medians(self):
+        """Estimate the median share of each ingredient from its histogram.
+
+        Returns:
+            numpy.ndarray: in the order of self.keys, nan for ingredients
+                that were never measured
+        """
+        size = len(self.keys)
+        histogram = self.histogram[:size]
+        count = self.count[:size]
+        cumulative = np.cumsum(histogram, axis=1)
+        half = count / 2
+        # the bin the middle value falls in, then interpolate within it
+        bins = np.argmax(cumulative >= half[:, None], axis=1)
+        rows = np.arange(size)
+        in_bin = histogram[rows, bins]
+        below = cumulative[rows, bins] - in_bin
+        within = np.divide(
+            half - below, in_bin, out=np.zeros(size), where=in_bin > 0)
+        return np.where(count > 0, (bins + within) / self.bins, np.nan)
+
+    def statistics(self):
+        """Get the statistics of every ingredient seen so far.
+
+        Returns:
+            dict: arrays in the order of the 'ingredients' list:
+                ingredients (list[str]): ingredient keys
+                frequency: fraction of recipes that have the ingredient
+                count: number of recipes where it's measured
+                mean, std, median: of its share in those recipes, nan if
+                    it was never measured
+        """
+        size = len(self.keys)
+        count = self.count[:size]
+        measured = count > 0
+        variance = np.divide(
+            self.m2[:size], count, out=np.full(size, np.nan), where=measured)
+        return {
+            'ingredients': list(self.keys),
+            'frequency': self.present[:size] / max(self.recipes, 1),
+            'count': count.copy(),
+            'mean': np.where(measured, self.mean[:size], np.nan),
+            'std': np.sqrt(variance),
+            'median': self.medians()
+        }
+
+    def typical_recipe(self, min_frequency=0.5):
+        """Build an average recipe from the ingredients most recipes have.
+
+        Args:
+            min_frequency (float): fraction of recipes an ingredient must be
+                in to be included
+
+        Returns:
+            list[tuple(str, float)]: ingredient keys and their median shares,
+                scaled to add up to 1, largest first
+        """
+        stats = self.statistics()
+        keep = (stats['frequency'] >= min_frequency) & (stats['count'] > 0)
+        medians = stats['median'][keep]
+        total = medians.sum()
+        if total > 0:
+            medians = medians / total
+        names = [key for key, kept in zip(stats['ingredients'], keep) if kept]
+        return sorted(zip(names, medians.tolist()), key=lambda item: -item[1])
+
+
+def average_recipes(phrase_lists, ingredient_parser, chunk_size=500,
+                    bins=100):
+    """Average the ingredient lists of many recipes for one dish.
+
+    The lists are parsed and added a chunk at a time, so phrase_lists can
+    be a generator longer than fits in memory.
+
+    Args:
+        phrase_lists (iterable[list[str]]): ingredient descriptions, one
+            list per recipe
+        ingredient_parser (IngredientParser): parses each chunk in one
+            nlp.pipe call
+        chunk_size (int): number of recipes to parse at once
+        bins (int): passed to ProportionAverager
+
+    Returns:
+        ProportionAverager
+    """
+    averager = ProportionAverager(bins)
+    phrase_lists = iter(phrase_lists)
+    while True:
+        chunk = list(itertools.islice(phrase_lists, chunk_size))
+        if not chunk:
+            return averager
+        averager.add_many(ingredient_parser.parse_ingredient_lists(chunk))
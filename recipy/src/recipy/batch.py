@@ -0,0 +1,81 @@
+"""
+Parse large batches of recipes on all cores.
+"""
+
+import multiprocessing
+from typing import NamedTuple, Optional
+
+from . import instrumentation
+from .recipy import Recipy
+
+
+class ParseResult(NamedTuple):
+    """The outcome of parsing one recipe of a batch."""
+    index: int  # position of the recipe in the input
+    recipe: Optional[dict]  # Recipe.as_dict(), or None if parsing failed
+    error: Optional[str]  # description of the failure, if any
+
+
+# the Recipy instance of this worker process, set up by _init_worker
+_recipy = None
+
+
+def _init_worker(model, cache_dir):
+    """Load the spacy model and unit registry once per worker process."""
+    global _recipy
+    _recipy = Recipy(model, cache_dir)
+    _recipy.nlp
+    _recipy.units
+
+
+def _parse_one(item):
+    """Parse one (index, (ingredients, instructions)) item in a worker."""
+    index, recipe = item
+    try:
+        ingredients, instructions = recipe
+        recipe = _recipy.parse(ingredients, instructions)
+        with instrumentation.stage('serialization'):
+            payload = recipe.as_dict()
+        return ParseResult(index, payload, None)
+    # one bad recipe shouldn't stop the whole batch
+    except Exception as error:
+        return ParseResult(index, None, f'{type(error).__name__}: {error}')
+
+
+def parse_many(recipes, n_workers=None, ordered=True, chunksize=1,
+               model='en_core_web_md', cache_dir=None):
+    """Parse many recipes with a pool of worker processes.
+
+    Each worker loads its own spacy model and unit registry once, then
+    parses recipes until the input runs out. Results are yielded as they're
+    ready, but the pool reads the input ahead of them without a bound, so
+    a corpus that doesn't fit in memory should be passed in slices.
+
+    Args:
+        recipes (iterable[tuple(list[str], str)]): (ingredients, instructions)
+            pairs, as returned by scraper.scrape_recipe_url
+        n_workers (int): number of processes. Defaults to the number of
+            cores. 0 parses everything in this process, which is handy
+            for debugging.
+        ordered (bool): if True, yield results in input order. Otherwise
+            yield them in the order they finish.
+        chunksize (int): number of recipes to send to a worker at once
+        model (str): name of the spacy package to load
+        cache_dir (str): optional, a DocCache directory shared by the
+            workers, so recipes parsed before skip the spacy pipeline
+
+    Yields:
+        ParseResult: one per recipe. Failures are reported in the error
+            field instead of being raised.
+    """
+    items = enumerate(recipes)
+    if n_workers == 0:
+        _init_worker(model, cache_dir)
+        yield from map(_parse_one, items)
+        return
+
+    with multiprocessing.Pool(
+            n_workers, initializer=_init_worker,
+            initargs=(model, cache_dir)) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        yield from imap(_parse_one, items, chunksize)
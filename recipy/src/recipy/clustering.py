@@ -0,0 +1,199 @@
+"""
+Group near-duplicate recipes, like the same recipe syndicated across
+sites, with MinHash signatures and locality-sensitive hashing.
+"""
+
+import hashlib
+
+import numpy as np
+
+from .averaging import ingredient_key
+
+
+# hashes are taken mod this prime, 2**31 - 1, so the products of two
+# hashes fit in a uint64
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def recipe_features(recipe):
+    """Describe a recipe as a set of words to compare it by.
+
+    Args:
+        recipe (Recipe): a parsed recipe
+
+    Returns:
+        set[str]: 'ingredient:' and the key of each ingredient, as used for
+            averaging, so 'eggs' and 'egg' are the same feature, and
+            'verb:' and the main verb of each step
+    """
+    features = {
+        'ingredient:' + ingredient_key(ingredient)
+        for ingredient in recipe.ingredients}
+    for step in recipe.graph:
+        verb = step.span.doc[step.verb_index]
+        features.add('verb:' + (verb.lemma_ or verb.text).lower())
+    return features
+
+
+def feature_hash(feature):
+    """Hash a feature to 32 bits, the same in every process."""
+    digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class MinHasher:
+
+    def __init__(self, num_perm=128, seed=1):
+        """Compute MinHash signatures of sets of features.
+
+        The fraction of positions where two signatures are equal estimates
+        the Jaccard similarity of their sets.
+
+        Args:
+            num_perm (int): length of the signatures. More is more accurate
+                and slower.
+            seed (int): picks the hash functions. Signatures can only be
+                compared if they were made with the same seed and num_perm.
+        """
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        # each hash function is x -> (a * x + b) mod MERSENNE_PRIME
+        self.a = rng.randint(
+            1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(
+            0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, features):
+        """Compute the signature of a set of features.
+
+        Args:
+            features (iterable[str])
+
+        Returns:
+            numpy.ndarray: num_perm uint64 values. All of them are
+                MERSENNE_PRIME for an empty set.
+        """
+        prime = np.uint64(MERSENNE_PRIME)
+        hashes = np.array(
+            [feature_hash(feature) for feature in set(features)],
+            dtype=np.uint64) % prime
+        if not len(hashes):
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        permuted = (np.outer(hashes, self.a) + self.b) % prime
+        return permuted.min(axis=0)
+
+
+def estimated_similarity(signature, other):
+    """Estimate the Jaccard similarity of two sets from their signatures."""
+    return float(np.mean(signature == other))
+
+
+class LSHIndex:
+
+    def __init__(self, num_perm=128, bands=32):
+        """Find signatures that are likely similar without comparing all.
+
+        Each signature is split into bands, and two signatures become
+        candidates if any band is equal. With r = num_perm / bands rows per
+        band, pairs with a similarity above about (1 / bands) ** (1 / r)
+        are likely to be found, and pairs far below it rarely are.
+
+        Args:
+            num_perm (int): length of the signatures
+            bands (int): number of bands. It must divide num_perm.
+        """
+        if num_perm % bands:
+            raise ValueError(
+                f'{bands} bands do not divide {num_perm} permutations')
+        self.bands = bands
+        self.rows = num_perm // bands
+        # one dict per band: bytes of the band -> keys with that band
+        self.buckets = [{} for _ in range(bands)]
+
+    def _bands(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows].tobytes()
+
+    def add(self, key, signature):
+        """Index a signature under a key.
+
+        Several signatures can share a key, like the members of a cluster.
+        Each bucket holds a key once however many of them land in it.
+        """
+        for band, value in self._bands(signature):
+            self.buckets[band].setdefault(value, set()).add(key)
+
+    def query(self, signature):
+        """Get the keys of the signatures that share a band with this one.
+
+        Returns:
+            set: candidate keys, not yet checked for similarity
+        """
+        candidates = set()
+        for band, value in self._bands(signature):
+            candidates.update(self.buckets[band].get(value, ()))
+        return candidates
+
+
+def cluster_signatures(signatures, threshold=0.5, bands=32):
+    """Group signatures that are at least threshold similar.
+
+    Signatures are indexed by the first member, or leader, of their
+    cluster, so each LSH bucket holds at most one key per cluster. Each
+    signature is only checked against the leaders LSH finds for it, so the
+    time grows about linearly with the number of signatures, even when
+    many of them are duplicates.
+
+    Args:
+        signatures (numpy.ndarray): one MinHash signature per row
+        threshold (float): lowest estimated similarity to join a cluster
+        bands (int): passed to LSHIndex
+
+    Returns:
+        list[list[int]]: row indices of each cluster, largest cluster first,
+            every row in exactly one cluster
+    """
+    index = LSHIndex(signatures.shape[1], bands)
+    # row -> row of the first member of its cluster
+    leaders = []
+    for row, signature in enumerate(signatures):
+        best, best_similarity = row, threshold
+        # on a tie, the earliest cluster wins
+        for leader in sorted(index.query(signature), reverse=True):
+            similarity = estimated_similarity(signature, signatures[leader])
+            if similarity >= best_similarity:
+                best, best_similarity = leader, similarity
+        leaders.append(best)
+        # a member's bands lead to its cluster too, so variants of variants
+        # still find it
+        index.add(best, signature)
+
+    clusters = {}
+    for row, leader in enumerate(leaders):
+        clusters.setdefault(leader, []).append(row)
+    return sorted(clusters.values(), key=len, reverse=True)
+
+
+def cluster_recipes(recipes, threshold=0.5, num_perm=128, bands=32,
+                    seed=1):
+    """Group recipes that are near-duplicates or close variants.
+
+    Args:
+        recipes (iterable[Recipe]): parsed recipes
+        threshold (float): lowest estimated Jaccard similarity of
+            recipe_features to be in the same cluster
+        num_perm (int): passed to MinHasher
+        bands (int): passed to LSHIndex
+        seed (int): passed to MinHasher
+
+    Returns:
+        list[list[int]]: positions in recipes of each cluster, largest
+            cluster first
+    """
+    hasher = MinHasher(num_perm, seed)
+    signatures = [
+        hasher.signature(recipe_features(recipe)) for recipe in recipes]
+    if not signatures:
+        return []
+    return cluster_signatures(np.array(signatures), threshold, bands)
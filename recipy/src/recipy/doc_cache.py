@@ -0,0 +1,170 @@
+"""
+Keep processed spacy Docs, so text that was parsed before doesn't go
+through the pipeline again.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import spacy
+from spacy.tokens import DocBin
+
+
+class DocCache:
+
+    def __init__(self, directory=None, maxsize=4096):
+        """Store Docs in memory and, optionally, on disk.
+
+        Docs are keyed by a hash of their text together with the pipeline
+        that processed them, so a different model, model version or set
+        of components never gets another's Docs. On disk, each Doc is a
+        DocBin file under a directory for its pipeline.
+
+        Args:
+            directory (str): where to keep the cache files. If None, Docs
+                are only kept in memory.
+            maxsize (int): number of Docs to keep in memory. The least
+                recently used are dropped first.
+        """
+        self.directory = directory
+        self.maxsize = maxsize
+        self.docs = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(pipeline_key, text):
+        return pipeline_key, hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        pipeline_key, text_hash = key
+        return os.path.join(
+            self.directory, pipeline_key, text_hash[:2], text_hash + '.spacy')
+
+    def get(self, key, vocab):
+        """Look up a Doc.
+
+        Args:
+            key (tuple): from DocCache.key
+            vocab (spacy.Vocab): vocab to load a Doc from disk with
+
+        Returns:
+            spacy.Doc, or None if it isn't cached
+        """
+        with self.lock:
+            if key in self.docs:
+                self.docs.move_to_end(key)
+                self.hits += 1
+                return self.docs[key]
+        doc = None
+        if self.directory is not None:
+            try:
+                with open(self.path(key), 'rb') as file:
+                    doc_bin = DocBin().from_bytes(file.read())
+                doc = next(doc_bin.get_docs(vocab))
+            except (OSError, ValueError, StopIteration):  # missing or corrupt
+                doc = None
+        with self.lock:
+            if doc is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, doc)
+        return doc
+
+    def put(self, key, doc):
+        """Store a Doc.
+
+        Args:
+            key (tuple): from DocCache.key
+            doc (spacy.Doc): the processed text
+        """
+        self._remember(key, doc)
+        if self.directory is None:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first so readers never see half a Doc
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as file:
+            file.write(DocBin(docs=[doc]).to_bytes())
+        os.replace(temp_path, path)
+
+    def _remember(self, key, doc):
+        with self.lock:
+            self.docs[key] = doc
+            self.docs.move_to_end(key)
+            if len(self.docs) > self.maxsize:
+                self.docs.popitem(last=False)
+
+
+class CachedPipeline:
+
+    def __init__(self, pipeline, cache):
+        """Look processed texts up in a DocCache before running a pipeline.
+
+        It can be used anywhere the pipeline can.
+
+        Args:
+            pipeline (recipy.Pipeline or spacy.Language): what to run on
+                texts that aren't cached
+            cache (DocCache): where to keep the Docs
+        """
+        self.pipeline = pipeline
+        self.cache = cache
+        meta = pipeline.meta
+        if isinstance(pipeline, spacy.Language):
+            components = pipeline.pipe_names
+        else:
+            components = pipeline.components
+        signature = '|'.join([
+            meta.get('lang', ''), meta.get('name', ''),
+            meta.get('version', ''), spacy.__version__, *components])
+        # e.g. 'en_core_web_md-3.7.1-9f86d081884c'
+        self.pipeline_key = '-'.join([
+            f'{meta.get("lang", "")}_{meta.get("name", "")}',
+            meta.get('version', ''),
+            hashlib.sha256(signature.encode('utf-8')).hexdigest()[:12]])
+
+    def __call__(self, text):
+        key = self.cache.key(self.pipeline_key, text)
+        doc = self.cache.get(key, self.vocab)
+        if doc is None:
+            doc = self.pipeline(text)
+            self.cache.put(key, doc)
+        return doc
+
+    def pipe(self, texts, **kwargs):
+        """Process many texts, running the pipeline only on the new ones.
+
+        Args:
+            texts (iterable[str]): texts to process
+            kwargs: passed on to the pipeline's pipe method
+
+        Returns:
+            list[spacy.Doc]: in the same order as texts
+        """
+        texts = list(texts)
+        keys = [self.cache.key(self.pipeline_key, text) for text in texts]
+        docs = [self.cache.get(key, self.vocab) for key in keys]
+        missing = [i for i, doc in enumerate(docs) if doc is None]
+        processed = self.pipeline.pipe(
+            [texts[i] for i in missing], **kwargs)
+        for i, doc in zip(missing, processed):
+            docs[i] = doc
+            self.cache.put(keys[i], doc)
+        return docs
+
+    @property
+    def vocab(self):
+        return self.pipeline.vocab
+
+    @property
+    def meta(self):
+        return self.pipeline.meta
@@ -0,0 +1,105 @@
+"""
+Index a parsed web page in one pass, so scrapers can look up tags by class
+without searching the whole tree each time.
+"""
+
+import re
+from collections import defaultdict
+
+import bs4
+
+
+# strings longer than this are never section headers
+MAX_HEADER_LENGTH = 30
+
+
+class DOMIndex:
+
+    def __init__(self, soup):
+        """Walk the document once, recording every tag by name and class.
+
+        Short strings are also recorded, so headers like 'Ingredients' can
+        be looked up by their text.
+
+        Args:
+            soup (bs4.BeautifulSoup): the parsed page
+        """
+        self.soup = soup
+        self.tags = defaultdict(list)  # tag name -> tags, in document order
+        self.classes = defaultdict(list)  # class name -> tags, in order
+        self.headers = {}  # lowercase text -> first string with that text
+        self.position = {}  # id(tag) -> position in document order
+
+        for element in soup.descendants:
+            if isinstance(element, bs4.element.Tag):
+                self.position[id(element)] = len(self.position)
+                self.tags[element.name].append(element)
+                for class_name in element.get('class', ()):
+                    self.classes[class_name].append(element)
+            elif type(element) is bs4.element.NavigableString:
+                text = element.strip()
+                if text and len(text) <= MAX_HEADER_LENGTH:
+                    key = text.rstrip(':').strip().lower()
+                    self.headers.setdefault(key, element)
+
+    def has_class(self, class_name):
+        return class_name in self.classes
+
+    def find_all(self, name=None, class_=None):
+        """Find tags by name and/or class, like bs4's find_all.
+
+        Args:
+            name (str): tag name to match
+            class_ (str or re.Pattern): a class name, several class names
+                separated by spaces that must all be present, or a pattern
+                to search class names for
+
+        Returns:
+            list[bs4.element.Tag]: matching tags, in document order
+        """
+        if class_ is None:
+            return list(self.tags.get(name, ()))
+
+        if isinstance(class_, re.Pattern):
+            matches = {
+                id(tag): tag
+                for class_name, tags in self.classes.items()
+                if class_.search(class_name) for tag in tags}
+            candidates = sorted(
+                matches.values(), key=lambda tag: self.position[id(tag)])
+        else:
+            first, *rest = class_.split()
+            candidates = self.classes.get(first, ())
+            if rest:
+                candidates = [
+                    tag for tag in candidates
+                    if set(rest).issubset(tag['class'])]
+
+        if name is None:
+            return list(candidates)
+        return [tag for tag in candidates if tag.name == name]
+
+    def find(self, name=None, class_=None):
+        """Find the first tag by name and/or class, like bs4's find.
+
+        Returns:
+            bs4.element.Tag, or None if there is no match
+        """
+        matches = self.find_all(name, class_)
+        return matches[0] if matches else None
+
+    def header(self, *texts):
+        """Find a short string that reads like one of some section headers.
+
+        Case and a trailing colon are ignored.
+
+        Args:
+            texts (str): e.g. 'instructions', 'directions'
+
+        Returns:
+            bs4.element.NavigableString for the first of texts found, or None
+        """
+        for text in texts:
+            if text in self.headers:
+                return self.headers[text]
+        return None
@@ -0,0 +1,263 @@
+"""
+Download web pages concurrently over a pool of reusable connections.
+"""
+
+import asyncio
+import threading
+from typing import NamedTuple, Optional
+
+import aiohttp
+
+from . import instrumentation
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible)'}
+
+# responses with these status codes are worth trying again
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Response(NamedTuple):
+    url: str  # the URL that was requested
+    status: int
+    headers: dict
+    body: bytes
+    encoding: Optional[str]  # charset given in the Content-Type header
+
+    @property
+    def text(self):
+        """The body decoded with its declared charset, or UTF-8."""
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class FetchError(Exception):
+    """Raised when a URL can't be fetched, even after retrying."""
+
+
+class CacheMiss(FetchError):
+    """Raised when the cache is offline and doesn't have a URL."""
+
+
+class Fetcher:
+
+    def __init__(self, limit=64, limit_per_host=4, timeout=15, retries=2,
+                 backoff=0.5, headers=HEADERS, cache=None):
+        """Fetch pages with one pooled aiohttp session.
+
+        Use as an async context manager:
+            async with Fetcher() as fetcher:
+                responses = await fetcher.fetch_all(urls)
+
+        Args:
+            limit (int): maximum number of open connections
+            limit_per_host (int): maximum number of open connections to
+                any one host
+            timeout (float): seconds to allow for each attempt
+            retries (int): number of times to retry after a connection
+                error, a timeout or a RETRY_STATUSES response
+            backoff (float): seconds to wait before the first retry,
+                doubled for each one after that
+            headers (dict): headers to send with every request
+            cache (http_cache.ResponseCache): optional, where to keep
+                responses so they don't have to be downloaded again
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = headers
+        self.cache = cache
+        self.session = None
+
+    async def open(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=self.headers)
+        return self
+
+    async def close(self):
+        await self.session.close()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def fetch(self, url, headers=None):
+        """Fetch one URL, from the cache if possible.
+
+        A cached response is used as is while it's fresh. After that it's
+        revalidated with If-None-Match/If-Modified-Since, and used again if
+        the server says it hasn't changed.
+
+        Args:
+            url (str): URL to GET
+            headers (dict): extra headers for this request
+
+        Returns:
+            Response: the last response received. Its status may be an
+                error if retries ran out.
+
+        Raises:
+            FetchError: if no response was received at all
+            CacheMiss: if the cache is offline and doesn't have the URL
+        """
+        if self.cache is None:
+            return await self.download(url, headers)
+
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self.cache.get, url)
+        if cached is not None and (
+                self.cache.offline or self.cache.is_fresh(cached)):
+            return _from_cache(cached)
+        if self.cache.offline:
+            raise CacheMiss(f'{url} is not in the cache')
+
+        if cached is not None:
+            headers = {
+                **self.cache.revalidation_headers(cached), **(headers or {})}
+        response = await self.download(url, headers)
+
+        if response.status == 304 and cached is not None:
+            await loop.run_in_executor(None, self.cache.touch, url)
+            return _from_cache(cached)
+        if response.status == 200:
+            await loop.run_in_executor(
+                None, self.cache.put, url, response.status, response.headers,
+                response.body)
+        return response
+
+    async def download(self, url, headers=None):
+        """Fetch one URL from the network, retrying failures.
+
+        Args:
+            url (str): URL to GET
+            headers (dict): extra headers for this request
+
+        Returns:
+            Response: the last response received. Its status may be an
+                error if retries ran out.
+
+        Raises:
+            FetchError: if no response was received at all
+        """
+        result, error = None, None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                with instrumentation.stage('fetch'):
+                    async with self.session.get(
+                            url, headers=headers) as response:
+                        body = await response.read()
+                        result = Response(
+                            url, response.status, dict(response.headers),
+                            body, response.charset)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exception:
+                error = exception
+                continue
+            if result.status not in RETRY_STATUSES:
+                return result
+        if result is not None:
+            return result
+        raise FetchError(f'GET request to {url} failed: {error!r}')
+
+    async def fetch_all(self, urls):
+        """Fetch many URLs at the same time.
+
+        Args:
+            urls (list[str]): URLs to GET
+
+        Returns:
+            list[Response or FetchError]: in the same order as urls
+        """
+        return await asyncio.gather(
+            *[self.fetch(url) for url in urls], return_exceptions=True)
+
+
+def _from_cache(cached):
+    """Turn a CachedResponse into a Response."""
+    encoding = None
+    for name, value in cached.headers.items():
+        if name.lower() == 'content-type' and 'charset=' in value:
+            encoding = value.split('charset=')[-1].split(';')[0].strip('"\' ')
+    return Response(
+        cached.url, cached.status, cached.headers, cached.body, encoding)
+
+
+# Synchronous callers share one Fetcher, running on an event loop in a
+# background thread, so connections are reused between calls.
+_loop = None
+_fetcher = None
+_cache = None
+_lock = threading.Lock()
+
+
+def set_cache(cache):
+    """Use a ResponseCache for fetch() and fetch_all().
+
+    Args:
+        cache (http_cache.ResponseCache): the cache, or None for no cache
+    """
+    global _cache
+    with _lock:
+        _cache = cache
+        if _fetcher is not None:
+            _fetcher.cache = cache
+
+
+def _background_fetcher():
+    global _loop, _fetcher
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name='recipy-fetch',
+                daemon=True).start()
+            _fetcher = asyncio.run_coroutine_threadsafe(
+                Fetcher(cache=_cache).open(), loop).result()
+            _loop = loop
+    return _loop, _fetcher
+
+
+def run_with_fetcher(function):
+    """Run async work that uses the shared Fetcher from synchronous code.
+
+    Args:
+        function (function): takes the Fetcher and returns a coroutine
+
+    Returns:
+        the coroutine's result
+    """
+    loop, fetcher = _background_fetcher()
+    return asyncio.run_coroutine_threadsafe(function(fetcher), loop).result()
+
+
+def fetch(url):
+    """Fetch one URL from synchronous code.
+
+    Args:
+        url (str): URL to GET
+
+    Returns:
+        Response
+
+    Raises:
+        FetchError: if no response was received
+    """
+    return run_with_fetcher(lambda fetcher: fetcher.fetch(url))
+
+
+def fetch_all(urls):
+    """Fetch many URLs concurrently from synchronous code.
+
+    Args:
+        urls (list[str]): URLs to GET
+
+    Returns:
+        list[Response or FetchError]: in the same order as urls
+    """
+    return run_with_fetcher(lambda fetcher: fetcher.fetch_all(urls))
@@ -0,0 +1,156 @@
+"""
+Keep downloaded pages on disk so they don't have to be fetched again.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.parse
+from typing import NamedTuple
+
+
+# query parameters that only track where a click came from
+TRACKING_PARAMETERS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+
+# response headers worth keeping
+CACHED_HEADERS = {'content-type', 'etag', 'last-modified'}
+
+
+def normalize_url(url):
+    """Return a canonical form of a URL, so equivalent URLs share an entry.
+
+    The scheme and host are lowercased, default ports, fragments and
+    tracking parameters are dropped and the query parameters are sorted.
+
+    Args:
+        url (str): e.g. 'HTTPS://www.Example.com:443/pie?b=2&a=1#comments'
+
+    Returns:
+        str: e.g. 'https://www.example.com/pie?a=1&b=2'
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in {
+            ('http', 80), ('https', 443)}:
+        host += f':{parts.port}'
+    query = sorted(
+        (name, value) for name, value
+        in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not name.startswith('utm_') and name not in TRACKING_PARAMETERS)
+    return urllib.parse.urlunsplit((
+        scheme, host, parts.path or '/', urllib.parse.urlencode(query), ''))
+
+
+class CachedResponse(NamedTuple):
+    url: str
+    status: int
+    headers: dict
+    body: bytes
+    fetched_at: float  # when the response was last known to be current
+
+    def age(self):
+        """Seconds since the response was fetched or revalidated."""
+        return time.time() - self.fetched_at
+
+
+class ResponseCache:
+
+    def __init__(self, directory, ttl=7 * 24 * 60 * 60, offline=False):
+        """Store responses on disk, keyed by a hash of the normalized URL.
+
+        Each response is one gzip file holding a line of JSON metadata
+        followed by the body. The file's modification time records when
+        the response was fetched or last revalidated.
+
+        Args:
+            directory (str): where to keep the cache files
+            ttl (float): seconds a response can be used without
+                revalidating it
+            offline (bool): if True, only ever serve from the cache
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, url):
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], key + '.gz')
+
+    def get(self, url):
+        """Look up a URL.
+
+        Args:
+            url (str): URL that was requested
+
+        Returns:
+            CachedResponse, or None if the URL isn't cached
+        """
+        path = self.path(url)
+        try:
+            fetched_at = os.path.getmtime(path)
+            with gzip.open(path, 'rb') as file:
+                metadata = json.loads(file.readline())
+                body = file.read()
+        except (OSError, ValueError):  # missing or corrupt
+            return None
+        return CachedResponse(
+            metadata['url'], metadata['status'], metadata['headers'], body,
+            fetched_at)
+
+    def put(self, url, status, headers, body):
+        """Store a response.
+
+        Args:
+            url (str): URL that was requested
+            status (int): HTTP status code
+            headers (dict): response headers
+            body (bytes): response body
+
+        Returns:
+            CachedResponse
+        """
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        headers = {
+            name: value for name, value in headers.items()
+            if name.lower() in CACHED_HEADERS}
+        metadata = json.dumps(
+            {'url': url, 'status': status, 'headers': headers})
+        # write to a temporary file first so readers never see half an entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wb') as file:
+            file.write(metadata.encode('utf-8') + b'\n')
+            file.write(body)
+        os.replace(temp_path, path)
+        return CachedResponse(url, status, headers, body, time.time())
+
+    def touch(self, url):
+        """Mark a cached response as current, after revalidating it."""
+        os.utime(self.path(url))
+
+    def is_fresh(self, response):
+        return response.age() < self.ttl
+
+    @staticmethod
+    def revalidation_headers(response):
+        """Return headers that make a request conditional on the response.
+
+        Args:
+            response (CachedResponse): the cached copy
+
+        Returns:
+            dict: If-None-Match and/or If-Modified-Since headers
+        """
+        headers = {
+            name.lower(): value for name, value in response.headers.items()}
+        conditions = {}
+        if 'etag' in headers:
+            conditions['If-None-Match'] = headers['etag']
+        if 'last-modified' in headers:
+            conditions['If-Modified-Since'] = headers['last-modified']
+        return conditions
@@ -14,9 +14,16 @@ from .node import Node
 INGREDIENT_TYPE = 'ingredient'
 
 
+def normalize_name(name):
+    """Return the form of an ingredient name that gets processed by spacy."""
+    return name.strip().lower()  # ignore case and trailing whitespace
+
+
 class Ingredient(Node):
 
-    def __init__(self, quantity, name, id_, ureg, nlp):
+    __slots__ = ('quantity', 'name', 'nlp', 'percent', 'span', 'base')
+
+    def __init__(self, quantity, name, id_, ureg, nlp, doc=None):
         """
         Represent a recipe ingredient with its name and amount
 
@@ -26,10 +33,12 @@ class Ingredient(Node):
             id_ (int): unique identifier for this ingredient
             ureg (pint.UnitRegistry instance): shared across all Ingredients
             nlp (spacy.Language): shared across all Ingredients
+            doc (spacy.Doc): optional, the already-processed name. If given,
+                it must come from running nlp on normalize_name(name).
         """
         super().__init__(id_)
         self.quantity = quantity
-        self.name = name.strip().lower()  # ignore case and trailing whitespace
+        self.name = normalize_name(name)
         self.nlp = nlp
 
         # percent of recipe by volume that this ingredient makes up
@@ -37,7 +46,9 @@ class Ingredient(Node):
         self.percent = 0
 
         # process the ingredient name into a spacy Span
-        self.span = list(self.nlp(self.name).sents)[0]
+        if doc is None:
+            doc = self.nlp(self.name)
+        self.span = list(doc.sents)[0]
 
         # try to identify the key word in the ingredient name
         # should be the syntactically highest noun in the name
@@ -1,15 +1,31 @@
-import re
+import logging
 
-import pint
+from .ingredient import Ingredient, normalize_name
+from .proportions import DENSITIES, set_percents
+from .quantity_lexer import lex_quantity, parse_number
+from .units import UnitResolver
 
-from recipedia.ingredient import Ingredient
+
+logger = logging.getLogger(__name__)
 
 
 class IngredientParser:
 
-    def __init__(self, ureg, nlp):
+    def __init__(self, ureg, nlp, units=None, densities=DENSITIES):
+        """
+        Args:
+            ureg (pint.UnitRegistry): shared across all Ingredients
+            nlp (spacy.Language): shared across all Ingredients
+            units (UnitResolver): optional, resolves unit words with ureg.
+                Pass one in to share its cache between parsers.
+            densities (dict): grams per milliliter by ingredient name, so
+                ingredients measured by mass count towards Ingredient.percent.
+                If None, only ingredients measured by volume count.
+        """
         self.ureg = ureg
         self.nlp = nlp
+        self.units = units or UnitResolver(ureg)
+        self.densities = densities
 
     def parse(self, ing):
         if isinstance(ing, list):
@@ -23,76 +39,63 @@ class IngredientParser:
         quantity = self.ureg.Quantity(magnitude, unit)
         return Ingredient(quantity, name, id_, self.ureg, self.nlp)
 
-    def parse_ingredients(self, phrases):
+    def parse_ingredients(self, phrases, batch_size=256):
         """Parse a list of phrases into a list of Ingredient objects.
+
+        All of the ingredient names are run through spacy together with
+        nlp.pipe, rather than one at a time.
+
         Args:
             phrases (list[string]): a list of ingredient descriptions
+            batch_size (int): number of names to send through spacy at once
         Returns:
             list[Ingredient]: a list of Ingredient objects
         """
-        ingredients = []
-        id_ = 0
-        for phrase in phrases:
-            ingredients.append(self.parse_ingredient(phrase, id_))
-            id_ += 1
-        return ingredients
+        return self.parse_ingredient_lists([phrases], batch_size)[0]
+
+    def parse_ingredient_lists(self, phrase_lists, batch_size=256):
+        """Parse the ingredient lists of many recipes at once.
+
+        The names from every list go through a single nlp.pipe call, so the
+        spacy overhead is paid per batch instead of per ingredient.
+
+        Args:
+            phrase_lists (list[list[string]]): one list of ingredient
+                descriptions per recipe
+            batch_size (int): number of names to send through spacy at once
+        Returns:
+            list[list[Ingredient]]: one list of Ingredient objects per recipe,
+                in the same order as phrase_lists. Ingredient ids start at 0
+                within each recipe.
+        """
+        components = [
+            [self.split_ingredient(phrase) for phrase in phrases]
+            for phrases in phrase_lists]
+        names = [
+            normalize_name(name)
+            for recipe in components for _, name in recipe]
+        docs = iter(self.nlp.pipe(names, batch_size=batch_size))
+
+        ingredient_lists = []
+        for recipe in components:
+            ingredient_lists.append([
+                Ingredient(quantity, name, id_, self.ureg, self.nlp,
+                           doc=next(docs))
+                for id_, (quantity, name) in enumerate(recipe)])
+        set_percents(ingredient_lists, self.units.codes, self.densities)
+        return ingredient_lists
 
     def parse_amount(self, amount):
         """Parse an 'amount' string into a number.
 
         Args:
-            amount (str):
+            amount (str): e.g. '2', '1.5', '1/3', '⅓', '2 1/2', '2 and ½'
 
         Returns:
             number
         """
-        # Valid number formats:
-        # integer: '2'
-        # decimal: '1.5'
-        # fraction: '1/3', '⅓'
-        # mixed fraction: '2 1/2', '2 and 1/2', '2-1/2',
-        #                 '2½', '2 ½', '2 and ½', '2-½'
-        print('amount:', amount)
-        # multi-character equivalents for fraction characters
-        unicode_fracs = {
-            '½': '1/2',
-            '⅓': '1/3',
-            '⅔': '2/3',
-            '¼': '1/4',
-            '¾': '3/4',
-            '⅛': '1/8',
-            '⅜': '3/8',
-            '⅝': '5/8',
-            '⅞': '7/8'
-        }
-
-        # Replace any unicode fractions with normal fractions
-        for char, replacement in unicode_fracs.items():
-            text = re.sub(rf'\s?{char}', f' {replacement}', amount)
-        text = text.strip()
-
-        # define some regular expressions to help identify numbers
-        integer = r'(\d+)'
-        fraction = f'{integer}/{integer}'
-        # an integer and a fraction separated by ' ' or ' and ' or '-'
-        # '-' can also be a range, but if it's an integer followed by a
-        # fraction, it's safe to assume it's a mixed fraction.
-        mixed_fraction = f'{integer}(?: | and |-)?{fraction}'
-        decimal = rf'({integer}\.{integer})'
-
-        number_parse = {
-            integer: lambda match: float(match[1]),
-            decimal: lambda match: float(match[1]),
-            fraction: lambda match: float(match[1]) / float(match[2]),
-            mixed_fraction: lambda match: (
-                float(match[1]) + float(match[2]) / float(match[3]))
-        }
-
-        for pattern in [mixed_fraction, fraction, decimal, integer]:
-            match = re.match(re.compile(pattern, text))
-            if match:
-                return number_parse[pattern](match)
-        return None
+        logger.debug('amount: %s', amount)
+        return parse_number(amount)
 
     def parse_unit(self, unit):
         """Parse a unit string to a pint.Unit object.
@@ -103,12 +106,9 @@ class IngredientParser:
         Returns:
             pint.Unit object, or None if could not parse
         """
-        try:  # try to parse the word as a unit
-            return self.ureg.Unit(unit.lower())
-        except pint.errors.UndefinedUnitError:
-            return None
+        return self.units.resolve(unit)
 
-    def parse_ingredient(self, text, id_):
+    def parse_ingredient(self, text, id_=0):
         """Parse an ingredient phrase into an Ingredient object.
         Args:
             text (string): the complete ingredient description e.g.
@@ -117,98 +117,44 @@ class IngredientParser:
         Returns:
             Ingredient object
         """
-        # Valid number formats:
-        # integer: '2'
-        # decimal: '1.5'
-        # fraction: '1/3', '⅓'
-        # mixed fraction: '2 1/2', '2 and 1/2', '2-1/2',
-        #                 '2½', '2 ½', '2 and ½', '2-½'
-        print('ingredient:', text)
-        # multi-character equivalents for fraction characters
-        unicode_fracs = {
-            '½': '1/2',
-            '⅓': '1/3',
-            '⅔': '2/3',
-            '¼': '1/4',
-            '¾': '3/4',
-            '⅛': '1/8',
-            '⅜': '3/8',
-            '⅝': '5/8',
-            '⅞': '7/8'
-        }
-
-        # Replace any unicode fractions with normal fractions
-        for char, replacement in unicode_fracs.items():
-            text = re.sub(f'\s?{char}', f' {replacement}', text)
-        text = text.strip()
-
-        # define some regular expressions to help identify numbers
-        integer = '(\d+)'
-        fraction = f'{integer}/{integer}'
-        # an integer and a fraction separated by ' ' or ' and ' or '-'
-        # '-' can also be a range, but if it's an integer followed by a
-        # fraction, it's safe to assume it's a mixed fraction.
-        mixed_fraction = f'{integer}(?: | and |-)?{fraction}'
-        decimal = f'({integer}\.{integer})'
-        # letter, hyphen, or period
-        word = '[a-zA-Z-\.]+'
-        word = '\S+'
-
-        number_parse = {
-            integer: lambda match: float(match[1]),
-            decimal: lambda match: float(match[1]),
-            fraction: lambda match: float(match[1]) / float(match[2]),
-            mixed_fraction: lambda match: (
-                float(match[1]) + float(match[2]) / float(match[3]))
-
-        }
-
-        def match_number(pattern, text):
-            for num_pattern in [mixed_fraction, fraction, decimal, integer]:
-                match = re.match(re.compile(pattern.format(
-                    num_pattern=num_pattern, word=word)), text)
-                if match:
-                    magnitude = number_parse[num_pattern](match)
-                    try:  # try to parse the word as a unit
-                        units = self.ureg.Unit(match['unit'].lower())
-                        quantity = magnitude * units
-                        remainder = match['tail']
-                    except:  # if it's not a unit, return a unitless Quantity
-                        quantity = self.ureg.Quantity(magnitude)
-                        remainder = match['remainder']
-                    return quantity, remainder
-            return None, None
-
-        quantity_a, remainder_a = match_number(
-            '{num_pattern} ?(?P<remainder>(?P<unit>{word}) ?(?P<tail>.*))',
-            text)
-        if not quantity_a:
-            return Ingredient(self.ureg.Quantity(0), text, id_, self.ureg, self.nlp)
-
-        # match against range format
-        quantity_b, remainder_b = match_number(
-            '(?:- ?|to ){num_pattern} ?(?P<remainder>(?P<unit>{word})(?P<tail>.*))',
-            remainder_a)
-        if quantity_b:
-            # i want to know if this ever isn't dimensionless
-            assert quantity_a.dimensionless
+        quantity, name = self.split_ingredient(text)
+        return Ingredient(quantity, name, id_, self.ureg, self.nlp)
+
+    def split_ingredient(self, text):
+        """Split an ingredient phrase into its quantity and name.
+        Args:
+            text (string): the complete ingredient description e.g.
+                '2 cups flour, sifted'
+        Returns:
+            tuple(pint.Quantity, string): the amount of the ingredient and
+                the rest of the description e.g. (2 cup, 'flour, sifted')
+        """
+        logger.debug('ingredient: %s', text)
+        tokens = lex_quantity(text)
+        if tokens is None:
+            return self.ureg.Quantity(0), text
+
+        units = self.parse_unit(tokens.unit) if tokens.unit else None
+
+        if tokens.range_amount is not None:
             # if the measurement is given as a range, use the average
-            avg_quantity = self.ureg.Quantity(
-                (quantity_a.magnitude + quantity_b.magnitude) / 2,
-                quantity_b.units
-            )
-            return Ingredient(avg_quantity, remainder_b, id_, self.ureg, self.nlp)
-
-        # match against alternate measurement format
-        quantity_c, remainder_c = match_number(
-            ' ?\(({num_pattern}) ?(?P<unit>{word})?\)(?P<tail>(?P<remainder>.*))',
-            remainder_a)
-        if quantity_c:
+            magnitude = (tokens.amount + tokens.range_amount) / 2
+            if units is None:
+                return self.ureg.Quantity(magnitude), tokens.remainder
+            return self.ureg.Quantity(magnitude, units), tokens.name
+
+        if tokens.unit and units is None:
+            # the word after the amount is not a unit, so it's part of the
+            # name and there is no alternate measurement to look for
+            return self.ureg.Quantity(tokens.amount), tokens.remainder
+
+        quantity = self.ureg.Quantity(tokens.amount, units)
+        if tokens.alt_amount is not None:
+            alt_units = (
+                self.parse_unit(tokens.alt_unit) if tokens.alt_unit else None)
+            alt_quantity = self.ureg.Quantity(tokens.alt_amount, alt_units)
             # prefer measurements of mass; otherwise use the first measurement
-            if (str(quantity_c.dimensionality) == '[mass]' and
-                    str(quantity_a.dimensionality) != '[mass]'):
-                return Ingredient(quantity_c, remainder_c, id_, self.ureg, self.nlp)
-            else:
-                return Ingredient(quantity_a, remainder_c, id_, self.ureg, self.nlp)
-
-        return Ingredient(quantity_a, remainder_a, id_, self.ureg, self.nlp)
+            if (str(alt_quantity.dimensionality) == '[mass]' and
+                    str(quantity.dimensionality) != '[mass]'):
+                return alt_quantity, tokens.name
+        return quantity, tokens.name
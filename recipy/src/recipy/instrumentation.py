@@ -0,0 +1,123 @@
+"""
+Count calls and time spent in each stage of fetching and parsing recipes.
+
+Counting is off by default, and then stage() costs about one function
+call. Turn it on with enable(), or by setting the RECIPY_INSTRUMENT
+environment variable to anything but '', '0' or 'false', and read the
+counters with snapshot():
+
+    instrumentation.enable()
+    recipy.parse(ingredients, instructions)
+    instrumentation.snapshot()['spacy']  # {'calls': 2, 'seconds': 0.031}
+
+Tracing messages go through the standard logging module instead, under the
+'recipy' logger and its children.
+"""
+
+import contextlib
+import os
+import threading
+import time
+
+
+STAGES = (
+    'fetch',  # downloading pages
+    'html_parse',  # building the DOM of a page
+    'spacy',  # running the spacy pipeline on text that isn't cached
+    'clause_split',  # splitting sentences into clauses
+    'reference_resolution',  # matching words to ingredients and steps
+    'serialization'  # turning a Recipe into a JSON payload
+)
+
+_enabled = os.environ.get('RECIPY_INSTRUMENT', '').strip().lower() not in (
+    '', '0', 'false')
+_lock = threading.Lock()
+_calls = dict.fromkeys(STAGES, 0)
+_seconds = dict.fromkeys(STAGES, 0.0)
+# returned by stage() while counting is off
+_NOT_COUNTING = contextlib.nullcontext()
+
+
+def enable():
+    """Start counting."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop counting. The counts so far are kept."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Set every counter back to 0."""
+    with _lock:
+        for name in STAGES:
+            _calls[name] = 0
+            _seconds[name] = 0.0
+
+
+def record(name, seconds):
+    """Add one call that took some seconds to a stage's counters.
+
+    Args:
+        name (str): one of STAGES
+        seconds (float): time the call took
+    """
+    with _lock:
+        _calls[name] += 1
+        _seconds[name] += seconds
+
+
+class _Timer:
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """Time a block of code as part of a stage, if counting is on.
+
+        with instrumentation.stage('spacy'):
+            doc = nlp(text)
+
+    Time spent in concurrent blocks, like overlapping downloads, adds up.
+
+    Args:
+        name (str): one of STAGES
+
+    Returns:
+        a context manager
+    """
+    if not _enabled:
+        return _NOT_COUNTING
+    if name not in _calls:
+        raise ValueError(f'unknown stage {name!r}')
+    return _Timer(name)
+
+
+def snapshot():
+    """Get the counters of every stage.
+
+    Returns:
+        dict: {stage: {'calls': int, 'seconds': float}}
+    """
+    with _lock:
+        return {
+            name: {'calls': _calls[name], 'seconds': _seconds[name]}
+            for name in STAGES}
@@ -0,0 +1,159 @@
+"""
+Read the schema.org Recipe that many sites embed as JSON-LD, without
+parsing the rest of the page.
+"""
+
+import codecs
+import html as html_lib
+import json
+import re
+
+
+_SCRIPT = (
+    r'''<script[^>]*\btype\s*=\s*["']?application/ld\+json["']?[^>]*>'''
+    r'(.*?)</script\s*>')
+_SCRIPT_TEXT = re.compile(_SCRIPT, re.IGNORECASE | re.DOTALL)
+_SCRIPT_BYTES = re.compile(_SCRIPT.encode('ascii'), re.IGNORECASE | re.DOTALL)
+_META_CHARSET = re.compile(
+    rb'''<meta[^>]+charset\s*=\s*["']?([\w-]+)''', re.IGNORECASE)
+_TAG = re.compile(r'<[^>]+>')
+_SPACE = re.compile(r'\s+')
+_SPACE_BEFORE_PUNCTUATION = re.compile(r'\s+([.,;:!?])')
+
+
+def iter_json_ld(html, encoding=None):
+    """Yield the JSON objects in a page's ld+json script blocks.
+
+    Blocks that aren't valid JSON are skipped.
+
+    Args:
+        html (str or bytes): the page's HTML
+        encoding (str): charset to decode bytes with. Defaults to the
+            <meta charset> of the page, or UTF-8.
+
+    Yields:
+        dict or list: each parsed block
+    """
+    if isinstance(html, bytes):
+        encoding = encoding or sniff_encoding(html)
+        blocks = (
+            block.decode(encoding, errors='replace')
+            for block in _SCRIPT_BYTES.findall(html))
+    else:
+        blocks = _SCRIPT_TEXT.findall(html)
+    for block in blocks:
+        try:
+            # some sites leave raw newlines and tabs inside strings
+            yield json.loads(block, strict=False)
+        except ValueError:
+            continue
+
+
+def sniff_encoding(html):
+    """Get the charset a page declares in its head, or UTF-8.
+
+    Args:
+        html (bytes): the page's HTML
+
+    Returns:
+        str: name of a known codec
+    """
+    match = _META_CHARSET.search(html, 0, 4096)
+    if match:
+        encoding = match.group(1).decode('ascii')
+        try:
+            codecs.lookup(encoding)
+            return encoding
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+def find_recipe_object(data):
+    """Find the first object with @type Recipe in parsed JSON-LD.
+
+    Looks through lists and @graph containers.
+
+    Args:
+        data (dict or list): a parsed JSON-LD block
+
+    Returns:
+        dict, or None if there is no Recipe
+    """
+    if isinstance(data, list):
+        for item in data:
+            recipe = find_recipe_object(item)
+            if recipe is not None:
+                return recipe
+        return None
+    if not isinstance(data, dict):
+        return None
+    types = data.get('@type', ())
+    if isinstance(types, str):
+        types = (types,)
+    if 'Recipe' in types:
+        return data
+    return find_recipe_object(data.get('@graph', []))
+
+
+def clean_text(text):
+    """Strip markup, entities and extra whitespace from a JSON-LD string."""
+    text = html_lib.unescape(_TAG.sub(' ', text))
+    text = _SPACE_BEFORE_PUNCTUATION.sub(r'\1', text)
+    return _SPACE.sub(' ', text).strip()
+
+
+def iter_instructions(instructions):
+    """Yield the text of each step in a recipeInstructions value.
+
+    It may be one string, a list of strings, HowToStep objects, or
+    HowToSection objects containing any of those.
+
+    Args:
+        instructions (str, dict or list): the recipeInstructions value
+
+    Yields:
+        str: text of each step
+    """
+    if isinstance(instructions, str):
+        text = clean_text(instructions)
+        if text:
+            yield text
+    elif isinstance(instructions, list):
+        for item in instructions:
+            yield from iter_instructions(item)
+    elif isinstance(instructions, dict):
+        if 'itemListElement' in instructions:
+            yield from iter_instructions(instructions['itemListElement'])
+        else:
+            yield from iter_instructions(
+                instructions.get('text') or instructions.get('name') or '')
+
+
+def extract_recipe(html, encoding=None):
+    """Get the ingredients and instructions of a page's JSON-LD Recipe.
+
+    Args:
+        html (str or bytes): the page's HTML
+        encoding (str): charset to decode bytes with, if known
+
+    Returns:
+        (list[str], list[str]) tuple of ingredient lines and instruction
+        steps, or None if the page has no Recipe with both
+    """
+    for data in iter_json_ld(html, encoding):
+        recipe = find_recipe_object(data)
+        if recipe is None:
+            continue
+        ingredients = recipe.get('recipeIngredient') or recipe.get(
+            'ingredients') or []
+        if isinstance(ingredients, str):
+            ingredients = [ingredients]
+        ingredients = [
+            clean_text(line) for line in ingredients if isinstance(line, str)]
+        ingredients = [line for line in ingredients if line]
+        instructions = list(
+            iter_instructions(recipe.get('recipeInstructions', [])))
+        if ingredients and instructions:
+            return ingredients, instructions
+    return None
@@ -0,0 +1,98 @@
+"""
+Word lists that the parser checks tokens against.
+"""
+
+import importlib.resources
+import os
+
+
+NON_FOODS_PATH = os.path.join(os.path.dirname(__file__), 'not_a_food.txt')
+
+
+class Lexicon:
+
+    def __init__(self, path=None, words=(), watch=False):
+        """A set of lowercase words, read from a file with one word per line.
+
+        Args:
+            path (str): file to read the words from, if any
+            words (iterable[str]): words to use when there's no file
+            watch (bool): if True, check() reloads the file when it has
+                been modified since it was last read
+        """
+        self.path = path
+        self.watch = watch
+        self.mtime = None
+        self.words = frozenset(word.lower() for word in words)
+        if path is not None:
+            self.load()
+
+    @classmethod
+    def from_resource(cls, package, resource):
+        """Read a lexicon that's distributed as a package resource.
+
+        Args:
+            package (str): name of the package, e.g. 'recipy'
+            resource (str): name of the file in the package
+
+        Returns:
+            Lexicon
+        """
+        try:
+            text = importlib.resources.files(package).joinpath(
+                resource).read_text(encoding='utf-8')
+        except AttributeError:  # python < 3.9
+            text = importlib.resources.read_text(package, resource)
+        return cls(words=text.split())
+
+    def load(self):
+        """Read the words from self.path."""
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, encoding='utf-8') as file:
+            self.words = frozenset(
+                line.strip().lower() for line in file if line.strip())
+        self.mtime = mtime
+
+    def check(self):
+        """Reload the file if it's being watched and has changed.
+
+        Returns:
+            bool: True if the words were reloaded
+        """
+        if (self.watch and self.path is not None and
+                os.path.getmtime(self.path) != self.mtime):
+            self.load()
+            return True
+        return False
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+
+# lexicons loaded so far, by absolute path
+_lexicons = {}
+
+
+def load_lexicon(path=NON_FOODS_PATH, watch=False):
+    """Return the Lexicon for a file, reading it only the first time.
+
+    Args:
+        path (str): file with one word per line. Defaults to the list of
+            words that are not foods.
+        watch (bool): see Lexicon
+
+    Returns:
+        Lexicon: shared by every caller that asks for the same path
+    """
+    path = os.path.abspath(path)
+    if path not in _lexicons:
+        _lexicons[path] = Lexicon(path, watch=watch)
+    elif watch:
+        _lexicons[path].watch = True
+    return _lexicons[path]
@@ -1,4 +1,6 @@
 class Node:
 
+    __slots__ = ('id',)
+
     def __init__(self, id_):
         self.id = id_
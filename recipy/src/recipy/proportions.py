@@ -0,0 +1,161 @@
+"""
+Work out what share of a recipe each ingredient is, by volume, for one
+recipe or for thousands at once.
+"""
+
+import numpy as np
+
+from .units import MASS, VOLUME
+
+
+# grams per milliliter, so ingredients measured by mass can be compared to
+# those measured by volume. Names are matched as substrings of ingredient
+# names, longest first, so 'brown sugar' wins over 'sugar'.
+DENSITIES = {
+    'all-purpose flour': 0.53,
+    'almond flour': 0.40,
+    'baking powder': 0.90,
+    'baking soda': 0.92,
+    'brown sugar': 0.93,
+    'butter': 0.96,
+    'cheese': 0.45,
+    'chocolate chips': 0.68,
+    'cocoa': 0.42,
+    'cornstarch': 0.54,
+    'cream': 1.00,
+    'flour': 0.53,
+    'honey': 1.42,
+    'maple syrup': 1.32,
+    'milk': 1.03,
+    'oats': 0.38,
+    'oil': 0.92,
+    'powdered sugar': 0.56,
+    'rice': 0.78,
+    'salt': 1.22,
+    'sugar': 0.85,
+    'vinegar': 1.01,
+    'water': 1.00,
+    'yogurt': 1.04
+}
+
+
+def density_of(name, densities=DENSITIES):
+    """Look up the density of an ingredient by name.
+
+    Args:
+        name (str): the ingredient name, e.g. 'packed light brown sugar'
+        densities (dict): grams per milliliter by name
+
+    Returns:
+        float: grams per milliliter, or nan if it isn't known
+    """
+    for key in sorted(densities, key=len, reverse=True):
+        if key in name:
+            return densities[key]
+    return np.nan
+
+
+def volumes(magnitudes, codes, unit_codes, densities=None):
+    """Convert amounts to milliliters.
+
+    Args:
+        magnitudes (numpy.ndarray): amounts
+        codes (numpy.ndarray): unit code of each amount, from unit_codes
+        unit_codes (UnitCodes): the codes' dimensions and factors
+        densities (numpy.ndarray): optional, grams per milliliter of each
+            ingredient, nan if unknown. If given, amounts of mass with a
+            known density are converted too.
+
+    Returns:
+        numpy.ndarray: milliliters of each ingredient, nan if it can't be
+            measured by volume
+    """
+    amounts, dimensions = unit_codes.to_base(magnitudes, codes)
+    result = np.where(dimensions == VOLUME, amounts, np.nan)
+    if densities is not None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            by_mass = amounts / densities
+        convert = (dimensions == MASS) & (densities > 0)
+        result = np.where(convert, by_mass, result)
+    return result
+
+
+def volume_fractions(milliliters, recipe_ids, recipe_count):
+    """Divide each ingredient's volume by the total of its recipe.
+
+    Args:
+        milliliters (numpy.ndarray): volume of each ingredient, nan for
+            ingredients that aren't counted
+        recipe_ids (numpy.ndarray): which recipe each ingredient is from,
+            numbered from 0
+        recipe_count (int): number of recipes
+
+    Returns:
+        numpy.ndarray: fraction of its recipe's volume that each ingredient
+            is, 0 for ingredients that aren't counted
+    """
+    counted = np.nan_to_num(milliliters, nan=0.0)
+    totals = np.bincount(recipe_ids, weights=counted, minlength=recipe_count)
+    denominators = totals[recipe_ids]
+    return np.divide(
+        counted, denominators,
+        out=np.zeros_like(counted), where=denominators > 0)
+
+
+def proportions(ingredient_lists, unit_codes, densities=DENSITIES):
+    """Work out each ingredient's share of its recipe by volume.
+
+    All the recipes are converted together, as flat arrays.
+
+    Args:
+        ingredient_lists (list[list[Ingredient]]): one list per recipe
+        unit_codes (UnitCodes): numbers the units of the quantities
+        densities (dict): optional, grams per milliliter by ingredient
+            name, to count ingredients measured by mass. If None, only
+            ingredients measured by volume are counted.
+
+    Returns:
+        list[numpy.ndarray]: fraction of each ingredient, one array per
+            recipe in the same order as ingredient_lists
+    """
+    ingredients = [
+        ingredient for recipe in ingredient_lists for ingredient in recipe]
+    lengths = [len(recipe) for recipe in ingredient_lists]
+    magnitudes, codes = unit_codes.encode(
+        ingredient.quantity for ingredient in ingredients)
+    if densities is None:
+        density_array = None
+    else:
+        # names repeat a lot across a corpus
+        by_name = {}
+        for ingredient in ingredients:
+            if ingredient.name not in by_name:
+                by_name[ingredient.name] = density_of(
+                    ingredient.name, densities)
+        density_array = np.array(
+            [by_name[ingredient.name] for ingredient in ingredients],
+            dtype=float)
+    recipe_ids = np.repeat(np.arange(len(lengths)), lengths)
+    fractions = volume_fractions(
+        volumes(magnitudes, codes, unit_codes, density_array),
+        recipe_ids, len(lengths))
+    return np.split(fractions, np.cumsum(lengths)[:-1])
+
+
+def set_percents(ingredient_lists, unit_codes, densities=DENSITIES):
+    """Set Ingredient.percent for the ingredients of each recipe.
+
+    Args:
+        ingredient_lists (list[list[Ingredient]]): one list per recipe
+        unit_codes (UnitCodes): numbers the units of the quantities
+        densities (dict): as in proportions
+
+    Returns:
+        None
+    """
+    if not ingredient_lists:
+        return
+    fractions = proportions(ingredient_lists, unit_codes, densities)
+    for recipe, recipe_fractions in zip(ingredient_lists, fractions):
+        for ingredient, fraction in zip(recipe, recipe_fractions):
+            ingredient.percent = float(fraction) * 100
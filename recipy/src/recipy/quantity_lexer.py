@@ -0,0 +1,156 @@
+"""
+Split the quantity off the front of an ingredient description.
+
+The whole grammar is compiled once, when the module is imported, and each
+ingredient line is classified with a single regular expression match.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+
+# single-character fractions and their values
+VULGAR_FRACTIONS = {
+    '½': 1 / 2,
+    '⅓': 1 / 3,
+    '⅔': 2 / 3,
+    '¼': 1 / 4,
+    '¾': 3 / 4,
+    '⅛': 1 / 8,
+    '⅜': 3 / 8,
+    '⅝': 5 / 8,
+    '⅞': 7 / 8
+}
+_VULGAR = '[' + ''.join(VULGAR_FRACTIONS) + ']'
+
+
+def _number(prefix):
+    """Return the pattern for a number, with group names starting with prefix.
+
+    Valid number formats:
+    integer: '2'
+    decimal: '1.5'
+    fraction: '1/3', '⅓'
+    mixed fraction: '2 1/2', '2 and 1/2', '2-1/2',
+                    '2½', '2 ½', '2 and ½', '2-½'
+    """
+    # '-' can also be a range, but if it's an integer followed by a
+    # fraction, it's safe to assume it's a mixed fraction.
+    return (
+        rf'(?:(?P<{prefix}_whole>\d+)'
+        rf'(?:(?: | and |-)(?P<{prefix}_num>\d+)/(?P<{prefix}_den>\d+)|'
+        rf'(?: | and |-)?(?P<{prefix}_vulgar>{_VULGAR}))|'
+        rf'(?P<{prefix}_fnum>\d+)/(?P<{prefix}_fden>\d+)|'
+        rf'(?P<{prefix}_fvulgar>{_VULGAR})|'
+        rf'(?P<{prefix}_decimal>\d+\.\d+)|'
+        rf'(?P<{prefix}_integer>\d+))')
+
+
+# names of the groups in each number pattern, in the order _value uses them
+_NUMBER_GROUPS = {
+    prefix: tuple(f'{prefix}_{name}' for name in (
+        'whole', 'num', 'den', 'vulgar', 'fnum', 'fden', 'fvulgar',
+        'decimal', 'integer'))
+    for prefix in 'narc'
+}
+
+_NUMBER = re.compile(_number('n'))
+
+_QUANTITY = re.compile(
+    # the first amount: '2', '1 1/2', '¾'
+    rf'(?P<amount>{_number("a")}) ?'
+    rf'(?:'
+    # a range of amounts: '- 3 cups flour', 'to 1 1/2 cups flour'
+    rf'(?:- ?|to )(?P<range>{_number("r")}) ?'
+    rf'(?P<range_unit>(?P<range_word>\S+)(?P<range_tail>.*))|'
+    # a unit, unless the amount is directly followed by an alternate
+    # measurement: 'cups', 'tsp.'
+    rf'(?:(?!\( ?(?:\d|{_VULGAR}))(?P<word>\S+) ?)?'
+    # an alternate measurement: '(226 grams)', '(1 packet)'
+    rf'(?: ?\((?P<alt>{_number("c")}) ?(?P<alt_word>[^\s)]+)?\))?'
+    rf'(?P<tail>.*)'
+    rf')')
+
+
+class QuantityTokens(NamedTuple):
+    """The pieces of an ingredient description that describe its quantity.
+
+    Whether the candidate unit word is really a unit is up to the caller,
+    so both possible names are kept: `name` if it is, `remainder` if not.
+    """
+    amount: float
+    unit: Optional[str]  # candidate unit word following the amount
+    name: str  # text following the unit word
+    remainder: str  # text starting at the unit word
+    range_amount: Optional[float] = None  # second amount of a range
+    alt_amount: Optional[float] = None  # amount of an alternate measurement
+    alt_unit: Optional[str] = None  # unit of an alternate measurement
+
+
+def _value(match, prefix):
+    """Get the value of a number matched by the _number(prefix) pattern."""
+    (whole, num, den, vulgar, fnum, fden, fvulgar, decimal,
+     integer) = match.group(*_NUMBER_GROUPS[prefix])
+    if whole is not None:
+        if vulgar is not None:
+            return float(whole) + VULGAR_FRACTIONS[vulgar]
+        return float(whole) + float(num) / float(den)
+    if fnum is not None:
+        return float(fnum) / float(fden)
+    if fvulgar is not None:
+        return VULGAR_FRACTIONS[fvulgar]
+    if decimal is not None:
+        return float(decimal)
+    return float(integer)
+
+
+def parse_number(text):
+    """Parse the number at the start of a string.
+
+    Args:
+        text (str): e.g. '2 1/2', '¾', '1.5 cups'
+
+    Returns:
+        float, or None if text does not start with a number
+    """
+    match = _NUMBER.match(text.strip())
+    if match:
+        return _value(match, 'n')
+    return None
+
+
+def lex_quantity(text):
+    """Split an ingredient description into quantity tokens.
+
+    Recognizes a plain amount ('2 cups flour'), a range of amounts
+    ('1 to 1 1/2 cups flour') and an amount followed by an alternate
+    measurement in parentheses ('2 cups (226 grams) flour').
+
+    Args:
+        text (str): the complete ingredient description
+
+    Returns:
+        QuantityTokens, or None if text does not start with an amount
+    """
+    text = text.strip()
+    match = _QUANTITY.match(text)
+    if not match:
+        return None
+
+    range_word, word, alt = match.group('range_word', 'word', 'alt')
+    if range_word is not None:
+        return QuantityTokens(
+            _value(match, 'a'), range_word, match['range_tail'].strip(),
+            match['range_unit'], _value(match, 'r'))
+
+    if word is None and alt is None:
+        # an amount on its own doesn't describe an ingredient
+        return None
+
+    tail = match['tail'].strip()
+    remainder = text[match.start('word'):] if word is not None else tail
+    if alt is None:
+        return QuantityTokens(_value(match, 'a'), word, tail, remainder)
+    return QuantityTokens(
+        _value(match, 'a'), word, tail, remainder, None,
+        _value(match, 'c'), match['alt_word'])
@@ -2,8 +2,33 @@
 
 class Recipe:
 
-    def __init__(self, ingredients, graph, orig_ingredients, orig_instructions, ureg, nlp):
+    def __init__(self, ingredients, graph, orig_ingredients, orig_instructions,
+                 ureg, nlp, document=None):
+        """
+        Represent a parsed recipe.
+
+        Args:
+            ingredients (list[Ingredient]): the recipe's ingredients
+            graph (list[Step]): the recipe's steps, in order
+            orig_ingredients (list[str]): the original ingredient text, if known
+            orig_instructions (str): the original instruction text
+            ureg (pint.UnitRegistry): shared across all Recipes
+            nlp (spacy.Language): shared across all Recipes
+            document (spacy.Doc): the processed instructions, if available
+        """
         self.ingredients = ingredients
         self.graph = graph
+        self.orig_ingredients = orig_ingredients
+        self.orig_instructions = orig_instructions
+        self.document = document
         self.ureg = ureg
         self.nlp = nlp
+
+    def as_dict(self):
+        """Return a dictionary representation of self, for JSON responses."""
+        return {
+            'nodes': {
+                node.id: node.as_dict()
+                for node in self.ingredients + self.graph},
+            'full_text': [token.text for token in self.document]
+        }
@@ -1,22 +1,93 @@
-import numpy as np
+import logging
 
+from . import instrumentation
+from .lexicon import load_lexicon
+from .recipe import Recipe
+from .reference_index import ReferenceIndex
+from .similarity import SimilarityIndex
 from .step import Step
 from . import spacy_helpers as sh
 
 
+logger = logging.getLogger(__name__)
+
+
 class RecipeParser:
 
-    def __init__(self, ureg, nlp):
+    def __init__(self, ureg, nlp, non_foods=None, similarity_threshold=None):
+        """
+        Args:
+            ureg (pint.UnitRegistry): shared across all Recipes
+            nlp (spacy.Language): shared across all Recipes
+            non_foods (Lexicon): optional, words that never refer to an
+                ingredient. Defaults to the shared not_a_food.txt lexicon.
+            similarity_threshold (float): optional. If given, a reference
+                that shares no words with any ingredient is matched to the
+                step whose ingredients are most similar to it, if that
+                similarity is at least this.
+        """
         self.ureg = ureg
         self.nlp = nlp
+        self.non_foods = non_foods if non_foods is not None else load_lexicon()
+        self.similarity_threshold = similarity_threshold
+        self._similarity = None
+
+    @property
+    def similarity(self):
+        """The SimilarityIndex of the recipe being parsed.
+
+        It's only built the first time a reference is matched by
+        similarity, so parses without a similarity_threshold never compute
+        the ingredient vectors.
+        """
+        if self._similarity is None:
+            self._similarity = SimilarityIndex(self.ingredients)
+            for step in self.graph:
+                self._similarity.add_step(step)
+        return self._similarity
+
+    def parse(self, ingredients, instructions, fulltext=None):
+        """Parse recipe instructions into a graph of Steps.
+
+        Args:
+            ingredients (list[Ingredient]): the recipe's ingredients
+            instructions (str): the full text of the instructions
+
+        Returns:
+            Recipe: the finished recipe graph
+        """
+        for _ in self.iter_steps(ingredients, instructions):
+            pass
+        return self.recipe
+
+    def iter_steps(self, ingredients, instructions):
+        """Parse recipe instructions, yielding each Step as it's resolved.
 
-    def parse(self, ingredients, instructions, fulltext):
+        Once the generator is exhausted, self.recipe holds the finished
+        Recipe, for callers that need the whole graph as well.
+
+        Args:
+            ingredients (list[Ingredient]): the recipe's ingredients
+            instructions (str): the full text of the instructions
+
+        Yields:
+            Step: each step of the recipe, in order
+        """
         # The graph is a list of nodes,
         # each one being the root of a different connected component.
         # It is updated as the graph grows and connects.
         # New Nodes may only be connected to Nodes that are in this list
         # at the time they are instantiated.
         graph = []
+        self.non_foods.check()
+        self.ingredients = ingredients
+        self.ingredients_by_id = {
+            ingredient.id: ingredient for ingredient in ingredients}
+        self.graph = graph
+        self.recipe = None
+        # built once per recipe and updated as each step is added
+        self.index = ReferenceIndex(ingredients)
+        self._similarity = None
 
         document = self.nlp(instructions)
         # displacy.serve(self.document)
@@ -29,6 +100,14 @@ class RecipeParser:
                 node_id += 1
                 current_ref = step
                 graph.append(step)
+                self.index.add_step(step)
+                if self._similarity is not None:
+                    self._similarity.add_step(step)
+                yield step
+
+        self.recipe = Recipe(
+            ingredients, graph, None, instructions, self.ureg, self.nlp,
+            document=document)
 
     def yield_clauses(self, doc):
         """Iterate through clauses in a document.
@@ -40,7 +119,8 @@ class RecipeParser:
 
         """
         def yield_clauses_from_sentence(sent):
-            head, tail = sh.split_conjuncts(sent)
+            with instrumentation.stage('clause_split'):
+                head, tail = sh.split_conjuncts(sent)
             yield head
             if tail:
                 yield from yield_clauses_from_sentence(tail)
@@ -61,7 +141,7 @@ class RecipeParser:
         Returns:
             Step node object
         """
-        print('parsing clause:', clause)
+        logger.debug('parsing clause: %s', clause)
         # Most sentences in recipes are commands
         # Ideally spacy will have identified the imperative verb as the sentence root
         all_matches = []
@@ -71,8 +151,7 @@ class RecipeParser:
             dobjs = sh.get_direct_objects(clause.root)
             # prepositional objects: verb --prep--> _ --pobj--> noun
             pobjs = sh.get_prepositional_objects(clause.root)
-            print('dobjs:', dobjs)
-            print('pobjs:', pobjs)
+            logger.debug('dobjs: %s, pobjs: %s', dobjs, pobjs)
 
             # has dobj?   dobj matches?  has pobj?   pobj matches?
             #  yes           yes           yes           yes       use both
@@ -99,15 +178,17 @@ class RecipeParser:
                     all_matches.append(Match(name, node, 'pobj'))
 
             # infer that it's implicitly referring to the stored reference
-            if not dobjs:
+            # (there is none yet for the first step)
+            if not dobjs and current_ref is not None:
                 all_matches.append(Match([], current_ref, 'implicit'))
-            print('matches:', all_matches)
+            logger.debug('matches: %s', all_matches)
             if all_matches:
                 new_step = Step(
                     id_=node_id,
                     span=clause,
                     verb_index=clause.root.i,
                     matches=all_matches,
+                    recipe_ingredients=self.ingredients_by_id,
                 )
                 return new_step
 
@@ -123,9 +204,7 @@ class RecipeParser:
         Returns:
             boolean: True if imperative, False if not
         """
-        print('is imperative?', token)
-        print(token.tag_)
-        print([child.dep_ == 'nsubj' for child in token.children])
+        logger.debug('is imperative? %s (%s)', token, token.tag_)
         if (token.tag_ == 'VB' and
                 sum([child.dep_ == 'nsubj' for child in token.children]) == 0):
             return True
@@ -139,13 +218,12 @@ class RecipeParser:
         Returns:
             list[Match]: a list of Match objects
         """
+        with instrumentation.stage('reference_resolution'):
+            return self._identify_object(token)
 
-        non_foods = set()
-        with open('/Users/emily/recipe-parser/mysite/recipedia/not_a_food.txt') as file:
-            for line in file:
-                non_foods.add(line.strip())
-
-        if token.text in non_foods:
+    def _identify_object(self, token):
+        if (token.text.lower() in self.non_foods or
+                token.lemma_.lower() in self.non_foods):
             return []
 
         name = []
@@ -160,45 +238,33 @@ class RecipeParser:
 
         name.append(token)
 
-        matches = []
-        max_count = 0
         # Find the node(s) with the best matching ingredients
         # Determined by how many of the words in the reference are in the ingredient name
-        for ingredient in self.ingredients:
-            # compare by lemma
-            # lemma is the root form of the word
-            match_count = ingredient.num_matching_words(
-                [word.lemma_.lower() for word in name])
-            if match_count > max_count:
-                matches = [(name, ingredient)]
-                max_count = match_count
-            elif match_count > 0 and match_count == max_count:
-                matches.append((name, ingredient))
-
-        for step in self.graph:
-            for ingredient in step.ingredients:
-                # compare by lemma
-                # lemma is the root form of the word
-                match_count = ingredient.num_matching_words(
-                    [word.lemma_ for word in name])
-                if match_count > max_count:
-                    matches = [(name, step)]
-                    max_count = match_count
-                elif match_count > 0 and match_count == max_count:
-                    matches.append((name, step))
-
-        # make this return a list of matches
-        return matches
-
-    def best_matching_node(self, token):
-
-        scores = [node.max_base_similarity(token) for node in self.graph]
-        if max(scores) >= 0.7:
-            # return the node with the highest score
-            match = self.graph[np.argmax(np.array(scores))]
-        else:
-            # if all the scores are low, the token likely isn't an ingredient
-            return None
+        # compare by lemma
+        # lemma is the root form of the word
+        nodes = self.index.best_matches(
+            [word.lemma_.lower() for word in name],
+            [word.lemma_ for word in name])
+        if not nodes and self.similarity_threshold is not None:
+            node = self.best_matching_node(token, self.similarity_threshold)
+            if node is not None:
+                nodes = [node]
+        return [(name, node) for node in nodes]
+
+    def best_matching_node(self, token, threshold=0.7):
+        """Find the step whose ingredients are most similar to a token.
+
+        Each step scores as its max_base_similarity, computed for all the
+        steps at once.
+
+        Args:
+            token (spacy.Token): token to identify
+            threshold (float): lowest similarity that counts as a match
+        Returns:
+            Step: the step with the highest score, or None if all the scores
+                are low, since then the token likely isn't an ingredient
+        """
+        return self.similarity.best_step(token, threshold)
 
     def __str__(self):
         return self.text
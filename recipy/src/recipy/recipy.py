@@ -1,12 +1,196 @@
+import logging
+import threading
+
 import pint
 import spacy
 
+from . import instrumentation
+from .doc_cache import CachedPipeline, DocCache
+from .ingredient_parser import IngredientParser
+from .recipe_parser import RecipeParser
+from .units import UnitResolver
+
+
+# Components of the spacy pipeline that each kind of text needs.
+# attribute_ruler maps the fine-grained tags to the coarse POS tags that
+# spacy_helpers.get_top_noun looks at.
+PIPELINE_PROFILES = {
+    # short names like 'shredded cheddar cheese', which are averaged and
+    # clustered by the lemma of their base noun
+    'ingredients': (
+        'tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer', 'parser'),
+    # instruction text, where references are matched by lemma
+    'instructions': (
+        'tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer', 'parser')
+}
+
+# components that no profile uses, so they are never loaded
+EXCLUDED_COMPONENTS = ['ner']
+
+logger = logging.getLogger(__name__)
+
+
+class Pipeline:
+
+    def __init__(self, nlp, components):
+        """Run a shared spacy.Language with only some of its components.
+
+        This works like nlp.select_pipes, but per call, so pipelines with
+        different components can share one loaded model.
+
+        Args:
+            nlp (spacy.Language): the loaded model
+            components (iterable[str]): names of the components to run
+        """
+        self.nlp = nlp
+        self.components = tuple(
+            name for name in nlp.pipe_names if name in components)
+        self.disable = [
+            name for name in nlp.pipe_names if name not in components]
+
+    def __call__(self, text):
+        with instrumentation.stage('spacy'):
+            return self.nlp(text, disable=self.disable)
+
+    def pipe(self, texts, **kwargs):
+        """Process many texts.
+
+        Returns:
+            list[spacy.Doc]: in the same order as texts
+        """
+        with instrumentation.stage('spacy'):
+            return list(
+                self.nlp.pipe(texts, disable=self.disable, **kwargs))
+
+    @property
+    def vocab(self):
+        return self.nlp.vocab
+
+    @property
+    def meta(self):
+        return self.nlp.meta
+
 
 class Recipy:
 
-    def __init__(self):
-        """Instantiate NLP package and unit registry to use in Recipes"""
-        print('Loading spacy package...')
-        self.nlp = spacy.load('en_core_web_md')  # this takes a couple seconds
-        print('done.')
-        self.ureg = pint.UnitRegistry()
+    def __init__(self, model='en_core_web_md', cache_dir=None,
+                 cache_size=4096):
+        """Instantiate NLP package and unit registry to use in Recipes.
+
+        Both are loaded the first time they're used, not here.
+
+        Args:
+            model (str): name of the spacy package to load
+            cache_dir (str): optional, where to keep processed Docs on disk
+                so unchanged text is never run through the model twice
+            cache_size (int): number of processed Docs to keep in memory
+        """
+        self.model = model
+        self.doc_cache = DocCache(cache_dir, cache_size)
+        self._nlp = None
+        self._ureg = None
+        self._units = None
+        self._pipelines = {}
+        # lets several threads share one Recipy
+        self._lock = threading.RLock()
+
+    @property
+    def nlp(self):
+        """The spacy model, loaded without any unused components."""
+        with self._lock:
+            if self._nlp is None:
+                logger.info('Loading spacy package %s...', self.model)
+                # this takes a couple seconds
+                self._nlp = spacy.load(
+                    self.model, exclude=EXCLUDED_COMPONENTS)
+                logger.info('done.')
+        return self._nlp
+
+    @property
+    def ureg(self):
+        with self._lock:
+            if self._ureg is None:
+                self._ureg = pint.UnitRegistry()
+        return self._ureg
+
+    @property
+    def units(self):
+        with self._lock:
+            if self._units is None:
+                self._units = UnitResolver(self.ureg)
+        return self._units
+
+    def pipeline(self, profile):
+        """Get the Pipeline for one of the PIPELINE_PROFILES.
+
+        Args:
+            profile (str): 'ingredients' or 'instructions'
+
+        Returns:
+            CachedPipeline: the Pipeline, behind the shared DocCache
+        """
+        with self._lock:
+            if profile not in self._pipelines:
+                self._pipelines[profile] = CachedPipeline(
+                    Pipeline(self.nlp, PIPELINE_PROFILES[profile]),
+                    self.doc_cache)
+        return self._pipelines[profile]
+
+    def ingredient_parser(self):
+        """Return an IngredientParser that uses the 'ingredients' profile."""
+        return IngredientParser(
+            self.ureg, self.pipeline('ingredients'), self.units)
+
+    def recipe_parser(self):
+        """Return a RecipeParser that uses the 'instructions' profile."""
+        return RecipeParser(self.ureg, self.pipeline('instructions'))
+
+    def parse(self, ingredients, instructions):
+        """Parse a recipe from its ingredient lines and instructions.
+
+        Args:
+            ingredients (list[str]): ingredient descriptions, one per line
+            instructions (str): the full text of the instructions
+
+        Returns:
+            Recipe
+        """
+        for _, recipe in self.iter_parse(ingredients, instructions):
+            pass
+        return recipe
+
+    def iter_parse(self, ingredients, instructions):
+        """Parse a recipe, yielding each part of it as soon as it's ready.
+
+        Lets a caller show the ingredients while the instructions are still
+        being parsed.
+
+        Args:
+            ingredients (list[str]): ingredient descriptions, one per line
+            instructions (str): the full text of the instructions
+
+        Yields:
+            tuple: (kind, value) pairs, in this order:
+                ('ingredient', Ingredient) for each ingredient
+                ('instructions', spacy.Doc) once the instructions are
+                    processed, before the first step
+                ('step', Step) for each step
+                ('recipe', Recipe) for the finished recipe, last
+        """
+        ingredient_nodes = self.ingredient_parser().parse_ingredients(
+            ingredients)
+        for ingredient in ingredient_nodes:
+            yield 'ingredient', ingredient
+
+        recipe_parser = self.recipe_parser()
+        document = None
+        for step in recipe_parser.iter_steps(ingredient_nodes, instructions):
+            if document is None:
+                document = step.span.doc
+                yield 'instructions', document
+            yield 'step', step
+        recipe = recipe_parser.recipe
+        recipe.orig_ingredients = ingredients
+        if document is None:
+            yield 'instructions', recipe.document
+        yield 'recipe', recipe
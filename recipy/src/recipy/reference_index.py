@@ -0,0 +1,116 @@
+"""
+Look up which ingredients and steps a reference in the instructions could
+be talking about.
+"""
+
+import re
+from collections import Counter
+
+
+class ReferenceIndex:
+
+    def __init__(self, ingredients):
+        """Index the words of a recipe's ingredient names.
+
+        A word matches an ingredient if the word is at least 3 characters
+        long and is a substring of the ingredient name, the same rule as
+        Ingredient.num_matching_words.
+
+        Args:
+            ingredients (list[Ingredient]): the recipe's ingredients
+        """
+        self.ingredients = list(ingredients)
+        self.positions = {
+            ingredient: position
+            for position, ingredient in enumerate(self.ingredients)}
+        # word -> positions of the ingredients whose names contain it
+        self.postings = {}
+        for ingredient in self.ingredients:
+            for word in re.findall(r'\w+', ingredient.name):
+                self.lookup(word)
+
+        self.steps = []
+        # position of ingredient -> positions of the steps that include it
+        self.step_postings = [[] for _ in self.ingredients]
+
+    def lookup(self, word):
+        """Return the positions of the ingredients whose names contain word.
+
+        Args:
+            word (str): a word from a reference
+
+        Returns:
+            tuple[int]: positions in self.ingredients, in ascending order
+        """
+        try:
+            return self.postings[word]
+        except KeyError:
+            pass
+        if len(word) > 2:
+            positions = tuple(
+                position for position, ingredient
+                in enumerate(self.ingredients) if word in ingredient.name)
+        else:
+            positions = ()
+        self.postings[word] = positions
+        return positions
+
+    def add_step(self, step):
+        """Index a step that was just added to the recipe graph.
+
+        Args:
+            step (Step): the new step
+
+        Returns:
+            None
+        """
+        order = len(self.steps)
+        self.steps.append(step)
+        for ingredient in step.ingredients:
+            position = self.positions.get(ingredient)
+            if position is not None:
+                self.step_postings[position].append(order)
+
+    def best_matches(self, ingredient_words, step_words):
+        """Find the nodes whose ingredients match the most words.
+
+        Ingredients are scored by the number of ingredient_words in their
+        names. Steps are scored once for each of their ingredients, by the
+        number of step_words in its name. Every node with the top score is
+        returned, ingredients first, then steps in the order they were
+        added. A step appears once for each of its ingredients that has the
+        top score.
+
+        Args:
+            ingredient_words (list[str]): words to score ingredients with
+            step_words (list[str]): words to score steps with
+
+        Returns:
+            list[Node]: the best matching nodes, empty if nothing matched
+        """
+        ingredient_counts = Counter()
+        for word in ingredient_words:
+            ingredient_counts.update(self.lookup(word))
+        step_counts = Counter()
+        for word in step_words:
+            for position in self.lookup(word):
+                if self.step_postings[position]:
+                    step_counts[position] += 1
+
+        max_count = max(
+            max(ingredient_counts.values(), default=0),
+            max(step_counts.values(), default=0))
+        if max_count == 0:
+            return []
+
+        matches = [
+            self.ingredients[position]
+            for position in sorted(ingredient_counts)
+            if ingredient_counts[position] == max_count]
+
+        step_orders = []
+        for position, count in step_counts.items():
+            if count == max_count:
+                step_orders += self.step_postings[position]
+        matches += [self.steps[order] for order in sorted(step_orders)]
+        return matches
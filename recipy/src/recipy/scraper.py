@@ -1,10 +1,15 @@
-import requests
+import logging
 import re
 import bs4
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
+from .dom_index import DOMIndex
+from .fetch import FetchError, fetch, fetch_all
+from .json_ld import extract_recipe
+from . import instrumentation
 
-headers = {'User-Agent': 'Mozilla/5.0 (compatible)'}
+
+logger = logging.getLogger(__name__)
 
 
 def scrape_google_search(query):
@@ -17,7 +22,7 @@ def scrape_google_search(query):
         list(str): list of URLs
     """
     search_url = f'https://www.google.com/search?q={query.replace(" ", "+")}'
-    response = requests.get(search_url, headers=headers)
+    response = fetch(search_url)
     soup = BeautifulSoup(response.text, 'lxml')
 
     urls = []
@@ -33,36 +38,36 @@ def scrape_google_search(query):
     return urls
 
 
-def scrape_allrecipes(soup):
-    ingredient_tags = soup.find_all(
+def scrape_allrecipes(index):
+    ingredient_tags = index.find_all(
         'span', class_='ingredients-item-name')
-    instruction_tags = soup.find(
+    instruction_tags = index.find(
         'ul', class_='instructions-section').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_bbc_good_food(soup):
-    ingredient_tags = soup.find(
+def scrape_bbc_good_food(index):
+    ingredient_tags = index.find(
         'section', class_='recipe__ingredients').find_all('li')
-    instruction_tags = soup.find(
+    instruction_tags = index.find(
         'section', class_='recipe__method-steps').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_delish(soup):
-    ingredient_tags = soup.find_all('div', class_='ingredient-item')
-    instruction_tags = soup.find(
+def scrape_delish(index):
+    ingredient_tags = index.find_all('div', class_='ingredient-item')
+    instruction_tags = index.find(
         'div', class_='direction-lists').find_all('li')
     return ingredient_tags, instruction_tags
 
 
-def scrape_epicurious(soup):
-    ingredient_tags = soup.find_all('li', class_='ingredient')
-    instruction_tags = soup.find_all('p', class_='preparation_step')
+def scrape_epicurious(index):
+    ingredient_tags = index.find_all('li', class_='ingredient')
+    instruction_tags = index.find_all('p', class_='preparation_step')
     if not instruction_tags:
-        instruction_tags = soup.find_all('li', class_='preparation_step')
+        instruction_tags = index.find_all('li', class_='preparation_step')
 
-    # ingredient_section = soup.find(
+    # ingredient_section = index.find(
     #     'div', class_='recipe__ingredient-list').find('div')
     # ingredient_numbers = ingredient_section.find_all('p')
     # ingredient_names = ingredient_section.find_all('div')
@@ -70,155 +75,155 @@ def scrape_epicurious(soup):
     return ingredient_tags, instruction_tags
 
 
-def scrape_fine_cooking(soup):
-    ingredient_tags = soup.find(
+def scrape_fine_cooking(index):
+    ingredient_tags = index.find(
         'div', class_='recipe__ingredients').find_all('li')
-    instruction_tags = soup.find(
+    instruction_tags = index.find(
         'div', class_='recipe__preparation').find_all('li')
     return ingredient_tags, instruction_tags
 
 
-def scrape_food(soup):
-    ingredient_tags = soup.find_all(
+def scrape_food(index):
+    ingredient_tags = index.find_all(
             'div', class_='recipe-ingredients__ingredient')
-    instruction_tags = soup.find_all(
+    instruction_tags = index.find_all(
             'li', class_='recipe-directions__step')
     return ingredient_tags, instruction_tags
 
 
-def scrape_food_52(soup):
-    ingredient_tags = soup.find(
+def scrape_food_52(index):
+    ingredient_tags = index.find(
         'div', class_='recipe__list--ingredients').find_all('li')
-    instruction_tags = soup.find_all('li', class_='recipe__list-step')
+    instruction_tags = index.find_all('li', class_='recipe__list-step')
     return ingredient_tags, instruction_tags
 
 
-def scrape_food_and_wine(soup):
-    ingredient_tags = soup.find_all(
+def scrape_food_and_wine(index):
+    ingredient_tags = index.find_all(
             'li', class_='ingredients-item')
-    instruction_containers = soup.find_all(
+    instruction_containers = index.find_all(
         'li', class_='instructions-section-item')
     instruction_tags = [tag.find('p') for tag in instruction_containers]
     return ingredient_tags, instruction_tags
 
 
-def scrape_food_network(soup):
+def scrape_food_network(index):
     # first tag is 'select all' so remove it
-    ingredient_tags = soup.find_all(
+    ingredient_tags = index.find_all(
         'span', class_='o-Ingredients__a-Ingredient--CheckboxLabel')[1:]
-    instruction_tags = soup.find_all('li', class_='o-Method__m-Step')
+    instruction_tags = index.find_all('li', class_='o-Method__m-Step')
     return ingredient_tags, instruction_tags
 
 
-def scrape_king_arthur_baking(soup):
-    ingredient_tags = soup.find(
+def scrape_king_arthur_baking(index):
+    ingredient_tags = index.find(
         'div', class_='ingredient-section').find_all('li')
-    instruction_tags = soup.find(
+    instruction_tags = index.find(
         'div', class_='field--recipe-steps').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_liquor(soup):
-    ingredient_tags = soup.find_all(
+def scrape_liquor(index):
+    ingredient_tags = index.find_all(
         'li', class_='structured-ingredients__list-item')
-    instruction_tags = soup.find(
+    instruction_tags = index.find(
             'div', class_='structured-project__steps').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_martha_stewart(soup):
-    ingredient_tags = soup.find_all('span', class_='ingredients-item-name')
-    instruction_tags = soup.find(
+def scrape_martha_stewart(index):
+    ingredient_tags = index.find_all('span', class_='ingredients-item-name')
+    instruction_tags = index.find(
         'ul', class_='instructions-section').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_myrecipes(soup):
-    ingredient_tags = soup.find_all('span', class_='ingredients-item-name')
-    instruction_tags = soup.find(
+def scrape_myrecipes(index):
+    ingredient_tags = index.find_all('span', class_='ingredients-item-name')
+    instruction_tags = index.find(
         'ul', class_='instructions-section').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_ny_times_cooking(soup):
-    ingredient_tags = soup.find(
+def scrape_ny_times_cooking(index):
+    ingredient_tags = index.find(
         'ul', class_='recipe-ingredients').find_all('li')
-    instruction_tags = soup.find(
+    instruction_tags = index.find(
         'ol', class_='recipe-steps').find_all('li')
     return ingredient_tags, instruction_tags
 
 
-def scrape_saveur(soup):
-    ingredient_tags = soup.find_all('li', class_='ingredient')
-    instruction_tags = soup.find_all('li', class_='instruction')
+def scrape_saveur(index):
+    ingredient_tags = index.find_all('li', class_='ingredient')
+    instruction_tags = index.find_all('li', class_='instruction')
     return ingredient_tags, instruction_tags
 
 
-def scrape_serious_eats(soup):
-    ingredient_tags = soup.find_all('li', class_=re.compile(
+def scrape_serious_eats(index):
+    ingredient_tags = index.find_all('li', class_=re.compile(
         'ingredient|structured-ingredients__list-item'))
-    instruction_tags = soup.find(
+    instruction_tags = index.find(
             'div', class_='structured-project__steps').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_simply_recipes(soup):
-    ingredient_tags = soup.find_all('li', class_='ingredient')
+def scrape_simply_recipes(index):
+    ingredient_tags = index.find_all('li', class_='ingredient')
     try:
-        instruction_tags = soup.find(
+        instruction_tags = index.find(
             class_='comp section--instructions section').find_all(
                 'p', class_='comp mntl-sc-block mntl-sc-block-html')
     except AttributeError:
-        instruction_tags = soup.find(
+        instruction_tags = index.find(
             'div', class_='structured-project__steps').find_all('p')
     return ingredient_tags, instruction_tags
 
 
-def scrape_southern_living(soup):
-    ingredient_tags = soup.find_all(
+def scrape_southern_living(index):
+    ingredient_tags = index.find_all(
             'li', class_='ingredients-item')
-    instruction_containers = soup.find_all(
+    instruction_containers = index.find_all(
             'li', class_='instructions-section-item')
     instruction_tags = [tag.find('p') for tag in instruction_containers]
     return ingredient_tags, instruction_tags
 
 
-def scrape_taste_of_home(soup):
-    ingredient_tags = soup.find(
+def scrape_taste_of_home(index):
+    ingredient_tags = index.find(
         'ul', class_='recipe-ingredients__list').find_all('li')
-    instruction_tags = soup.find_all(
+    instruction_tags = index.find_all(
         'li', class_='recipe-directions__item')
     return ingredient_tags, instruction_tags
 
 
-def scrape_the_kitchn(soup):
-    ingredient_tags = soup.find_all('li', class_='Recipe__ingredient')
-    instruction_tags = soup.find_all('li', class_='Recipe__instructionStep')
+def scrape_the_kitchn(index):
+    ingredient_tags = index.find_all('li', class_='Recipe__ingredient')
+    instruction_tags = index.find_all('li', class_='Recipe__instructionStep')
     return ingredient_tags, instruction_tags
 
 
-def scrape_the_pioneer_woman(soup):
-    ingredient_tags = soup.find_all('li', class_='ingredient-item')
-    instructions_container = soup.find('div', class_='direction-lists')
+def scrape_the_pioneer_woman(index):
+    ingredient_tags = index.find_all('li', class_='ingredient-item')
+    instructions_container = index.find('div', class_='direction-lists')
     instruction_tags = instructions_container.find_all('li')
     if not instruction_tags:
         instruction_tags = [instructions_container]
     return ingredient_tags, instruction_tags
 
 
-def scrape_the_spruce_eats(soup):
+def scrape_the_spruce_eats(index):
 
-    ingredient_tags = soup.find_all('li', class_='ingredient')
+    ingredient_tags = index.find_all('li', class_='ingredient')
     if not ingredient_tags:
-        ingredient_tags = soup.find_all(
+        ingredient_tags = index.find_all(
             'li', class_='structured-ingredients__list-item')
 
     try:
-        instruction_tags = soup.find(
+        instruction_tags = index.find(
             class_='comp section--instructions section').find_all(
                 'p', class_='comp mntl-sc-block mntl-sc-block-html')
     except AttributeError:
-        instruction_tags = soup.find(
+        instruction_tags = index.find(
             'div', class_='structured-project__steps').find_all('p')
 
     return ingredient_tags, instruction_tags
@@ -228,123 +233,222 @@ def scrape_recipe_url(url):
     """
     Try to scrape ingredients and instructions from a web page.
 
+    Args:
+        url: URL of webpage to parse
+    Returns:
+        (ingredients, instructions) tuple, or None if no recipe was found
+    """
+    try:
+        response = fetch(url)
+    except FetchError as error:
+        logger.warning('%s', error)
+        return
+    return scrape_recipe_response(response)
+
+
+def scrape_recipe_urls(urls):
+    """
+    Try to scrape ingredients and instructions from many web pages.
+
+    The pages are downloaded concurrently.
+
+    Args:
+        urls (list[str]): URLs of webpages to parse
+    Returns:
+        list: an (ingredients, instructions) tuple or None for each URL
+    """
+    results = []
+    for response in fetch_all(urls):
+        if isinstance(response, Exception):
+            logger.warning('%s', response)
+            results.append(None)
+        else:
+            results.append(scrape_recipe_response(response))
+    return results
+
+
+def scrape_recipe_response(response):
+    """
+    Scrape ingredients and instructions from a downloaded web page.
+
+    Args:
+        response (fetch.Response): the page
+    Returns:
+        (ingredients, instructions) tuple, or None if no recipe was found
+    """
+    if response.status not in [200, 201]:
+        logger.warning(
+            'GET request to %s failed: code %s', response.url, response.status)
+    # let the parser sniff the encoding from the raw bytes
+    return scrape_recipe_html(response.body, response.url, response.encoding)
+
+
+def parse_page(html, encoding=None, classes=None):
+    """
+    Parse a web page and index it.
+
+    Args:
+        html (str or bytes): the page's HTML. The encoding of bytes is
+            detected from the header hint, any <meta charset> and the
+            content itself.
+        encoding (str): charset from the Content-Type header, if any
+        classes (iterable[str]): if given, only build the subtrees of tags
+            with a class name that contains one of these. Everything else
+            is skipped while parsing.
+    Returns:
+        DOMIndex
+    """
+    parse_only = None
+    if classes:
+        parse_only = SoupStrainer(class_=re.compile(
+            '|'.join(re.escape(class_name) for class_name in classes)))
+    if isinstance(html, str):
+        encoding = None
+    with instrumentation.stage('html_parse'):
+        return DOMIndex(BeautifulSoup(
+            html, 'lxml', parse_only=parse_only, from_encoding=encoding))
+
+
+def scrape_recipe_html(html, url, encoding=None):
+    """
+    Try to scrape ingredients and instructions from a web page's HTML.
+
     Tries, in order:
+    - a schema.org Recipe embedded as JSON-LD
     - certain popular websites with known format
     - certain popular wordpress recipe templates
-    -
+    - searching the whole page for ingredient and instruction headers
+
+    For known websites and templates, only the recipe containers are
+    parsed at first. The whole page is parsed if that isn't enough.
 
     Args:
-        url: URL of webpage to parse
+        html (str or bytes): the page's HTML
+        url (str): URL the page came from
+        encoding (str): charset the page was served with, if html is bytes
     Returns:
-        Recipe object
+        (ingredients, instructions) tuple, or None if no recipe was found
     """
     # get what's between the second and third slashes
     domain = url.split('/')[2]
-    response = requests.get(url, headers=headers)
-    if response.status_code not in [200, 201]:
-        print(f'GET request to {url} failed: code {response.status_code}')
-    soup = BeautifulSoup(response.text, 'lxml')
-    # print(url)
-    # because some of the formats use chained functions, it's not
-    # convenient to implement a lazy dictionary.
-    # going with if/else for now
-    ingredient_tags, instruction_tags = None, None
+    if domain in BAD_DOMAINS:
+        return
 
-    # these sites do not contain actual recipes
-    bad_domains = [
-        'youtube.com',
-        'www.eatyourbooks.com',
-        'www.yummly.com'
-    ]
-
-    site_specific_scrapers = {
-        'cooking.nytimes.com': scrape_ny_times_cooking,
-        'food52.com': scrape_food_52,
-        'www.allrecipes.com': scrape_allrecipes,
-        'www.bbcgoodfood.com': scrape_bbc_good_food,
-        'www.delish.com': scrape_delish,
-        'www.epicurious.com': scrape_epicurious,
-        'www.finecooking.com': scrape_fine_cooking,
-        'www.food.com': scrape_food,
-        'www.foodandwine.com': scrape_food_and_wine,
-        'www.foodnetwork.com': scrape_food_network,
-        'www.kingarthurbaking.com': scrape_king_arthur_baking,
-        'www.liquor.com': scrape_liquor,
-        'www.marthastewart.com': scrape_martha_stewart,
-        'www.myrecipes.com': scrape_myrecipes,
-        'www.saveur.com': scrape_saveur,
-        'www.seriouseats.com': scrape_serious_eats,
-        'www.simplyrecipes.com': scrape_simply_recipes,
-        'www.southernliving.com': scrape_southern_living,
-        'www.tasteofhome.com': scrape_taste_of_home,
-        'www.thekitchn.com': scrape_the_kitchn,
-        'www.thepioneerwoman.com': scrape_the_pioneer_woman,
-        'www.thespruceeats.com': scrape_the_spruce_eats
-    }
-
-    template_specific_scrapers = [
-        scrape_wordpress_recipe_maker_recipe,
-        scrape_wordpress_tasty_recipe,
-        scrape_wordpress_mediavine_create_recipe,
-        scrape_wordpress_zoom_recipe,
-        scrape_recipe_shopper_recipe
-    ]
+    # the embedded schema.org Recipe is cheapest to read, when there is one
+    recipe = extract_recipe(html, encoding)
+    if recipe is not None:
+        ingredients, steps = recipe
+        return ingredients, join_instructions(steps)
+
+    ingredient_tags, instruction_tags = None, None
 
     # first see if it's a site with a known format
-    if domain in site_specific_scrapers:
-        try:
-            ingredient_tags, instruction_tags = (
-                site_specific_scrapers[domain](soup))
-        except AttributeError:
-            print(f'Not a {domain} recipe.')
-            return
-        if not (ingredient_tags and instruction_tags):
-            print(f'Not a {domain} recipe.')
+    if domain in SITE_SCRAPERS:
+        scraper = SITE_SCRAPERS[domain]
+        index = parse_page(html, encoding, RECIPE_CLASSES[scraper])
+        tags = apply_scraper(scraper, index, AttributeError)
+        if tags is None:
+            # the scraper may need tags outside of the recipe containers
+            index = parse_page(html, encoding)
+            tags = apply_scraper(scraper, index, AttributeError)
+        if tags is None:
+            logger.info('Not a %s recipe.', domain)
             return
+        ingredient_tags, instruction_tags = tags
 
     # then see if the site is using a template with a known format
     else:
-        for scraper in template_specific_scrapers:
-            try:
-                ingredient_tags, instruction_tags = scraper(soup)
+        index = parse_page(html, encoding, TEMPLATE_CLASSES)
+        for scraper in detect_templates(index):
+            tags = apply_scraper(scraper, index, ValueError)
+            if tags is not None:
+                ingredient_tags, instruction_tags = tags
                 break
-            except ValueError:
-                continue
         # then try to identify the recipe by searching the tags
         else:
-            print(url)
+            logger.debug('searching %s for a recipe', url)
+            index = parse_page(html, encoding)
             try:
-                ingredient_tags, instruction_tags = find_recipe(soup)
+                ingredient_tags, instruction_tags = find_recipe(index)
             except ValueError:
-                print('Could not find recipe in page')
+                logger.info('Could not find recipe in %s', url)
 
+    try:
+        if ingredient_tags and instruction_tags:
+            return extract_text(ingredient_tags, instruction_tags)
+    finally:
+        # free the tree now rather than whenever the garbage collector
+        # gets around to its reference cycles
+        index.soup.decompose()
+
+
+def apply_scraper(scraper, index, error):
+    """
+    Run a site or template scraper on a page.
+
+    Args:
+        scraper (function): one of SITE_SCRAPERS or TEMPLATE_SIGNATURES
+        index (DOMIndex): index of the page
+        error (type): exception the scraper raises when the page doesn't
+            have its format
+    Returns:
+        (ingredient_tags, instruction_tags) tuple, or None if the scraper
+        didn't find both
+    """
+    try:
+        ingredient_tags, instruction_tags = scraper(index)
+    except error:
+        return None
     if ingredient_tags and instruction_tags:
-        # make a list of ingredients
-        ingredients = [i.get_text().strip() for i in ingredient_tags]
-        instructions_list = []
-        # Make sure sentences are separated by a period to help spaCy out
-        for i in instruction_tags:
-            text = i.get_text().strip()
-            if not text.endswith('.'):
-                text += '.'
-            instructions_list.append(text)
-        instructions = ' '.join(instructions_list)
-        # Replace all colons and semicolons with periods. spaCy seems to do
-        # better when these are separate sentences.
-        instructions = instructions.replace(';', '.')
-        instructions = instructions.replace(':', '.')
-        return ingredients, instructions
-    else:
-        # print('Could not find recipe')
-        return
+        return ingredient_tags, instruction_tags
+    return None
 
 
-def scrape_wordpress_mediavine_create_recipe(soup):
+def extract_text(ingredient_tags, instruction_tags):
+    """
+    Get the text of scraped ingredient and instruction tags.
+
+    Args:
+        ingredient_tags (list[bs4.element.Tag]): one tag per ingredient
+        instruction_tags (list[bs4.element.Tag]): tags with the instructions
+    Returns:
+        (ingredients, instructions) tuple
+    """
+    # make a list of ingredients
+    ingredients = [i.get_text().strip() for i in ingredient_tags]
+    return ingredients, join_instructions(
+        i.get_text().strip() for i in instruction_tags)
+
+
+def join_instructions(texts):
+    """
+    Join instruction steps into one text for the recipe parser.
+
+    Args:
+        texts (iterable[str]): text of each step
+    Returns:
+        str
+    """
+    instructions_list = []
+    # Make sure sentences are separated by a period to help spaCy out
+    for text in texts:
+        if not text.endswith('.'):
+            text += '.'
+        instructions_list.append(text)
+    instructions = ' '.join(instructions_list)
+    # Replace all colons and semicolons with periods. spaCy seems to do
+    # better when these are separate sentences.
+    instructions = instructions.replace(';', '.')
+    instructions = instructions.replace(':', '.')
+    return instructions
+
+
+def scrape_wordpress_mediavine_create_recipe(index):
     """
     Return True if soup contains a WordPress Tasty recipe.
 
     Args:
-        soup: BeautifulSoup representation of webpage with recipe
+        index (DOMIndex): index of webpage with recipe
 
     Returns:
         ingredients, instructions tuple
@@ -352,8 +456,8 @@ def scrape_wordpress_mediavine_create_recipe(soup):
     Raises:
         ValueError if MV Create tags are not found
     """
-    ingredients_container = soup.find(class_='mv-create-ingredients')
-    instructions_container = soup.find(class_='mv-create-instructions')
+    ingredients_container = index.find(class_='mv-create-ingredients')
+    instructions_container = index.find(class_='mv-create-instructions')
 
     if ingredients_container and instructions_container:
         ingredient_tags = ingredients_container.find_all('li')
@@ -364,12 +468,12 @@ def scrape_wordpress_mediavine_create_recipe(soup):
     raise ValueError('Not a MediaVine Create recipe')
 
 
-def scrape_wordpress_recipe_maker_recipe(soup):
+def scrape_wordpress_recipe_maker_recipe(index):
     """
     Scrape ingredients and instructions from a WordPress recipe.
 
     Args:
-        soup (bs4.BeautifulSoup): representation of webpage with recipe
+        index (DOMIndex): index of webpage with recipe
 
     Returns:
         ingredients, instructions tuple
@@ -377,31 +481,31 @@ def scrape_wordpress_recipe_maker_recipe(soup):
     Raises:
         ValueError if WPRM tags are not found
     """
-    ingredient_tags = soup.find_all('li', class_='wprm-recipe-ingredient')
-    instruction_tags = soup.find_all(
+    ingredient_tags = index.find_all('li', class_='wprm-recipe-ingredient')
+    instruction_tags = index.find_all(
         'div', class_='wprm-recipe-instruction-text')
     if ingredient_tags and instruction_tags:
         return ingredient_tags, instruction_tags
     raise ValueError('Not a WPRM recipe')
 
 
-def scrape_wordpress_tasty_recipe(soup):
+def scrape_wordpress_tasty_recipe(index):
     """
     Scrape ingredients and instructions from a WordPress Tasty recipe.
 
     Args:
-        soup (bs4.BeautifulSoup): representation of webpage with recipe
+        index (DOMIndex): index of webpage with recipe
 
     Returns:
 
     """
-    ingredients_container = soup.find(
+    ingredients_container = index.find(
         'div',
         class_=re.compile(
             'tasty-recipe-ingredients|'
             'tasty-recipes-ingredients|'
             'tasty-recipes-ingredients-body'))
-    instructions_container = soup.find(
+    instructions_container = index.find(
         'div',
         class_=re.compile(
             'tasty-recipe-instructions|'
@@ -418,18 +522,18 @@ def scrape_wordpress_tasty_recipe(soup):
     raise ValueError('Not a Wordpress Tasty recipe')
 
 
-def scrape_wordpress_zoom_recipe(soup):
-    ingredient_tags = soup.find_all('span', class_='wpzoom-rcb-ingredient-name')
-    instruction_tags = soup.find_all('li', class_='direction-step')
+def scrape_wordpress_zoom_recipe(index):
+    ingredient_tags = index.find_all('span', class_='wpzoom-rcb-ingredient-name')
+    instruction_tags = index.find_all('li', class_='direction-step')
     if ingredient_tags and instruction_tags:
         return ingredient_tags, instruction_tags
     raise ValueError('Not a Wordpress Zoom recipe')
 
 
-def scrape_recipe_shopper_recipe(soup):
-    ingredients_container = soup.find(
+def scrape_recipe_shopper_recipe(index):
+    ingredients_container = index.find(
         'fieldset', class_='ingredients-section__fieldset')
-    instructions_container = soup.find(
+    instructions_container = index.find(
         'fieldset', class_='instructions-section__fieldset')
     if ingredients_container and instructions_container:
         ingredient_tags = ingredients_container.find_all('li')
@@ -439,26 +543,123 @@ def scrape_recipe_shopper_recipe(soup):
     raise ValueError('Not a Recipe Shopper recipe')
 
 
-def find_recipe(soup):
+# these sites do not contain actual recipes
+BAD_DOMAINS = {
+    'youtube.com',
+    'www.eatyourbooks.com',
+    'www.yummly.com'
+}
+
+SITE_SCRAPERS = {
+    'cooking.nytimes.com': scrape_ny_times_cooking,
+    'food52.com': scrape_food_52,
+    'www.allrecipes.com': scrape_allrecipes,
+    'www.bbcgoodfood.com': scrape_bbc_good_food,
+    'www.delish.com': scrape_delish,
+    'www.epicurious.com': scrape_epicurious,
+    'www.finecooking.com': scrape_fine_cooking,
+    'www.food.com': scrape_food,
+    'www.foodandwine.com': scrape_food_and_wine,
+    'www.foodnetwork.com': scrape_food_network,
+    'www.kingarthurbaking.com': scrape_king_arthur_baking,
+    'www.liquor.com': scrape_liquor,
+    'www.marthastewart.com': scrape_martha_stewart,
+    'www.myrecipes.com': scrape_myrecipes,
+    'www.saveur.com': scrape_saveur,
+    'www.seriouseats.com': scrape_serious_eats,
+    'www.simplyrecipes.com': scrape_simply_recipes,
+    'www.southernliving.com': scrape_southern_living,
+    'www.tasteofhome.com': scrape_taste_of_home,
+    'www.thekitchn.com': scrape_the_kitchn,
+    'www.thepioneerwoman.com': scrape_the_pioneer_woman,
+    'www.thespruceeats.com': scrape_the_spruce_eats
+}
+
+# class names of the tags each site scraper looks at, so pages from those
+# sites can be parsed without everything else
+RECIPE_CLASSES = {
+    scrape_allrecipes: ('ingredients-item-name', 'instructions-section'),
+    scrape_bbc_good_food: ('recipe__ingredients', 'recipe__method-steps'),
+    scrape_delish: ('ingredient-item', 'direction-lists'),
+    scrape_epicurious: ('ingredient', 'preparation_step'),
+    scrape_fine_cooking: ('recipe__ingredients', 'recipe__preparation'),
+    scrape_food: ('recipe-ingredients__ingredient', 'recipe-directions__step'),
+    scrape_food_52: ('recipe__list--ingredients', 'recipe__list-step'),
+    scrape_food_and_wine: ('ingredients-item', 'instructions-section-item'),
+    scrape_food_network: (
+        'o-Ingredients__a-Ingredient--CheckboxLabel', 'o-Method__m-Step'),
+    scrape_king_arthur_baking: ('ingredient-section', 'field--recipe-steps'),
+    scrape_liquor: (
+        'structured-ingredients__list-item', 'structured-project__steps'),
+    scrape_martha_stewart: ('ingredients-item-name', 'instructions-section'),
+    scrape_myrecipes: ('ingredients-item-name', 'instructions-section'),
+    scrape_ny_times_cooking: ('recipe-ingredients', 'recipe-steps'),
+    scrape_saveur: ('ingredient', 'instruction'),
+    scrape_serious_eats: ('ingredient', 'structured-project__steps'),
+    scrape_simply_recipes: (
+        'ingredient', 'section--instructions', 'structured-project__steps'),
+    scrape_southern_living: ('ingredients-item', 'instructions-section-item'),
+    scrape_taste_of_home: (
+        'recipe-ingredients__list', 'recipe-directions__item'),
+    scrape_the_kitchn: ('Recipe__ingredient', 'Recipe__instructionStep'),
+    scrape_the_pioneer_woman: ('ingredient-item', 'direction-lists'),
+    scrape_the_spruce_eats: (
+        'ingredient', 'section--instructions', 'structured-project__steps')
+}
+
+# class names that only appear on pages using each template, in the order
+# the templates are tried
+TEMPLATE_SIGNATURES = [
+    ({'wprm-recipe-ingredient'}, scrape_wordpress_recipe_maker_recipe),
+    ({'tasty-recipe-ingredients',
+      'tasty-recipes-ingredients',
+      'tasty-recipes-ingredients-body'}, scrape_wordpress_tasty_recipe),
+    ({'mv-create-ingredients'}, scrape_wordpress_mediavine_create_recipe),
+    ({'wpzoom-rcb-ingredient-name'}, scrape_wordpress_zoom_recipe),
+    ({'ingredients-section__fieldset'}, scrape_recipe_shopper_recipe)
+]
+
+
+# class names of the tags the template scrapers look at
+TEMPLATE_CLASSES = (
+    'wprm-recipe-ingredient',
+    'wprm-recipe-instruction-text',
+    'tasty-recipe-ingredients',
+    'tasty-recipes-ingredients',
+    'tasty-recipe-instructions',
+    'tasty-recipes-instructions',
+    'mv-create-ingredients',
+    'mv-create-instructions',
+    'wpzoom-rcb-ingredient-name',
+    'direction-step',
+    'ingredients-section__fieldset',
+    'instructions-section__fieldset'
+)
+
+
+def detect_templates(index):
+    """List the template scrapers whose class signature is in a page.
+
+    Args:
+        index (DOMIndex): index of the page
+
+    Returns:
+        list[function]: scrapers to try, in order
+    """
+    return [
+        scraper for signature, scraper in TEMPLATE_SIGNATURES
+        if any(index.has_class(class_name) for class_name in signature)]
+
+
+def find_recipe(index):
 
-    ingredient_header = soup.find(string=re.compile(
-        '^Ingredients:?\s*$', flags=re.IGNORECASE))
-    patterns = [
-        '^Instructions:?\s*$',
-        '^Directions:?\s*$',
-        '^Steps:?\s*$',
-        '^Preparation:?\s*$',
-        '^Method:?\s*$'
-    ]
-    for pattern in patterns:
-        instructions_header = soup.find(string=re.compile(
-            pattern, flags=re.IGNORECASE))
-        if instructions_header:
-            break
+    ingredient_header = index.header('ingredients')
+    instructions_header = index.header(
+        'instructions', 'directions', 'steps', 'preparation', 'method')
 
-    print('!!!')
-    print(ingredient_header)
-    print(instructions_header)
+    logger.debug(
+        'ingredients header: %s, instructions header: %s',
+        ingredient_header, instructions_header)
 
     # if ingredient_header:
     #     # print('next elements:', list(ingredient_header.next_elements)[:5])
@@ -506,12 +707,10 @@ def find_recipe(soup):
     #             print(' '.join(list(i.stripped_strings)))
 
     def is_real(element):
-        print(element, type(element), repr(str(element)))
         if isinstance(element, bs4.element.NavigableString):
             if str(element).isspace():
                 return False
         else:
-            print(list(element.strings))
             if not list(element.strings):
                 return False
         return True
@@ -543,7 +742,9 @@ def find_recipe(soup):
                 # print('**', repr(prev))
             # print('final previous sibling:', prev)
 
-        print('instructions:', ' '.join([s.strip() for s in container.strings]))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('instructions: %s', ' '.join(
+                [s.strip() for s in container.strings]))
 
 
 
@@ -587,7 +788,7 @@ def find_recipe(soup):
 
     # ingredient_regex = '^([0123456789½⅓⅔¼¾⅛⅜⅝⅞]+)(.*?) (.*)$'
     # print(repr(tag.find_next(like_ingredient).get_text()))
-    # # for tag in soup.find_all(like_ingredient):
+    # # for tag in index.find_all(like_ingredient):
     #     print(tag.get_text())
     # print(tag.find_all_next('div', string=re.compile(ingredient_regex)))
 
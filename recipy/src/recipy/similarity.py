@@ -0,0 +1,127 @@
+"""
+Score how similar a word in the instructions is to each node of a recipe,
+with one matrix-vector product instead of a spacy similarity call per
+ingredient.
+"""
+
+import numpy as np
+
+
+def normalize_rows(vectors):
+    """Scale each row to unit length, leaving rows of zeros as they are."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class SimilarityIndex:
+
+    def __init__(self, ingredients):
+        """Hold the word vectors of a recipe's ingredients.
+
+        Scores are cosine similarities, the same as token.similarity: the
+        'base' of an ingredient is its key noun and the 'span' is its whole
+        name. A step scores as its most similar ingredient, like
+        Step.max_base_similarity and Step.max_total_similarity.
+
+        Args:
+            ingredients (list[Ingredient]): the recipe's ingredients
+        """
+        self.ingredients = list(ingredients)
+        # ingredient id -> row in the matrices
+        self.rows = {
+            ingredient.id: row
+            for row, ingredient in enumerate(self.ingredients)}
+        self.vectors = {
+            'base': self._matrix(
+                [ingredient.base.vector for ingredient in self.ingredients]),
+            'span': self._matrix(
+                [ingredient.span.vector for ingredient in self.ingredients])
+        }
+        self.steps = []
+        # row i marks the ingredients of self.steps[i]. Rows past
+        # len(self.steps) are spare capacity.
+        self.masks = np.zeros((8, len(self.ingredients)), dtype=bool)
+
+    @staticmethod
+    def _matrix(vectors):
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return normalize_rows(np.array(vectors, dtype=np.float32))
+
+    def add_step(self, step):
+        """Index a step that was just added to the recipe graph.
+
+        Args:
+            step (Step): the new step
+
+        Returns:
+            None
+        """
+        if len(self.steps) == len(self.masks):
+            self.masks = np.concatenate(
+                [self.masks, np.zeros_like(self.masks)])
+        mask = self.masks[len(self.steps)]
+        bits = step.ingredient_bits
+        id_ = 0
+        while bits:
+            if bits & 1 and id_ in self.rows:
+                mask[self.rows[id_]] = True
+            bits >>= 1
+            id_ += 1
+        self.steps.append(step)
+
+    def ingredient_scores(self, token, vectors='base'):
+        """Score every ingredient against a token.
+
+        Args:
+            token (spacy.Token): word from the instructions
+            vectors (str): 'base' or 'span', the ingredient vectors to use
+
+        Returns:
+            numpy.ndarray: similarity of each ingredient, in order
+        """
+        matrix = self.vectors[vectors]
+        if not len(matrix):
+            return np.zeros(0, dtype=np.float32)
+        vector = np.asarray(token.vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return np.zeros(len(matrix), dtype=np.float32)
+        return matrix @ (vector / norm)
+
+    def step_scores(self, token, vectors='base'):
+        """Score every step by its most similar ingredient.
+
+        Args:
+            token (spacy.Token): word from the instructions
+            vectors (str): 'base' or 'span', the ingredient vectors to use
+
+        Returns:
+            numpy.ndarray: similarity of each step, in the order they were
+                added. Steps without ingredients score -inf.
+        """
+        masks = self.masks[:len(self.steps)]
+        if not masks.size:
+            return np.full(len(self.steps), -np.inf)
+        scores = self.ingredient_scores(token, vectors)
+        return np.where(masks, scores, -np.inf).max(axis=1)
+
+    def best_step(self, token, threshold, vectors='base'):
+        """Find the step with the most similar ingredient.
+
+        Args:
+            token (spacy.Token): word from the instructions
+            threshold (float): lowest similarity that counts as a match
+            vectors (str): 'base' or 'span', the ingredient vectors to use
+
+        Returns:
+            Step: the first step with the top score, or None if no step
+                scores at least threshold
+        """
+        if not self.steps:
+            return None
+        scores = self.step_scores(token, vectors)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        return self.steps[best]
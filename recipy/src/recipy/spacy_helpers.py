@@ -1,4 +1,9 @@
+import logging
+
 from spacy.tokens import Span, Token
+
+
+logger = logging.getLogger(__name__)
 #
 # Some helper functions that operate on spacy objects
 
@@ -88,14 +93,14 @@ def get_prepositional_objects(token):
     """
     prepositional_objects = []
     prepositions = [child for child in token.children if child.dep_ == 'prep']
-    print('prepositions:', prepositions)
+    logger.debug('prepositions: %s', prepositions)
     for prep in prepositions:
         objects = []
         for child in prep.children:
             if child.dep_ == 'pobj':
                 objects += and_conjuncts(child)
 
-        print('objects:', objects)
+        logger.debug('objects: %s', objects)
         prepositional_objects += objects
         for obj in objects:
             prepositional_objects += get_prepositional_objects(obj)
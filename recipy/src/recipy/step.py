@@ -1,3 +1,5 @@
+from collections.abc import Set
+
 from .node import Node
 from .ingredient import Ingredient
 
@@ -5,9 +7,58 @@ from .ingredient import Ingredient
 STEP_TYPE = 'step'
 
 
+class IngredientSet(Set):
+
+    __slots__ = ('bits', 'lookup')
+
+    def __init__(self, bits, lookup):
+        """
+        A read-only set of Ingredients, stored as a bitset of their ids.
+
+        It compares equal to a set of the same Ingredients.
+
+        Args:
+            bits (int): bit i is set if the Ingredient with id i is included
+            lookup (list[Ingredient] or dict): the recipe's Ingredients, by id
+        """
+        self.bits = bits
+        self.lookup = lookup
+
+    def __contains__(self, ingredient):
+        if not isinstance(ingredient, Ingredient):
+            return False
+        if not self.bits >> ingredient.id & 1:
+            return False
+        return self.lookup[ingredient.id] is ingredient
+
+    def __iter__(self):
+        bits = self.bits
+        id_ = 0
+        while bits:
+            if bits & 1:
+                yield self.lookup[id_]
+            bits >>= 1
+            id_ += 1
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        # results of &, |, - and ^ are plain sets
+        return set(iterable)
+
+    def __repr__(self):
+        return '{' + ', '.join(repr(ingredient) for ingredient in self) + '}'
+
+
 class Step(Node):
 
-    def __init__(self, id_, span, verb_index, matches):
+    __slots__ = (
+        'span', 'verb_index', 'verb', 'matches', 'parents', 'ingredient_bits',
+        'recipe_ingredients')
+
+    def __init__(self, id_, span, verb_index, matches, recipe_ingredients):
         """
         Instantiate a Step.
         Args:
@@ -15,20 +66,34 @@ class Step(Node):
             span (spacy.Span): the text of the step
             verb (int): index of token in self.span that's the main verb
             matches (list[Match]): a list of Match objects in this step.
+            recipe_ingredients (list[Ingredient] or dict): all of the
+                recipe's Ingredients, by id. It's shared, not copied.
         """
         super().__init__(id_)
         self.span = span
         self.verb_index = verb_index
+        self.verb = None
         self.matches = matches
+        self.recipe_ingredients = recipe_ingredients
 
         self.parents = set([match.target_node for match in matches])
-        self.ingredients = set()
+        # bit i is set if the Ingredient with id i went into this step,
+        # directly or through a parent step
+        self.ingredient_bits = 0
         for parent in self.parents:
-            print(type(parent))
-            if type(parent) is Ingredient:
-                self.ingredients.add(parent)
+            if isinstance(parent, Ingredient):
+                self.ingredient_bits |= 1 << parent.id
             else:
-                self.ingredients = self.ingredients.union(parent.ingredients)
+                self.ingredient_bits |= parent.ingredient_bits
+
+    @property
+    def ingredients(self):
+        """IngredientSet: the Ingredients that went into this step."""
+        return IngredientSet(self.ingredient_bits, self.recipe_ingredients)
+
+    def includes(self, ingredient):
+        """Return True if ingredient went into this step."""
+        return bool(self.ingredient_bits >> ingredient.id & 1)
 
     def set_verb(self, token_index):
         """
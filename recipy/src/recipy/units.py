@@ -0,0 +1,216 @@
+"""
+Resolve words from ingredient descriptions to pint units.
+"""
+
+import functools
+import threading
+
+import numpy as np
+import pint
+
+
+# Cooking abbreviations that pint doesn't know, or knows as something else
+# (to pint, 'T' is a tesla, 't' a metric ton and 'c' the speed of light).
+# These are looked up with their original case before falling back to
+# lowercase. None marks words that are counted rather than measured.
+UNIT_ALIASES = {
+    'T': 'tablespoon',
+    'Tb': 'tablespoon',
+    'Tbsp': 'tablespoon',
+    'tbs': 'tablespoon',
+    'tbsp': 'tablespoon',
+    'tbl': 'tablespoon',
+    'tblsp': 'tablespoon',
+    't': 'teaspoon',
+    'tsp': 'teaspoon',
+    'C': 'cup',
+    'c': 'cup',
+    'oz': 'ounce',
+    'lb': 'pound',
+    'lbs': 'pound',
+    'g': 'gram',
+    'kg': 'kilogram',
+    'ml': 'milliliter',
+    'pt': 'pint',
+    'qt': 'quart',
+    'gal': 'gallon',
+    'pkg': None,
+    'pkgs': None,
+    'package': None,
+    'packages': None,
+    'packet': None,
+    'packets': None
+}
+
+# What a unit measures. COUNT is for units like 'package' and for amounts
+# without a unit; OTHER is anything that isn't a volume or a mass.
+COUNT, VOLUME, MASS, OTHER = range(4)
+# each dimension's factors convert to this unit
+BASE_UNITS = {VOLUME: 'milliliter', MASS: 'gram'}
+
+
+class UnitResolver:
+
+    def __init__(self, ureg, maxsize=4096):
+        """Look up words as units, remembering the result for each word.
+
+        Words that turn out not to be units are remembered too, so each
+        distinct word costs at most one pint parse.
+
+        Args:
+            ureg (pint.UnitRegistry): registry to create the units in
+            maxsize (int): number of words to remember
+        """
+        self.ureg = ureg
+        self.resolve = functools.lru_cache(maxsize=maxsize)(self._lookup)
+        # resolve the aliases up front so they never go through pint's parser
+        self.aliases = {
+            word: None if name is None else ureg.Unit(name)
+            for word, name in UNIT_ALIASES.items()}
+        self.codes = UnitCodes(ureg)
+
+    def _lookup(self, word):
+        """Resolve a word to a pint.Unit, or None if it isn't a unit.
+
+        Args:
+            word (str): e.g. 'cups', 'tsp.', 'T', 'flour'
+
+        Returns:
+            pint.Unit object, or None
+        """
+        word = word.rstrip('.')  # 'tsp.', 'c.'
+        if word in self.aliases:
+            return self.aliases[word]
+        word = word.lower()
+        if word in self.aliases:
+            return self.aliases[word]
+        if not word.isalpha():
+            # words like '-1' and '(optional)' aren't worth asking pint about
+            return None
+        try:  # try to parse the word as a unit
+            return self.ureg.Unit(word)
+        # pint can raise more than UndefinedUnitError for arbitrary words
+        except Exception:
+            return None
+
+    def cache_info(self):
+        """Return hit and miss statistics for the word cache."""
+        return self.resolve.cache_info()
+
+
+class UnitCodes:
+
+    def __init__(self, ureg):
+        """Number units, so amounts can be converted as numpy arrays.
+
+        Each unit gets an integer code the first time it's seen. For each
+        code, dimensions holds what the unit measures and factors holds
+        how many of the dimension's BASE_UNITS one of the unit is, so
+        converting a whole array of amounts takes no pint arithmetic.
+        Code 0 is for amounts without a unit.
+
+        Args:
+            ureg (pint.UnitRegistry): registry the units come from
+        """
+        self.ureg = ureg
+        self.codes = {}
+        self._dimensions = [COUNT]
+        self._factors = [1.0]
+        self._arrays = None
+        self.lock = threading.Lock()
+
+    def code(self, unit):
+        """Get the code of a unit, giving it one if it's new.
+
+        Args:
+            unit (pint.Unit): the unit, or None for no unit
+
+        Returns:
+            int
+        """
+        if unit is None:
+            return 0
+        try:
+            return self.codes[unit]
+        except KeyError:
+            pass
+        dimension, factor = self._measure(unit)
+        with self.lock:
+            if unit not in self.codes:
+                self.codes[unit] = len(self._dimensions)
+                self._dimensions.append(dimension)
+                self._factors.append(factor)
+                self._arrays = None
+            return self.codes[unit]
+
+    def _measure(self, unit):
+        """Return the dimension of a unit and its factor to the base unit."""
+        quantity = self.ureg.Quantity(1, unit)
+        if quantity.dimensionless:
+            return COUNT, 1.0
+        for dimension, base_unit in BASE_UNITS.items():
+            try:
+                return dimension, float(quantity.to(base_unit).magnitude)
+            except pint.DimensionalityError:
+                pass
+        return OTHER, 1.0
+
+    def encode(self, quantities):
+        """Split quantities into magnitudes and unit codes.
+
+        Args:
+            quantities (iterable[pint.Quantity])
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): float magnitudes and int
+                unit codes, in the same order as quantities
+        """
+        magnitudes, codes = [], []
+        for quantity in quantities:
+            magnitudes.append(float(quantity.magnitude))
+            codes.append(self.code(quantity.units))
+        return np.array(magnitudes, dtype=float), np.array(codes, dtype=int)
+
+    def _get_arrays(self):
+        arrays = self._arrays
+        if arrays is None:
+            with self.lock:
+                arrays = self._arrays = (
+                    np.array(self._dimensions, dtype=int),
+                    np.array(self._factors, dtype=float))
+        return arrays
+
+    @property
+    def dimensions(self):
+        """numpy.ndarray: the dimension of each code"""
+        return self._get_arrays()[0]
+
+    @property
+    def factors(self):
+        """numpy.ndarray: base units in one of each code's unit"""
+        return self._get_arrays()[1]
+
+    def conversion_matrix(self):
+        """Get the factors to convert between every pair of codes.
+
+        Returns:
+            numpy.ndarray: entry [i, j] converts an amount with code i to
+                code j, or is nan if they measure different dimensions
+        """
+        dimensions, factors = self._get_arrays()
+        same = dimensions[:, None] == dimensions[None, :]
+        return np.where(same, factors[:, None] / factors[None, :], np.nan)
+
+    def to_base(self, magnitudes, codes):
+        """Convert amounts to the base unit of their dimension.
+
+        Args:
+            magnitudes (numpy.ndarray): amounts
+            codes (numpy.ndarray): unit code of each amount
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): the converted amounts and
+                the dimension of each
+        """
+        dimensions, factors = self._get_arrays()
+        return magnitudes * factors[codes], dimensions[codes]
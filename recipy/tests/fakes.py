@@ -0,0 +1,21 @@
+"""
+Stand-ins for spacy tokens and parsed ingredients, for testing code that
+only reads a few of their attributes.
+"""
+
+
+class FakeToken:
+
+    def __init__(self, text, lemma=''):
+        self.text = text
+        self.lemma_ = lemma
+
+
+class FakeIngredient:
+
+    def __init__(self, base='', percent=0, lemma='', quantity=None,
+                 name=''):
+        self.base = FakeToken(base, lemma)
+        self.percent = percent
+        self.quantity = quantity
+        self.name = name
@@ -0,0 +1,132 @@
+import unittest
+
+import numpy as np
+import spacy
+from spacy.lookups import Lookups
+
+from recipy.averaging import ProportionAverager, ingredient_key, singular
+
+from fakes import FakeIngredient
+
+
+def recipe(**percents):
+    return [
+        FakeIngredient(name, percent) for name, percent in percents.items()]
+
+
+def parsed(nlp, name, percent=0):
+    """Make an ingredient whose base is the last token of name."""
+    ingredient = FakeIngredient(percent=percent)
+    ingredient.base = nlp(name)[-1]
+    return ingredient
+
+
+class TestProportionAverager(unittest.TestCase):
+
+    def test_ingredient_key(self):
+        self.assertEqual(
+            'egg', ingredient_key(FakeIngredient('Eggs', 0, 'egg')))
+        self.assertEqual('flour', ingredient_key(FakeIngredient('Flour', 0)))
+
+    def test_singular(self):
+        for plural, noun in [
+                ('eggs', 'egg'), ('egg', 'egg'), ('berries', 'berry'),
+                ('tomatoes', 'tomato'), ('peaches', 'peach'),
+                ('molasses', 'molasses'), ('asparagus', 'asparagus'),
+                ('peas', 'pea'), ('gas', 'gas')]:
+            self.assertEqual(noun, singular(plural), plural)
+
+    def test_blank_pipeline(self):
+        # no lemmatizer, so lemma_ is empty
+        nlp = spacy.blank('en')
+        self.assertEqual(
+            ingredient_key(parsed(nlp, 'egg')),
+            ingredient_key(parsed(nlp, 'large Eggs')))
+        averager = ProportionAverager()
+        averager.add_many([
+            [parsed(nlp, 'large eggs', 40), parsed(nlp, 'flour', 60)],
+            [parsed(nlp, 'egg', 20), parsed(nlp, 'cups flour', 80)]])
+        stats = averager.statistics()
+        self.assertEqual(['egg', 'flour'], stats['ingredients'])
+        np.testing.assert_allclose([0.3, 0.7], stats['mean'])
+
+    def test_lemmatizer(self):
+        nlp = spacy.blank('en')
+        lookups = Lookups()
+        lookups.add_table('lemma_lookup', {'eggs': 'egg', 'leaves': 'leaf'})
+        nlp.add_pipe('lemmatizer', config={'mode': 'lookup'}).initialize(
+            lookups=lookups)
+        self.assertEqual('egg', ingredient_key(parsed(nlp, 'large eggs')))
+        self.assertEqual('leaf', ingredient_key(parsed(nlp, 'bay leaves')))
+
+    def test_statistics(self):
+        recipes = [
+            recipe(flour=60, sugar=40),
+            recipe(flour=70, sugar=30, egg=0),
+            recipe(flour=80, butter=20, egg=0),
+            recipe(flour=50, sugar=50)
+        ]
+        averager = ProportionAverager(bins=1000)
+        averager.add_many(recipes[:1])
+        averager.add_many(recipes[1:3])
+        averager.add(recipes[3])
+
+        stats = averager.statistics()
+        self.assertEqual(
+            ['flour', 'sugar', 'egg', 'butter'], stats['ingredients'])
+        np.testing.assert_allclose(stats['frequency'], [1, 0.75, 0.5, 0.25])
+        np.testing.assert_array_equal(stats['count'], [4, 3, 0, 1])
+        np.testing.assert_allclose(
+            stats['mean'], [0.65, 0.4, np.nan, 0.2])
+        np.testing.assert_allclose(
+            stats['std'], [np.std([0.6, 0.7, 0.8, 0.5]),
+                           np.std([0.4, 0.3, 0.5]), np.nan, 0])
+        # with an even count, the median lands on the lower middle share
+        np.testing.assert_allclose(
+            stats['median'], [0.6, 0.4, np.nan, 0.2], atol=0.002)
+
+    def test_batches_match_one_at_a_time(self):
+        rng = np.random.default_rng(0)
+        names = ['flour', 'sugar', 'butter', 'egg', 'milk']
+        recipes = []
+        for _ in range(300):
+            shares = rng.dirichlet(np.ones(len(names))) * 100
+            recipes.append(recipe(**{
+                name: share for name, share in zip(names, shares)
+                if rng.random() < 0.7}))
+        batched, single = ProportionAverager(), ProportionAverager()
+        for start in range(0, len(recipes), 64):
+            batched.add_many(recipes[start:start + 64])
+        for ingredients in recipes:
+            single.add(ingredients)
+        for key in ['frequency', 'count', 'mean', 'std', 'median']:
+            np.testing.assert_allclose(
+                batched.statistics()[key], single.statistics()[key])
+
+    def test_same_key_added_together(self):
+        averager = ProportionAverager()
+        averager.add([
+            FakeIngredient('sugar', 20), FakeIngredient('sugar', 10),
+            FakeIngredient('flour', 70)])
+        np.testing.assert_allclose(averager.statistics()['mean'], [0.3, 0.7])
+
+    def test_grows(self):
+        averager = ProportionAverager()
+        averager.add(recipe(**{f'ingredient{i}': 1 for i in range(100)}))
+        self.assertEqual(100, len(averager.statistics()['ingredients']))
+        np.testing.assert_allclose(averager.statistics()['mean'], 0.01)
+
+    def test_typical_recipe(self):
+        averager = ProportionAverager(bins=1000)
+        averager.add_many([
+            recipe(flour=60, sugar=30, vanilla=10),
+            recipe(flour=60, sugar=40),
+            recipe(flour=60, sugar=40)
+        ])
+        typical = averager.typical_recipe()
+        self.assertEqual(['flour', 'sugar'], [name for name, _ in typical])
+        self.assertAlmostEqual(1, sum(share for _, share in typical))
+
+
+if __name__ == '__main__':
+    unittest.main()
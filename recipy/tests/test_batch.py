@@ -0,0 +1,76 @@
+import multiprocessing
+import time
+import unittest
+from unittest import mock
+
+from recipy import batch
+from recipy.batch import ParseResult, parse_many
+
+
+class FakeRecipe:
+
+    def __init__(self, ingredients, instructions):
+        self.ingredients = ingredients
+        self.instructions = instructions
+
+    def as_dict(self):
+        return {'ingredients': self.ingredients, 'text': self.instructions}
+
+
+class FakeRecipy:
+    """Parses nothing. Instructions containing 'slow' take a while and
+    'fail' raise."""
+
+    def __init__(self, model, cache_dir):
+        self.nlp = self.units = None
+
+    def parse(self, ingredients, instructions):
+        if 'fail' in instructions:
+            raise ValueError('no steps found')
+        if 'slow' in instructions:
+            time.sleep(0.5)
+        return FakeRecipe(ingredients, instructions)
+
+
+RECIPES = [
+    (['1 egg'], 'slow'),
+    (['2 eggs'], 'fail'),
+    (['3 eggs'], 'fast')
+]
+
+
+class TestParseMany(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(batch, 'Recipy', FakeRecipy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, batch, '_recipy', None)
+
+    def test_in_process(self):
+        results = list(parse_many(iter(RECIPES), n_workers=0))
+        self.assertEqual([
+            ParseResult(0, {'ingredients': ['1 egg'], 'text': 'slow'}, None),
+            ParseResult(1, None, 'ValueError: no steps found'),
+            ParseResult(2, {'ingredients': ['3 eggs'], 'text': 'fast'}, None)],
+            results)
+        self.assertEqual([], list(parse_many([], n_workers=0)))
+
+    # workers only inherit the patched Recipy when they're forked
+    @unittest.skipUnless(
+        multiprocessing.get_start_method() == 'fork', 'needs fork')
+    def test_pool(self):
+        ordered = list(parse_many(RECIPES, n_workers=2))
+        self.assertEqual([0, 1, 2], [result.index for result in ordered])
+        self.assertEqual(
+            'ValueError: no steps found', ordered[1].error)
+
+        unordered = list(parse_many(RECIPES, n_workers=2, ordered=False))
+        # the slow recipe finishes last
+        self.assertEqual(0, unordered[-1].index)
+        self.assertEqual(
+            sorted(ordered), sorted(unordered))
+
+
+if __name__ == '__main__':
+    unittest.main()
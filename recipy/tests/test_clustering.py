@@ -0,0 +1,139 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from recipy.clustering import (
+    LSHIndex, MinHasher, cluster_recipes, cluster_signatures,
+    estimated_similarity, recipe_features)
+
+from fakes import FakeIngredient, FakeToken
+
+
+class FakeStep:
+
+    def __init__(self, doc, verb_index):
+        self.span = doc
+        self.span.doc = doc
+        self.verb_index = verb_index
+
+
+class FakeDoc(list):
+    pass
+
+
+class FakeRecipe:
+
+    def __init__(self, ingredients, verbs):
+        self.ingredients = [FakeIngredient(name) for name in ingredients]
+        doc = FakeDoc(FakeToken(verb, verb.lower()) for verb in verbs)
+        self.graph = [FakeStep(doc, i) for i in range(len(verbs))]
+
+
+class TestClustering(unittest.TestCase):
+
+    def test_recipe_features(self):
+        recipe = FakeRecipe(['Flour', 'sugar'], ['Mix', 'Bake', 'Mix'])
+        self.assertEqual(
+            {'ingredient:flour', 'ingredient:sugar', 'verb:mix',
+             'verb:bake'},
+            recipe_features(recipe))
+
+    def test_plural_ingredients(self):
+        # fake tokens have no lemma, like a pipeline without a lemmatizer
+        plural = FakeRecipe(
+            ['eggs', 'tomatoes', 'peaches', 'berries'], ['Mix', 'Bake'])
+        singular = FakeRecipe(
+            ['egg', 'tomato', 'peach', 'berry'], ['mix', 'bake'])
+        self.assertEqual(
+            recipe_features(plural), recipe_features(singular))
+        self.assertEqual(
+            [[0, 1], [2]],
+            cluster_recipes([
+                plural, singular,
+                FakeRecipe(['flour', 'sugar', 'butter'], ['whisk'])]))
+
+    def test_similarity(self):
+        hasher = MinHasher(num_perm=256)
+        first = {f'word{i}' for i in range(100)}
+        second = {f'word{i}' for i in range(50, 150)}
+        self.assertEqual(
+            1, estimated_similarity(
+                hasher.signature(first), hasher.signature(set(first))))
+        # the true Jaccard similarity is 50 / 150
+        self.assertAlmostEqual(
+            1 / 3, estimated_similarity(
+                hasher.signature(first), hasher.signature(second)),
+            delta=0.1)
+        self.assertEqual(
+            1, estimated_similarity(
+                hasher.signature([]), hasher.signature([])))
+
+    def test_lsh(self):
+        hasher = MinHasher()
+        index = LSHIndex(bands=32)
+        words = [f'word{i}' for i in range(20)]
+        index.add('same', hasher.signature(words))
+        index.add('different', hasher.signature(['other', 'words']))
+        self.assertEqual(
+            {'same'}, index.query(hasher.signature(words[:19])))
+        with self.assertRaises(ValueError):
+            LSHIndex(num_perm=128, bands=30)
+
+    def test_cluster_signatures(self):
+        hasher = MinHasher()
+        rng = np.random.RandomState(0)
+        bases = [
+            {f'dish{dish}:{i}' for i in range(30)} for dish in range(20)]
+        feature_sets, dishes = [], []
+        for _ in range(200):
+            dish = rng.randint(len(bases))
+            variant = set(bases[dish])
+            variant.discard(f'dish{dish}:{rng.randint(30)}')
+            variant.add(f'extra{rng.randint(1000)}')
+            feature_sets.append(variant)
+            dishes.append(dish)
+        clusters = cluster_signatures(
+            np.array([hasher.signature(features)
+                      for features in feature_sets]))
+        self.assertEqual(len(set(dishes)), len(clusters))
+        for cluster in clusters:
+            self.assertEqual(1, len({dishes[row] for row in cluster}))
+        self.assertEqual(
+            list(range(200)), sorted(row for c in clusters for row in c))
+
+    def test_large_cluster(self):
+        hasher = MinHasher()
+        words = [f'word{i}' for i in range(30)]
+        signatures = np.array(
+            [hasher.signature(words[:29] + [f'extra{i % 50}'])
+             for i in range(2000)])
+        query = LSHIndex.query
+        sizes = []
+
+        def counting_query(index, signature):
+            candidates = query(index, signature)
+            sizes.append(len(candidates))
+            return candidates
+
+        with mock.patch.object(LSHIndex, 'query', counting_query):
+            clusters = cluster_signatures(signatures)
+        self.assertEqual([list(range(2000))], clusters)
+        # duplicates only ever find the leader of their cluster
+        self.assertEqual(1, max(sizes))
+
+    def test_cluster_recipes(self):
+        recipes = [
+            FakeRecipe(['flour', 'sugar', 'butter', 'egg', 'milk'],
+                       ['whisk', 'fold', 'bake']),
+            FakeRecipe(['tomato', 'basil', 'garlic', 'pasta', 'oil'],
+                       ['boil', 'chop', 'toss']),
+            FakeRecipe(['flour', 'sugar', 'butter', 'egg', 'milk'],
+                       ['whisk', 'fold', 'bake', 'cool'])
+        ]
+        self.assertEqual([[0, 2], [1]], cluster_recipes(recipes))
+        self.assertEqual([], cluster_recipes([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+import spacy
+
+from recipy.doc_cache import CachedPipeline, DocCache
+from recipy.recipy import Pipeline
+
+
+class CountingPipeline(Pipeline):
+    """Pipeline that counts the texts it processes."""
+
+    def __init__(self, nlp, components):
+        super().__init__(nlp, components)
+        self.processed = 0
+
+    def __call__(self, text):
+        self.processed += 1
+        return super().__call__(text)
+
+    def pipe(self, texts, **kwargs):
+        texts = list(texts)
+        self.processed += len(texts)
+        return super().pipe(texts, **kwargs)
+
+
+class TestDocCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.nlp = spacy.blank('en')
+        self.nlp.add_pipe('sentencizer')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def pipeline(self, cache, components=('sentencizer',)):
+        return CachedPipeline(CountingPipeline(self.nlp, components), cache)
+
+    def test_memory(self):
+        pipeline = self.pipeline(DocCache())
+        doc = pipeline('Mix the flour. Bake it.')
+        self.assertIs(doc, pipeline('Mix the flour. Bake it.'))
+        self.assertEqual(1, pipeline.pipeline.processed)
+        self.assertEqual(2, len(list(doc.sents)))
+
+    def test_pipe(self):
+        pipeline = self.pipeline(DocCache())
+        pipeline('2 eggs')
+        docs = pipeline.pipe(['1 cup flour', '2 eggs', 'salt'])
+        self.assertEqual(['1 cup flour', '2 eggs', 'salt'],
+                         [doc.text for doc in docs])
+        self.assertEqual(3, pipeline.pipeline.processed)
+
+    def test_lru(self):
+        pipeline = self.pipeline(DocCache(maxsize=2))
+        for text in ['a', 'b', 'a', 'c', 'a', 'b']:
+            pipeline(text)
+        # 'b' was dropped when 'c' came in
+        self.assertEqual(4, pipeline.pipeline.processed)
+
+    def test_disk(self):
+        text = 'Mix the flour. Bake it.'
+        self.pipeline(DocCache(self.dir.name))(text)
+
+        # a new cache, as if in another process
+        pipeline = self.pipeline(DocCache(self.dir.name))
+        doc = pipeline(text)
+        self.assertEqual(0, pipeline.pipeline.processed)
+        self.assertEqual(text, doc.text)
+        self.assertEqual(
+            ['Mix the flour.', 'Bake it.'], [s.text for s in doc.sents])
+
+    def test_keyed_by_pipeline(self):
+        cache = DocCache(self.dir.name)
+        self.pipeline(cache)('Mix the flour.')
+        other = self.pipeline(cache, components=())
+        other('Mix the flour.')
+        self.assertEqual(1, other.pipeline.processed)
+        self.assertEqual(2, len(os.listdir(self.dir.name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import re
+import unittest
+
+from bs4 import BeautifulSoup
+
+from recipy.dom_index import DOMIndex
+from recipy.scraper import (detect_templates, parse_page, scrape_recipe_html,
+                            scrape_wordpress_recipe_maker_recipe)
+
+
+PAGE = '''
+<html><body>
+  <h2>Ingredients:</h2>
+  <ul class="wprm-recipe-ingredients">
+    <li class="wprm-recipe-ingredient">1 cup flour</li>
+    <li class="wprm-recipe-ingredient extra">2 eggs</li>
+  </ul>
+  <h2>Instructions</h2>
+  <div class="wprm-recipe-instruction-text">Mix the flour and eggs</div>
+  <div class="comp section--instructions section">
+    <p class="wprm-recipe-instruction-text">Bake</p>
+  </div>
+</body></html>
+'''
+
+
+class TestDOMIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DOMIndex(BeautifulSoup(PAGE, 'lxml'))
+
+    def test_find_all(self):
+        tags = self.index.find_all('li', class_='wprm-recipe-ingredient')
+        self.assertEqual(['1 cup flour', '2 eggs'],
+                         [tag.get_text() for tag in tags])
+        self.assertEqual(
+            2, len(self.index.find_all(class_='wprm-recipe-instruction-text')))
+        self.assertEqual(
+            1, len(self.index.find_all(
+                'div', class_='wprm-recipe-instruction-text')))
+        self.assertEqual(2, len(self.index.find_all('h2')))
+        self.assertEqual([], self.index.find_all('li', class_='ingredient'))
+
+    def test_multiple_classes(self):
+        tag = self.index.find(class_='comp section--instructions section')
+        self.assertEqual('div', tag.name)
+        self.assertIsNone(self.index.find(class_='comp missing'))
+
+    def test_pattern(self):
+        tags = self.index.find_all(class_=re.compile('ingredient'))
+        # in document order, each tag once
+        self.assertEqual(['ul', 'li', 'li'], [tag.name for tag in tags])
+
+    def test_header(self):
+        self.assertEqual('Ingredients:', self.index.header('ingredients'))
+        self.assertEqual(
+            'Instructions', self.index.header('directions', 'instructions'))
+        self.assertIsNone(self.index.header('method'))
+
+    def test_detect_templates(self):
+        self.assertEqual([scrape_wordpress_recipe_maker_recipe],
+                         detect_templates(self.index))
+
+    def test_scrape_recipe_html(self):
+        ingredients, instructions = scrape_recipe_html(
+            PAGE, 'https://blog.example.com/bread')
+        self.assertEqual(['1 cup flour', '2 eggs'], ingredients)
+        self.assertEqual('Mix the flour and eggs.', instructions)
+
+    def test_partial_parse(self):
+        index = parse_page(PAGE, classes=['wprm-recipe-ingredient'])
+        self.assertEqual(2, len(index.find_all('li')))
+        self.assertIsNone(index.find('h2'))
+
+    def test_scrape_bytes(self):
+        page = PAGE.replace('flour', 'crème fraîche').replace(
+            '<html>', '<html><head><meta charset="windows-1252"></head>')
+        ingredients, _ = scrape_recipe_html(
+            page.encode('cp1252'), 'https://blog.example.com/bread')
+        self.assertEqual('1 cup crème fraîche', ingredients[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import asyncio
+import http.server
+import tempfile
+import threading
+import unittest
+
+from recipy.fetch import CacheMiss, Fetcher, FetchError, fetch_all
+from recipy.http_cache import ResponseCache
+
+
+PAGES = {
+    '/recipe': b'<html><body><h1>Pancakes</h1></body></html>',
+    '/other': b'<html><body><h1>Waffles</h1></body></html>'
+}
+ETAG = '"pancakes-1"'
+
+
+class PageHandler(http.server.BaseHTTPRequestHandler):
+    """Serve saved pages, failing the first request to /flaky.
+
+    /recipe has an ETag, and requests for it that already have the current
+    version get a 304.
+    """
+
+    flaky_requests = 0
+    # paths requested so far
+    requests = []
+    not_modified = 0
+
+    def do_GET(self):
+        PageHandler.requests.append(self.path)
+        if self.path == '/recipe' and (
+                self.headers.get('If-None-Match') == ETAG):
+            PageHandler.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        if self.path == '/flaky':
+            PageHandler.flaky_requests += 1
+            if PageHandler.flaky_requests == 1:
+                self.send_error(503)
+                return
+            body = PAGES['/recipe']
+        elif self.path in PAGES:
+            body = PAGES[self.path]
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        if self.path == '/recipe':
+            self.send_header('ETag', ETAG)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServerTestCase(unittest.TestCase):
+    """Runs a PageHandler server for the tests of a class."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), PageHandler)
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+
+class TestFetcher(ServerTestCase):
+
+    def fetch_all(self, urls, **kwargs):
+        async def run():
+            async with Fetcher(backoff=0, **kwargs) as fetcher:
+                return await fetcher.fetch_all(urls)
+        return asyncio.run(run())
+
+    def test_fetch_all(self):
+        responses = self.fetch_all(
+            [self.base + '/recipe', self.base + '/other'])
+        self.assertEqual([200, 200], [r.status for r in responses])
+        self.assertEqual(PAGES['/recipe'], responses[0].body)
+        self.assertIn('Waffles', responses[1].text)
+        self.assertEqual('utf-8', responses[0].encoding)
+
+    def test_retry(self):
+        PageHandler.flaky_requests = 0
+        response, = self.fetch_all([self.base + '/flaky'])
+        self.assertEqual(200, response.status)
+        self.assertEqual(2, PageHandler.flaky_requests)
+
+    def test_no_retries_left(self):
+        PageHandler.flaky_requests = 0
+        response, = self.fetch_all([self.base + '/flaky'], retries=0)
+        self.assertEqual(503, response.status)
+
+    def test_not_found(self):
+        response, = self.fetch_all([self.base + '/missing'])
+        self.assertEqual(404, response.status)
+
+    def test_connection_error(self):
+        # nothing is listening on the port of a closed server
+        server = http.server.HTTPServer(('127.0.0.1', 0), PageHandler)
+        port = server.server_address[1]
+        server.server_close()
+        error, = self.fetch_all([f'http://127.0.0.1:{port}/'], retries=1)
+        self.assertIsInstance(error, FetchError)
+
+    def test_sync_wrapper(self):
+        responses = fetch_all([self.base + '/recipe', self.base + '/other'])
+        self.assertEqual([200, 200], [r.status for r in responses])
+
+
+class TestFetcherCache(ServerTestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        PageHandler.requests = []
+        PageHandler.not_modified = 0
+
+    def fetch(self, path, **kwargs):
+        async def run():
+            async with Fetcher(
+                    backoff=0, cache=ResponseCache(self.dir.name, **kwargs)
+            ) as fetcher:
+                return await fetcher.fetch(self.base + path)
+        return asyncio.run(run())
+
+    def test_fresh(self):
+        first = self.fetch('/other')
+        second = self.fetch('/other')
+        self.assertEqual(['/other'], PageHandler.requests)
+        self.assertEqual(first.body, second.body)
+        self.assertEqual(200, second.status)
+        self.assertEqual('utf-8', second.encoding)
+
+    def test_revalidate(self):
+        self.fetch('/recipe', ttl=0)
+        response = self.fetch('/recipe', ttl=0)
+        self.assertEqual(['/recipe', '/recipe'], PageHandler.requests)
+        self.assertEqual(1, PageHandler.not_modified)
+        self.assertEqual(200, response.status)
+        self.assertEqual(PAGES['/recipe'], response.body)
+
+    def test_offline(self):
+        self.fetch('/other', ttl=0)
+        response = self.fetch('/other', ttl=0, offline=True)
+        self.assertEqual(['/other'], PageHandler.requests)
+        self.assertEqual(PAGES['/other'], response.body)
+
+    def test_offline_miss(self):
+        with self.assertRaises(CacheMiss):
+            self.fetch('/recipe', offline=True)
+        self.assertTrue(issubclass(CacheMiss, FetchError))
+        self.assertEqual([], PageHandler.requests)
+
+
+if __name__ == '__main__':
+    unittest.main()
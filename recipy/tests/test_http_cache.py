@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from recipy.http_cache import ResponseCache, normalize_url
+
+
+class TestNormalizeUrl(unittest.TestCase):
+
+    def test_normalize_url(self):
+        cases = {
+            'HTTPS://www.Example.com/pie': 'https://www.example.com/pie',
+            'https://www.example.com:443/pie': 'https://www.example.com/pie',
+            'http://localhost:8000/pie': 'http://localhost:8000/pie',
+            'https://www.example.com/pie#comments':
+                'https://www.example.com/pie',
+            'https://www.example.com/pie?b=2&a=1':
+                'https://www.example.com/pie?a=1&b=2',
+            'https://www.example.com/pie?utm_source=x&fbclid=y&page=2':
+                'https://www.example.com/pie?page=2',
+            'https://www.example.com': 'https://www.example.com/'
+        }
+        for url, normalized in cases.items():
+            self.assertEqual(normalized, normalize_url(url), url)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.dir.name, ttl=60)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        url = 'https://www.example.com/pie'
+        self.assertIsNone(self.cache.get(url))
+        self.cache.put(url, 200, {
+            'Content-Type': 'text/html; charset=utf-8',
+            'ETag': '"abc"',
+            'Set-Cookie': 'session=1'
+        }, b'<html>pie</html>')
+
+        response = self.cache.get(url + '#recipe')
+        self.assertEqual(200, response.status)
+        self.assertEqual(b'<html>pie</html>', response.body)
+        self.assertEqual(
+            {'Content-Type': 'text/html; charset=utf-8', 'ETag': '"abc"'},
+            response.headers)
+        self.assertTrue(self.cache.is_fresh(response))
+
+    def test_compressed(self):
+        url = 'https://www.example.com/pie'
+        body = b'<p>flour, butter, sugar</p>' * 1000
+        self.cache.put(url, 200, {}, body)
+        self.assertLess(os.path.getsize(self.cache.path(url)), len(body) / 10)
+
+    def test_ttl_and_touch(self):
+        url = 'https://www.example.com/pie'
+        self.cache.put(url, 200, {}, b'pie')
+        os.utime(self.cache.path(url), (0, 0))
+        self.assertFalse(self.cache.is_fresh(self.cache.get(url)))
+
+        self.cache.touch(url)
+        self.assertTrue(self.cache.is_fresh(self.cache.get(url)))
+
+    def test_revalidation_headers(self):
+        url = 'https://www.example.com/pie'
+        response = self.cache.put(url, 200, {
+            'etag': '"abc"',
+            'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'
+        }, b'pie')
+        self.assertEqual({
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'
+        }, ResponseCache.revalidation_headers(response))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import contextlib
+import importlib
+import io
+import logging
+import os
+import unittest
+from unittest import mock
+
+import pint
+
+from recipy import instrumentation
+from recipy.ingredient_parser import IngredientParser
+from recipy.scraper import parse_page
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_stage(self):
+        with instrumentation.stage('spacy'):
+            pass
+        with instrumentation.stage('spacy'):
+            pass
+        counters = instrumentation.snapshot()
+        self.assertEqual(2, counters['spacy']['calls'])
+        self.assertGreaterEqual(counters['spacy']['seconds'], 0)
+        self.assertEqual(0, counters['fetch']['calls'])
+
+    def test_stage_raises(self):
+        with self.assertRaises(KeyError):
+            with instrumentation.stage('fetch'):
+                raise KeyError('still counted')
+        self.assertEqual(1, instrumentation.snapshot()['fetch']['calls'])
+        with self.assertRaises(ValueError):
+            instrumentation.stage('not a stage')
+
+    def test_disabled(self):
+        instrumentation.disable()
+        self.assertFalse(instrumentation.is_enabled())
+        with instrumentation.stage('spacy'):
+            pass
+        self.assertEqual(0, instrumentation.snapshot()['spacy']['calls'])
+
+    def test_environment(self):
+        self.addCleanup(importlib.reload, instrumentation)
+        for value, enabled in [
+                ('1', True), ('yes', True), ('0', False), ('false', False),
+                ('False', False), ('', False)]:
+            with mock.patch.dict(os.environ, {'RECIPY_INSTRUMENT': value}):
+                importlib.reload(instrumentation)
+            self.assertEqual(enabled, instrumentation.is_enabled(), value)
+        with mock.patch.dict(os.environ):
+            os.environ.pop('RECIPY_INSTRUMENT', None)
+            importlib.reload(instrumentation)
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_reset(self):
+        instrumentation.record('serialization', 0.5)
+        self.assertEqual(
+            {'calls': 1, 'seconds': 0.5},
+            instrumentation.snapshot()['serialization'])
+        instrumentation.reset()
+        self.assertEqual(
+            {'calls': 0, 'seconds': 0.0},
+            instrumentation.snapshot()['serialization'])
+
+    def test_html_parse(self):
+        parse_page('<p class="recipe">Hello</p>')
+        self.assertEqual(
+            1, instrumentation.snapshot()['html_parse']['calls'])
+
+
+class TestLogging(unittest.TestCase):
+
+    ureg = pint.UnitRegistry()
+
+    def test_parse_amount_logs(self):
+        parser = IngredientParser(self.ureg, None)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), \
+                self.assertLogs('recipy', logging.DEBUG) as logs:
+            self.assertEqual(1.5, parser.parse_amount('1 1/2'))
+        self.assertEqual('', output.getvalue())
+        self.assertEqual(
+            ['DEBUG:recipy.ingredient_parser:amount: 1 1/2'], logs.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
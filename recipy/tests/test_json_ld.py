@@ -0,0 +1,78 @@
+import json
+import unittest
+
+from recipy.json_ld import extract_recipe, find_recipe_object, iter_json_ld
+
+
+def page(*blocks, charset='utf-8'):
+    scripts = ''.join(
+        f'<script type="application/ld+json">{block}</script>'
+        for block in blocks)
+    return (f'<html><head><meta charset="{charset}">{scripts}</head>'
+            '<body><p>Lots of other things</p></body></html>')
+
+
+RECIPE = {
+    '@type': 'Recipe',
+    'name': 'Toast',
+    'recipeIngredient': ['1 slice bread', '1 tablespoon butter &amp; jam'],
+    'recipeInstructions': [
+        {'@type': 'HowToStep', 'text': 'Toast the <b>bread</b>.'},
+        {'@type': 'HowToStep', 'text': 'Spread the butter on the toast.'}
+    ]
+}
+
+
+class TestJSONLD(unittest.TestCase):
+
+    def test_iter_json_ld(self):
+        html = page('{"a": 1}', 'not json', '[{"b": 2}]')
+        self.assertEqual([{'a': 1}, [{'b': 2}]], list(iter_json_ld(html)))
+        self.assertEqual(
+            [{'a': 1}, [{'b': 2}]], list(iter_json_ld(html.encode())))
+
+    def test_find_recipe_object(self):
+        self.assertIs(RECIPE, find_recipe_object(RECIPE))
+        self.assertIs(RECIPE, find_recipe_object(
+            {'@graph': [{'@type': 'WebPage'}, RECIPE]}))
+        self.assertIs(RECIPE, find_recipe_object([{'@type': 'Person'}, RECIPE]))
+        recipe = {'@type': ['Recipe', 'NewsArticle']}
+        self.assertIs(recipe, find_recipe_object(recipe))
+        self.assertIsNone(find_recipe_object({'@type': 'WebPage'}))
+
+    def test_extract_recipe(self):
+        html = page(
+            json.dumps({'@type': 'WebSite'}),
+            json.dumps({'@context': 'https://schema.org', '@graph': [RECIPE]}))
+        self.assertEqual((
+            ['1 slice bread', '1 tablespoon butter & jam'],
+            ['Toast the bread.', 'Spread the butter on the toast.']
+        ), extract_recipe(html))
+
+    def test_instruction_forms(self):
+        for instructions, steps in [
+                ('Mix.\n', ['Mix.']),
+                (['Mix.', 'Bake.'], ['Mix.', 'Bake.']),
+                ([{'@type': 'HowToSection', 'name': 'Cake', 'itemListElement': [
+                    {'@type': 'HowToStep', 'text': 'Mix.'},
+                    {'@type': 'HowToStep', 'text': 'Bake.'}]}],
+                 ['Mix.', 'Bake.'])]:
+            recipe = dict(RECIPE, recipeInstructions=instructions)
+            _, result = extract_recipe(page(json.dumps(recipe)))
+            self.assertEqual(steps, result)
+
+    def test_encoding(self):
+        recipe = dict(RECIPE, recipeIngredient=['1/2 cup crème fraîche'])
+        html = page(json.dumps(recipe, ensure_ascii=False),
+                    charset='windows-1252').encode('cp1252')
+        ingredients, _ = extract_recipe(html)
+        self.assertEqual(['1/2 cup crème fraîche'], ingredients)
+
+    def test_missing(self):
+        self.assertIsNone(extract_recipe(page()))
+        recipe = dict(RECIPE, recipeInstructions=[])
+        self.assertIsNone(extract_recipe(page(json.dumps(recipe))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from recipy.lexicon import Lexicon, load_lexicon
+
+
+class TestLexicon(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'words.txt')
+        with open(self.path, 'w') as file:
+            file.write('Bowl\npan\n\n')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_load(self):
+        lexicon = Lexicon(self.path)
+        self.assertEqual(lexicon.words, frozenset({'bowl', 'pan'}))
+        self.assertIn('bowl', lexicon)
+        self.assertNotIn('flour', lexicon)
+
+    def test_default_non_foods(self):
+        lexicon = load_lexicon()
+        self.assertIn('saucepan', lexicon)
+        self.assertNotIn('butter', lexicon)
+
+    def test_shared(self):
+        self.assertIs(load_lexicon(self.path), load_lexicon(self.path))
+
+    def test_from_resource(self):
+        lexicon = Lexicon.from_resource('recipy', 'not_a_food.txt')
+        self.assertEqual(lexicon.words, load_lexicon().words)
+
+    def test_check(self):
+        lexicon = Lexicon(self.path)
+        watched = Lexicon(self.path, watch=True)
+        with open(self.path, 'a') as file:
+            file.write('skillet\n')
+        os.utime(self.path, (0, 0))
+
+        self.assertFalse(lexicon.check())
+        self.assertNotIn('skillet', lexicon)
+        self.assertTrue(watched.check())
+        self.assertIn('skillet', watched)
+        self.assertFalse(watched.check())
+
+
+if __name__ == '__main__':
+    unittest.main()
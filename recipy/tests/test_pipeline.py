@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+import spacy
+from spacy.language import Language
+
+from recipy import recipy as recipy_module
+from recipy.recipy import (
+    EXCLUDED_COMPONENTS, PIPELINE_PROFILES, Pipeline, Recipy)
+
+
+@Language.factory('recipy_test_recorder')
+def make_recorder(nlp, name):
+    """Stand in for a trained component, noting on each Doc that it ran."""
+    def record(doc):
+        doc.user_data.setdefault('ran', []).append(name)
+        return doc
+    return record
+
+
+# the components of en_core_web_md, in order
+MODEL_COMPONENTS = [
+    'tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'ner']
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.nlp = spacy.blank('en')
+        for name in MODEL_COMPONENTS:
+            self.nlp.add_pipe('recipy_test_recorder', name=name)
+
+    def test_profiles(self):
+        for profile, components in PIPELINE_PROFILES.items():
+            pipeline = Pipeline(self.nlp, components)
+            expected = [
+                name for name in MODEL_COMPONENTS if name in components]
+            self.assertEqual(tuple(expected), pipeline.components, profile)
+            self.assertEqual(
+                expected, pipeline('2 eggs').user_data['ran'], profile)
+            docs = pipeline.pipe(['2 eggs', 'salt'])
+            self.assertEqual(
+                [expected, expected],
+                [doc.user_data['ran'] for doc in docs], profile)
+            # ingredients are averaged and steps matched by lemma
+            self.assertIn('lemmatizer', components, profile)
+            self.assertNotIn('ner', components, profile)
+
+    def test_excluded(self):
+        self.assertIn('ner', EXCLUDED_COMPONENTS)
+        for components in PIPELINE_PROFILES.values():
+            self.assertFalse(set(components) & set(EXCLUDED_COMPONENTS))
+        with mock.patch.object(
+                recipy_module.spacy, 'load', return_value=self.nlp) as load:
+            self.assertIs(self.nlp, Recipy('some_model').nlp)
+        load.assert_called_once_with(
+            'some_model', exclude=EXCLUDED_COMPONENTS)
+
+
+if __name__ == '__main__':
+    unittest.main()
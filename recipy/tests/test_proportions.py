@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+import pint
+
+from recipy.proportions import density_of, proportions, set_percents
+from recipy.units import UnitCodes
+
+from fakes import FakeIngredient
+
+
+class TestProportions(unittest.TestCase):
+
+    ureg = pint.UnitRegistry()
+
+    def ingredients(self, *amounts):
+        return [
+            FakeIngredient(
+                quantity=self.ureg.Quantity(magnitude, unit), name=name)
+            for magnitude, unit, name in amounts]
+
+    def test_density_of(self):
+        self.assertEqual(0.93, density_of('packed light brown sugar'))
+        self.assertEqual(0.85, density_of('sugar'))
+        self.assertTrue(np.isnan(density_of('eggs')))
+
+    def test_by_volume(self):
+        recipe = self.ingredients(
+            (3, 'cup', 'flour'),
+            (1, 'cup', 'sugar'),
+            (2, None, 'eggs'),
+            (1, 'inch', 'ginger'))
+        fractions, = proportions([recipe], UnitCodes(self.ureg), None)
+        np.testing.assert_allclose(fractions, [0.75, 0.25, 0, 0])
+
+    def test_by_mass(self):
+        recipe = self.ingredients(
+            (1, 'cup', 'water'),
+            (236.588 * 0.85, 'gram', 'sugar'),
+            (100, 'gram', 'mystery'))
+        fractions, = proportions([recipe], UnitCodes(self.ureg))
+        np.testing.assert_allclose(fractions, [0.5, 0.5, 0], rtol=1e-5)
+
+    def test_many_recipes(self):
+        recipes = [
+            self.ingredients((1, 'cup', 'milk'), (1, 'pint', 'cream')),
+            [],
+            self.ingredients((2, None, 'eggs')),
+            self.ingredients((1, 'teaspoon', 'salt'), (2, 'teaspoon', 'oil'))
+        ]
+        fractions = proportions(recipes, UnitCodes(self.ureg))
+        self.assertEqual([2, 0, 1, 2], [len(recipe) for recipe in fractions])
+        np.testing.assert_allclose(fractions[0], [1 / 3, 2 / 3])
+        np.testing.assert_allclose(fractions[2], [0])
+        np.testing.assert_allclose(fractions[3], [1 / 3, 2 / 3])
+
+    def test_set_percents(self):
+        recipe = self.ingredients((1, 'cup', 'milk'), (1, 'cup', 'water'))
+        set_percents([recipe], UnitCodes(self.ureg))
+        self.assertEqual([50, 50], [ingredient.percent for ingredient in recipe])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from recipy.quantity_lexer import lex_quantity, parse_number
+
+
+class TestQuantityLexer(unittest.TestCase):
+
+    def test_parse_number(self):
+        cases = {
+            '5': 5,
+            '3.5': 3.5,
+            '1/4': 0.25,
+            '2 1/4': 2.25,
+            '2 and 1/2': 2.5,
+            '2-1/2': 2.5,
+            '¾': 0.75,
+            '2½': 2.5,
+            '2 ½': 2.5,
+            '2-½': 2.5,
+            'cups': None
+        }
+        for string, number in cases.items():
+            self.assertEqual(number, parse_number(string), string)
+
+    def test_plain_amount(self):
+        cases = {
+            '1 cup flour': (1, 'cup', 'flour'),
+            '3.5 tbsp sugar': (3.5, 'tbsp', 'sugar'),
+            '3/4 tsp baking soda': (0.75, 'tsp', 'baking soda'),
+            '2 1/10 oz milk': (2.1, 'oz', 'milk'),
+            '1 and 1/2 gallons cider': (1.5, 'gallons', 'cider'),
+            '¾ cup almonds': (0.75, 'cup', 'almonds'),
+            '2 and ½ cups jello': (2.5, 'cups', 'jello')
+        }
+        for text, (amount, unit, name) in cases.items():
+            tokens = lex_quantity(text)
+            self.assertEqual(amount, tokens.amount, text)
+            self.assertEqual(unit, tokens.unit, text)
+            self.assertEqual(name, tokens.name, text)
+            self.assertIsNone(tokens.range_amount)
+            self.assertIsNone(tokens.alt_amount)
+
+    def test_range(self):
+        cases = [
+            '1 - 1.5 cups flour',
+            '1-1 1/2 cups flour',
+            '1 to 1 1/2 cups flour',
+            '1- 1 ½ cups flour',
+            '1 -1½ cups flour'
+        ]
+        for text in cases:
+            tokens = lex_quantity(text)
+            self.assertEqual(1, tokens.amount, text)
+            self.assertEqual(1.5, tokens.range_amount, text)
+            self.assertEqual('cups', tokens.unit, text)
+            self.assertEqual('flour', tokens.name, text)
+
+        tokens = lex_quantity('2-3 eggs, separated')
+        self.assertEqual((2, 3), (tokens.amount, tokens.range_amount))
+        self.assertEqual('eggs, separated', tokens.remainder)
+
+    def test_alternate_measurement(self):
+        cases = {
+            '2 cups (226 grams) flour': (2, 'cups', 226, 'grams', 'flour'),
+            '2 cups (226g) flour': (2, 'cups', 226, 'g', 'flour'),
+            '2 1/4 tsp. (1 packet) yeast': (
+                2.25, 'tsp.', 1, 'packet', 'yeast'),
+            '8 oz (1 cup) water': (8, 'oz', 1, 'cup', 'water'),
+            '12 (1 carton) eggs': (12, None, 1, 'carton', 'eggs')
+        }
+        for text, (amount, unit, alt_amount, alt_unit, name) in cases.items():
+            tokens = lex_quantity(text)
+            self.assertEqual(amount, tokens.amount, text)
+            self.assertEqual(unit, tokens.unit, text)
+            self.assertEqual(alt_amount, tokens.alt_amount, text)
+            self.assertEqual(alt_unit, tokens.alt_unit, text)
+            self.assertEqual(name, tokens.name, text)
+
+    def test_remainder(self):
+        """The remainder keeps the unit word, for when it isn't a unit."""
+        tokens = lex_quantity('2 large eggs, separated')
+        self.assertEqual('large', tokens.unit)
+        self.assertEqual('eggs, separated', tokens.name)
+        self.assertEqual('large eggs, separated', tokens.remainder)
+
+        tokens = lex_quantity('1 large onion (diced)')
+        self.assertEqual('large onion (diced)', tokens.remainder)
+
+    def test_no_amount(self):
+        self.assertIsNone(lex_quantity('salt and pepper to taste'))
+        self.assertIsNone(lex_quantity('2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+import pint
+import spacy
+from spacy.tokens import Doc
+
+from recipy.ingredient import Ingredient
+from recipy.recipe_parser import RecipeParser
+
+
+# 'Beat the eggs. Fold in the flour. Pour the mixture.', parsed by hand
+WORDS = [
+    'Beat', 'the', 'eggs', '.',
+    'Fold', 'in', 'the', 'flour', '.',
+    'Pour', 'the', 'mixture', '.']
+SPACES = [
+    True, True, False, True,
+    True, True, True, False, True,
+    True, True, False, False]
+TAGS = [
+    'VB', 'DT', 'NNS', '.',
+    'VB', 'IN', 'DT', 'NN', '.',
+    'VB', 'DT', 'NN', '.']
+HEADS = [0, 2, 0, 0, 4, 4, 7, 5, 4, 9, 11, 9, 9]
+DEPS = [
+    'ROOT', 'det', 'dobj', 'punct',
+    'ROOT', 'prep', 'det', 'pobj', 'punct',
+    'ROOT', 'det', 'dobj', 'punct']
+LEMMAS = [
+    'beat', 'the', 'egg', '.',
+    'fold', 'in', 'the', 'flour', '.',
+    'pour', 'the', 'mixture', '.']
+INSTRUCTIONS = 'Beat the eggs. Fold in the flour. Pour the mixture.'
+
+
+class TestRecipeParser(unittest.TestCase):
+
+    ureg = pint.UnitRegistry()
+
+    def setUp(self):
+        nlp = spacy.blank('en')
+        nlp.add_pipe('sentencizer')
+        self.ingredients = [
+            Ingredient(self.ureg.Quantity(amount, unit), name, id_,
+                       self.ureg, nlp)
+            for id_, (amount, unit, name) in enumerate(
+                [(2, None, 'eggs'), (1, 'cup', 'flour')])]
+
+    @staticmethod
+    def annotate(text):
+        """Stand in for the instructions pipeline."""
+        assert text == INSTRUCTIONS
+        return Doc(
+            spacy.blank('en').vocab, words=WORDS, spaces=SPACES, tags=TAGS,
+            heads=HEADS, deps=DEPS, lemmas=LEMMAS)
+
+    def parser(self, **kwargs):
+        return RecipeParser(self.ureg, self.annotate, **kwargs)
+
+    def test_iter_steps(self):
+        eggs, flour = self.ingredients
+        parser = self.parser()
+        steps = parser.iter_steps(self.ingredients, INSTRUCTIONS)
+        first = next(steps)
+        # the recipe is only built once every step is out
+        self.assertIsNone(parser.recipe)
+        rest = list(steps)
+        self.assertEqual(1, len(rest))
+        second = rest[0]
+        self.assertEqual([2, 3], [first.id, second.id])
+        self.assertEqual('Beat the eggs.', first.span.text)
+        self.assertEqual('Fold in the flour.', second.span.text)
+        self.assertEqual({eggs}, first.parents)
+        # 'Fold' has no direct object, so it continues the previous step
+        self.assertEqual({first, flour}, second.parents)
+        self.assertEqual([first, second], parser.recipe.graph)
+
+    def test_parse_matches_iter_steps(self):
+        streamed = list(
+            self.parser().iter_steps(self.ingredients, INSTRUCTIONS))
+        recipe = self.parser().parse(self.ingredients, INSTRUCTIONS)
+
+        def describe(step):
+            return (step.id, step.span.text, sorted(
+                parent.id for parent in step.parents))
+
+        self.assertEqual(
+            [describe(step) for step in streamed],
+            [describe(step) for step in recipe.graph])
+
+    def test_recipe(self):
+        recipe = self.parser().parse(self.ingredients, INSTRUCTIONS)
+        self.assertIs(self.ingredients, recipe.ingredients)
+        self.assertEqual(INSTRUCTIONS, recipe.orig_instructions)
+        self.assertIsNone(recipe.orig_ingredients)
+        self.assertEqual(INSTRUCTIONS, recipe.document.text)
+        payload = recipe.as_dict()
+        self.assertEqual(WORDS, payload['full_text'])
+        self.assertEqual([0, 1, 2, 3], list(payload['nodes']))
+
+    def test_similarity_is_lazy(self):
+        parser = self.parser()
+        recipe = parser.parse(self.ingredients, INSTRUCTIONS)
+        self.assertIsNone(parser._similarity)
+        # 'mixture' matches no ingredient by name
+        self.assertEqual(2, len(recipe.graph))
+
+    def test_similarity_threshold(self):
+        parser = self.parser(similarity_threshold=0)
+        recipe = parser.parse(self.ingredients, INSTRUCTIONS)
+        # blank vectors score 0 against every step, so the first wins
+        first, second, third = recipe.graph
+        self.assertEqual({first}, third.parents)
+        # steps after the index was built were added to it too
+        self.assertEqual(recipe.graph, parser.similarity.steps)
+
+
+if __name__ == '__main__':
+    unittest.main()
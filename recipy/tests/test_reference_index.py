@@ -0,0 +1,72 @@
+import unittest
+
+from recipy.reference_index import ReferenceIndex
+
+
+class FakeIngredient:
+
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeStep:
+
+    def __init__(self, ingredients):
+        self.ingredients = set(ingredients)
+
+
+class TestReferenceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.ingredients = [
+            FakeIngredient(name) for name in [
+                'orange bell pepper',
+                'black pepper',
+                'hot sauce',
+                'worcestershire sauce',
+                'shredded cheddar cheese'
+            ]
+        ]
+        self.index = ReferenceIndex(self.ingredients)
+
+    def best_matches(self, words):
+        return self.index.best_matches(words, words)
+
+    def test_best_ingredient(self):
+        orange, black, hot, worcestershire, cheddar = self.ingredients
+        self.assertEqual(self.best_matches(['orange', 'pepper']), [orange])
+        self.assertEqual(self.best_matches(['pepper']), [orange, black])
+        self.assertEqual(self.best_matches(['sauce']), [hot, worcestershire])
+        self.assertEqual(self.best_matches(['worcestershire']),
+                         [worcestershire])
+
+    def test_substring(self):
+        """Words only need to be substrings of the ingredient name."""
+        cheddar = self.ingredients[4]
+        self.assertEqual(self.best_matches(['shred']), [cheddar])
+        self.assertEqual(self.best_matches(['chees']), [cheddar])
+
+    def test_short_words(self):
+        self.assertEqual(self.best_matches(['or']), [])
+        self.assertEqual(self.best_matches(['flour']), [])
+
+    def test_steps(self):
+        orange, black, hot, worcestershire, cheddar = self.ingredients
+        first = FakeStep([orange, black])
+        second = FakeStep([hot])
+        self.index.add_step(first)
+        self.index.add_step(second)
+
+        # a step appears once for each of its matching ingredients
+        self.assertEqual(self.best_matches(['pepper']),
+                         [orange, black, first, first])
+        self.assertEqual(self.best_matches(['hot', 'sauce']), [hot, second])
+
+        # steps are scored with their own list of words
+        self.assertEqual(
+            self.index.best_matches(['sauce'], ['Sauce']),
+            [hot, worcestershire])
+
+
+if __name__ == '__main__':
+    unittest.main()
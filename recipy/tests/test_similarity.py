@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+from recipy.similarity import SimilarityIndex
+
+
+class FakeToken:
+
+    def __init__(self, vector):
+        self.vector = np.array(vector, dtype=np.float32)
+
+
+class FakeIngredient:
+
+    def __init__(self, id_, base, span):
+        self.id = id_
+        self.base = FakeToken(base)
+        self.span = FakeToken(span)
+
+
+class FakeStep:
+
+    def __init__(self, *ingredients):
+        self.ingredient_bits = 0
+        for ingredient in ingredients:
+            self.ingredient_bits |= 1 << ingredient.id
+
+
+class TestSimilarityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.ingredients = [
+            FakeIngredient(0, [1, 0, 0], [1, 1, 0]),
+            FakeIngredient(1, [0, 2, 0], [0, 1, 0]),
+            FakeIngredient(2, [0, 0, 3], [0, 0, 1]),
+            FakeIngredient(3, [0, 0, 0], [0, 0, 0])
+        ]
+        self.index = SimilarityIndex(self.ingredients)
+
+    def test_ingredient_scores(self):
+        np.testing.assert_allclose(
+            self.index.ingredient_scores(FakeToken([0, 5, 0])),
+            [0, 1, 0, 0])
+        np.testing.assert_allclose(
+            self.index.ingredient_scores(FakeToken([0, 5, 0]), 'span'),
+            [2 ** -0.5, 1, 0, 0], rtol=1e-6)
+        np.testing.assert_allclose(
+            self.index.ingredient_scores(FakeToken([0, 0, 0])),
+            [0, 0, 0, 0])
+
+    def test_step_scores(self):
+        first, second, third, empty = self.ingredients
+        for step in [FakeStep(first), FakeStep(second, third), FakeStep()]:
+            self.index.add_step(step)
+        np.testing.assert_allclose(
+            self.index.step_scores(FakeToken([1, 0, 1])),
+            [2 ** -0.5, 2 ** -0.5, -np.inf], rtol=1e-6)
+
+    def test_best_step(self):
+        first, second, third, empty = self.ingredients
+        token = FakeToken([0, 1, 0])
+        self.assertIsNone(self.index.best_step(token, 0.7))
+        steps = [FakeStep(first), FakeStep(first, second), FakeStep(third)]
+        for step in steps:
+            self.index.add_step(step)
+        self.assertIs(self.index.best_step(token, 0.7), steps[1])
+        self.assertIsNone(self.index.best_step(FakeToken([1, 1, 1]), 0.7))
+
+    def test_grows(self):
+        steps = [FakeStep(self.ingredients[i % 3]) for i in range(20)]
+        for step in steps:
+            self.index.add_step(step)
+        self.assertIs(
+            self.index.best_step(FakeToken([0, 0, 1]), 0.7), steps[2])
+        self.assertEqual(len(self.index.step_scores(FakeToken([1, 0, 0]))), 20)
+
+    def test_no_ingredients(self):
+        index = SimilarityIndex([])
+        index.add_step(FakeStep())
+        self.assertIsNone(index.best_step(FakeToken([1, 0, 0]), 0.7))
+
+
+if __name__ == '__main__':
+    unittest.main()
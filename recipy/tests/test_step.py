@@ -0,0 +1,61 @@
+import unittest
+
+import spacy
+
+from recipy.ingredient import Ingredient
+from recipy.recipe_parser import Match
+from recipy.step import IngredientSet, Step
+
+
+class TestStep(unittest.TestCase):
+
+    def setUp(self):
+        nlp = spacy.blank('en')
+        nlp.add_pipe('sentencizer')
+        self.nlp = nlp
+        self.ingredients = [
+            Ingredient(1, name, id_, None, nlp)
+            for id_, name in enumerate(['flour', 'onion', 'butter', 'thyme'])]
+        self.span = nlp('Cook it.')[:]
+
+    def step(self, id_, *parents):
+        matches = [Match([], parent, 'dobj') for parent in parents]
+        return Step(id_, self.span, 0, matches, self.ingredients)
+
+    def test_ingredients_from_parents(self):
+        flour, onion, butter, thyme = self.ingredients
+        first = self.step(4, onion, butter)
+        second = self.step(5, first, flour)
+        third = self.step(6, thyme)
+        last = self.step(7, second, third)
+
+        self.assertEqual(first.ingredients, {onion, butter})
+        self.assertEqual(second.ingredients, {flour, onion, butter})
+        self.assertEqual(last.ingredients, set(self.ingredients))
+        self.assertEqual(list(second.ingredients), [flour, onion, butter])
+        self.assertEqual(len(second.ingredients), 3)
+        self.assertTrue(second.includes(flour))
+        self.assertFalse(second.includes(thyme))
+
+    def test_ingredient_set(self):
+        flour, onion, butter, thyme = self.ingredients
+        ingredients = IngredientSet(0b0101, self.ingredients)
+        self.assertIn(flour, ingredients)
+        self.assertNotIn(onion, ingredients)
+        self.assertNotIn(self.span, ingredients)
+        # same id, but from another recipe
+        other = Ingredient(1, 'flour', 0, None, self.nlp)
+        self.assertNotIn(other, ingredients)
+        self.assertEqual(ingredients | {onion}, {flour, onion, butter})
+        self.assertEqual(ingredients & {butter, thyme}, {butter})
+        self.assertEqual(IngredientSet(0, self.ingredients), set())
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.ingredients[0].color = 'white'
+        with self.assertRaises(AttributeError):
+            self.step(4, self.ingredients[0]).color = 'white'
+
+
+if __name__ == '__main__':
+    unittest.main()
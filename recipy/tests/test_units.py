@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import pint
+
+from recipy.units import COUNT, MASS, OTHER, VOLUME, UnitCodes, UnitResolver
+
+
+class TestUnitResolver(unittest.TestCase):
+
+    ureg = pint.UnitRegistry()
+
+    def test_resolve(self):
+        resolver = UnitResolver(self.ureg)
+        cases = {
+            'cup': 'cup',
+            'cups': 'cup',
+            'grams': 'gram',
+            'tbsp.': 'tablespoon',
+            'Tbsp': 'tablespoon',
+            'T': 'tablespoon',
+            't': 'teaspoon',
+            'tsp': 'teaspoon',
+            'c.': 'cup',
+            'oz': 'ounce'
+        }
+        for word, unit in cases.items():
+            self.assertEqual(unit, str(resolver.resolve(word)), word)
+
+    def test_not_a_unit(self):
+        resolver = UnitResolver(self.ureg)
+        for word in ['flour', 'large', 'cloves', 'pkg', 'packet', '-1',
+                     '(optional)', 'to']:
+            self.assertIsNone(resolver.resolve(word), word)
+
+    def test_cache(self):
+        resolver = UnitResolver(self.ureg, maxsize=2)
+        resolver.resolve('cups')
+        resolver.resolve('flour')
+        resolver.resolve('cups')
+        resolver.resolve('flour')
+        info = resolver.cache_info()
+        self.assertEqual((2, 2), (info.hits, info.misses))
+
+        resolver.resolve('sugar')  # evicts 'cups'
+        resolver.resolve('cups')
+        self.assertEqual(4, resolver.cache_info().misses)
+
+
+class TestUnitCodes(unittest.TestCase):
+
+    ureg = pint.UnitRegistry()
+
+    def test_codes(self):
+        codes = UnitCodes(self.ureg)
+        cup = codes.code(self.ureg.Unit('cup'))
+        self.assertEqual(cup, codes.code(self.ureg.Unit('cup')))
+        self.assertEqual(0, codes.code(None))
+        gram = codes.code(self.ureg.Unit('gram'))
+        inch = codes.code(self.ureg.Unit('inch'))
+        dimensionless = codes.code(self.ureg.Quantity(2).units)
+        self.assertEqual(
+            [VOLUME, MASS, OTHER, COUNT],
+            list(codes.dimensions[[cup, gram, inch, dimensionless]]))
+        self.assertAlmostEqual(236.588, codes.factors[cup], places=3)
+
+    def test_to_base(self):
+        codes = UnitCodes(self.ureg)
+        magnitudes, unit_codes = codes.encode([
+            self.ureg.Quantity(2, 'tablespoon'),
+            self.ureg.Quantity(1, 'pound'),
+            self.ureg.Quantity(3)
+        ])
+        amounts, dimensions = codes.to_base(magnitudes, unit_codes)
+        np.testing.assert_allclose(amounts, [29.5735, 453.592, 3], rtol=1e-5)
+        self.assertEqual([VOLUME, MASS, COUNT], list(dimensions))
+
+    def test_conversion_matrix(self):
+        codes = UnitCodes(self.ureg)
+        cup = codes.code(self.ureg.Unit('cup'))
+        teaspoon = codes.code(self.ureg.Unit('teaspoon'))
+        gram = codes.code(self.ureg.Unit('gram'))
+        matrix = codes.conversion_matrix()
+        self.assertAlmostEqual(48, matrix[cup, teaspoon])
+        self.assertTrue(np.isnan(matrix[cup, gram]))
+
+
+if __name__ == '__main__':
+    unittest.main()
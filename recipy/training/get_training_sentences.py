@@ -1,11 +1,22 @@
+import recipy.fetch
+import recipy.http_cache
 import recipy.scraper
 import spacy
 import argparse
 
 parser = argparse.ArgumentParser()
 parser.add_argument('path')
+parser.add_argument(
+    '--cache-dir', help='keep downloaded pages here, to reuse between runs')
+parser.add_argument(
+    '--offline', action='store_true',
+    help='only use pages that are already in the cache')
 args = parser.parse_args()
 
+if args.cache_dir:
+    recipy.fetch.set_cache(recipy.http_cache.ResponseCache(
+        args.cache_dir, offline=args.offline))
+
 nlp = spacy.load('en_core_web_lg')
 output_sentence_path = 'training_sentences'
 
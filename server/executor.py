@@ -0,0 +1,49 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Overloaded(Exception):
+    """Raised when a BoundedExecutor already has as much work as it takes."""
+
+
+class BoundedExecutor:
+
+    def __init__(self, max_workers=4, max_queue=16):
+        """Run blocking work on a thread pool with a bounded backlog.
+
+        Work is turned away instead of queueing without limit, so a burst
+        of requests fails fast rather than making every request slow.
+
+        Args:
+            max_workers (int): number of threads doing work at once
+            max_queue (int): number of jobs that can wait for a thread
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pool = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='recipy-parse')
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    async def run(self, function, *args):
+        """Run function(*args) on the pool and wait for the result.
+
+        Raises:
+            Overloaded: if max_workers + max_queue jobs are already running
+                or waiting
+        """
+        with self.lock:
+            if self.in_flight >= self.max_workers + self.max_queue:
+                raise Overloaded(
+                    f'{self.in_flight} jobs are already running or queued')
+            self.in_flight += 1
+        future = self.pool.submit(function, *args)
+        # a job is only done when its thread is, even if the caller
+        # stopped waiting for it
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self.lock:
+            self.in_flight -= 1
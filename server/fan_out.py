@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+
+from recipy.fetch import FetchError
+from recipy.scraper import BAD_DOMAINS, SITE_SCRAPERS
+
+from .executor import Overloaded
+
+
+logger = logging.getLogger(__name__)
+
+
+def domain_of(url):
+    # get what's between the second and third slashes, like the scraper
+    parts = url.split('/')
+    return parts[2].lower() if len(parts) > 2 else ''
+
+
+def prioritize_urls(urls, recipe_domains=()):
+    """Order URLs by how likely they are to have a recipe we can scrape.
+
+    Domains with a site scraper come first, then domains that had a recipe
+    before (through JSON-LD or a template), then the rest. Search order is
+    kept within each group, and domains known not to have recipes are
+    dropped.
+
+    Args:
+        urls (list[string]): search results, in order
+        recipe_domains (set[string]): domains that had a recipe before
+
+    Returns:
+        list[string]
+    """
+    def priority(url):
+        domain = domain_of(url)
+        if domain in SITE_SCRAPERS:
+            return 0
+        if domain in recipe_domains:
+            return 1
+        return 2
+
+    return sorted(
+        (url for url in urls if domain_of(url) not in BAD_DOMAINS),
+        key=priority)
+
+
+async def fan_out(fetcher, executor, urls, work, count=None, deadline=None,
+                  width=4):
+    """Fetch URLs concurrently and process each page as soon as it arrives.
+
+    Stops as soon as count results are ready, or the deadline passes, and
+    cancels whatever is still running.
+
+    Args:
+        fetcher (fetch.Fetcher): downloads the pages
+        executor (BoundedExecutor): runs work off the event loop
+        urls (list[string]): URLs to try, most promising first. Downloads
+            start in this order.
+        work (function): called with each fetch.Response on the executor.
+            Returns a result, or None if the page had nothing useful. If it
+            raises, the error is logged and the page counts as None.
+        count (int): number of results to stop at. None waits for all.
+        deadline (float): seconds to wait at most. None waits for all.
+        width (int): number of pages to download at once
+
+    Returns:
+        dict: result or None for each URL that finished, by URL, in the
+            order of urls
+
+    Raises:
+        asyncio.TimeoutError: if the deadline passed before any result
+        Overloaded: if there were no results and the executor turned
+            work away
+    """
+    downloads = asyncio.Semaphore(width)
+
+    async def process(url):
+        async with downloads:
+            try:
+                response = await fetcher.fetch(url)
+            except FetchError as error:
+                logger.warning('%s', error)
+                return None
+        return await executor.run(work, response)
+
+    tasks = {asyncio.create_task(process(url)): url for url in urls}
+    end = None if deadline is None else time.monotonic() + deadline
+    finished = {}
+    found = 0
+    overloaded = False
+    timed_out = False
+    pending = set(tasks)
+    try:
+        while pending and (count is None or found < count):
+            timeout = None if end is None else end - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                timed_out = True
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    result = task.result()
+                except Overloaded:
+                    overloaded = True
+                    result = None
+                # one broken page shouldn't fail the whole search
+                except Exception:
+                    logger.exception('Could not process %s', tasks[task])
+                    result = None
+                finished[tasks[task]] = result
+                if result is not None:
+                    found += 1
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+    if not found and timed_out:
+        raise asyncio.TimeoutError(
+            f'no result within the {deadline} s deadline')
+    if not found and overloaded:
+        raise Overloaded('no room to process any of the pages')
+    return {url: finished[url] for url in urls if url in finished}
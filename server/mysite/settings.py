@@ -81,6 +81,61 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# 'recipes' holds parsed recipes and search results. Swap in
+# django.core.cache.backends.filebased.FileBasedCache, with a directory as
+# LOCATION, to keep them across restarts and share them between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'recipes': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recipes',
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {
+            # once full, a third of the entries are evicted
+            'MAX_ENTRIES': 2000,
+            'CULL_FREQUENCY': 3,
+        },
+    }
+}
+
+# Threads that scrape and parse recipes for the async views, and how many
+# more jobs can wait for one before requests get a 503
+RECIPY_PARSE_WORKERS = 4
+RECIPY_PARSE_QUEUE = 16
+# seconds a search can spend fetching and parsing pages before a 504
+RECIPY_DEADLINE = 10
+# count calls and time per stage with recipy.instrumentation
+RECIPY_INSTRUMENT = False
+
+# recipy's tracing goes through the 'recipy' logger; set it to DEBUG to see
+# each clause and match as recipes are parsed. The views and fan_out log
+# under the name the app is installed as, 'recipedia'.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'recipy': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'recipedia': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,43 @@
+import json
+
+
+NDJSON = 'application/x-ndjson'
+EVENT_STREAM = 'text/event-stream'
+
+
+def stream_content_type(request):
+    """Pick the streaming format a client asked for.
+
+    Server-Sent Events are used if the 'format' parameter is 'sse' or the
+    client accepts text/event-stream, as EventSource does. Otherwise each
+    event is a line of newline-delimited JSON.
+
+    Args:
+        request (HttpRequest)
+
+    Returns:
+        string: NDJSON or EVENT_STREAM
+    """
+    requested = request.GET.get('format')
+    if requested == 'sse':
+        return EVENT_STREAM
+    if requested is None and EVENT_STREAM in request.headers.get('Accept', ''):
+        return EVENT_STREAM
+    return NDJSON
+
+
+def encode_event(event, data, content_type):
+    """Serialize one event of a stream.
+
+    Args:
+        event (string): name of the event, like 'ingredient' or 'step'
+        data: JSON-serializable payload of the event
+        content_type (string): NDJSON or EVENT_STREAM
+
+    Returns:
+        string: a line of NDJSON, like {"event": "step", "data": {...}}, or
+            an SSE event with an event and a data field
+    """
+    if content_type == EVENT_STREAM:
+        return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+    return json.dumps({'event': event, 'data': data}) + '\n'
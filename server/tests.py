@@ -1,3 +1,386 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase
+
+from recipy.fetch import FetchError
+
+from . import views
+from .executor import BoundedExecutor, Overloaded
+from .fan_out import fan_out, prioritize_urls
+from .streaming import (
+    EVENT_STREAM, NDJSON, encode_event, stream_content_type)
+
+
+class FakeFetcher:
+    """Returns each URL as its own response, after a delay.
+
+    URLs containing 'slow' take a second, and URLs containing 'missing'
+    fail to download.
+    """
+
+    def __init__(self):
+        self.fetched = []
+        self.cancelled = []
+
+    async def fetch(self, url):
+        self.fetched.append(url)
+        if 'missing' in url:
+            raise FetchError(f'could not download {url}')
+        try:
+            await asyncio.sleep(1 if 'slow' in url else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled.append(url)
+            raise
+        return url
+
+
+def work(response):
+    """Find a 'recipe' in a FakeFetcher response."""
+    if 'broken' in response:
+        raise AttributeError(f'{response} has no recipe container')
+    if 'none' in response:
+        return None
+    return response.upper()
+
+
+class TestFanOut(SimpleTestCase):
+
+    def setUp(self):
+        self.fetcher = FakeFetcher()
+        self.executor = BoundedExecutor(max_workers=2, max_queue=4)
+
+    def run_fan_out(self, urls, work=work, **kwargs):
+        return asyncio.run(
+            fan_out(self.fetcher, self.executor, urls, work, **kwargs))
+
+    def test_all(self):
+        with self.assertLogs(fan_out.__module__, 'WARNING'):
+            results = self.run_fan_out(['a', 'none', 'missing', 'b'])
+        self.assertEqual(
+            {'a': 'A', 'none': None, 'missing': None, 'b': 'B'}, results)
+        self.assertEqual(['a', 'none', 'missing', 'b'], list(results))
+
+    def test_count(self):
+        results = self.run_fan_out(['slow', 'none', 'a', 'b'], count=1)
+        self.assertEqual('A', results['a'])
+        self.assertNotIn('slow', results)
+        self.assertEqual(['slow'], self.fetcher.cancelled)
+
+    def test_deadline(self):
+        results = self.run_fan_out(['slow', 'a'], deadline=0.2)
+        self.assertEqual({'a': 'A'}, results)
+        self.assertEqual(['slow'], self.fetcher.cancelled)
+
+    def test_deadline_without_results(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_fan_out(['slow', 'none'], deadline=0.2)
+
+    def test_failing_worker(self):
+        with self.assertLogs(fan_out.__module__, 'ERROR'):
+            results = self.run_fan_out(['broken', 'good'], count=1)
+        self.assertEqual({'broken': None, 'good': 'GOOD'}, results)
+
+    def test_overloaded(self):
+        self.executor = BoundedExecutor(max_workers=1, max_queue=0)
+        release = threading.Event()
+
+        def blocking_work(response):
+            release.wait(5)
+            return None
+
+        async def run():
+            task = asyncio.ensure_future(
+                fan_out(self.fetcher, self.executor, ['a', 'b', 'c'],
+                        blocking_work))
+            await asyncio.sleep(0.1)
+            release.set()
+            return await task
+
+        with self.assertRaises(Overloaded):
+            asyncio.run(run())
+        self.assertEqual(0, self.executor.in_flight)
+
+    def test_prioritize_urls(self):
+        urls = [
+            'https://example.com/cake',
+            'https://www.yummly.com/recipe/cake',
+            'https://blog.example.org/cake',
+            'https://www.allrecipes.com/recipe/1/cake']
+        self.assertEqual([
+            'https://www.allrecipes.com/recipe/1/cake',
+            'https://blog.example.org/cake',
+            'https://example.com/cake'],
+            prioritize_urls(urls, {'blog.example.org'}))
+
+
+class TestStreaming(SimpleTestCase):
+
+    def test_stream_content_type(self):
+        factory = RequestFactory()
+        self.assertEqual(NDJSON, stream_content_type(factory.get('/')))
+        self.assertEqual(
+            EVENT_STREAM, stream_content_type(factory.get('/?format=sse')))
+        self.assertEqual(EVENT_STREAM, stream_content_type(
+            factory.get('/', HTTP_ACCEPT='text/event-stream')))
+        # an explicit format wins over the Accept header
+        self.assertEqual(NDJSON, stream_content_type(
+            factory.get('/?format=ndjson', HTTP_ACCEPT='text/event-stream')))
+
+    def test_encode_event(self):
+        self.assertEqual(
+            'event: step\ndata: {"id": 1}\n\n',
+            encode_event('step', {'id': 1}, EVENT_STREAM))
+        line = encode_event('step', {'id': 1}, NDJSON)
+        self.assertTrue(line.endswith('\n'))
+        self.assertEqual(
+            {'event': 'step', 'data': {'id': 1}}, json.loads(line))
+
+
+class FakeNode:
+
+    def __init__(self, id_):
+        self.id = id_
+
+    def as_dict(self):
+        return {'id': self.id}
+
+
+class FakeRecipe:
+
+    def __init__(self):
+        self.ingredients = [FakeNode('ingredient0')]
+        self.graph = [FakeNode('step0')]
+
+    def as_dict(self):
+        return {'nodes': {}, 'full_text': ['Beat']}
+
+
+class FakeText:
+
+    text = 'Beat'
+
+
+class FakeRecipy:
+    """Yields the events of Recipy.iter_parse, failing after 'fail_after'
+    events if it's set."""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+
+    def parse(self, ingredients, instructions):
+        return FakeRecipe()
+
+    def iter_parse(self, ingredients, instructions):
+        events = [
+            ('ingredient', FakeNode(0)),
+            ('instructions', [FakeText()]),
+            ('step', FakeNode(1)),
+            ('recipe', FakeRecipe())]
+        for count, event in enumerate(events):
+            if count == self.fail_after:
+                raise ValueError('no verb in step')
+            yield event
+
+
+class TestRecipeEvents(SimpleTestCase):
+
+    url = 'https://example.com/omelette'
+
+    def setUp(self):
+        caches[views.RECIPE_CACHE].clear()
+        # skips fetching and scraping
+        patcher = mock.patch.object(
+            views, 'run_with_fetcher',
+            return_value={self.url: (['2 eggs'], 'Beat the eggs.')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def events(self, recipy):
+        return list(views.recipe_events(self.url, recipy))
+
+    def test_order(self):
+        self.assertEqual([
+            ('ingredient', {'id': 0}),
+            ('instructions', {'full_text': ['Beat']}),
+            ('step', {'id': 1}),
+            ('recipe', {'nodes': {}, 'full_text': ['Beat']})],
+            self.events(FakeRecipy()))
+        # the second time, the recipe comes from the cache
+        self.assertEqual(
+            [('recipe', {'nodes': {}, 'full_text': ['Beat']})],
+            self.events(FakeRecipy()))
+
+    def test_parse_error(self):
+        with self.assertLogs(views.__name__, 'ERROR'):
+            events = self.events(FakeRecipy(fail_after=2))
+        self.assertEqual([
+            ('ingredient', {'id': 0}),
+            ('instructions', {'full_text': ['Beat']}),
+            ('error', {'error': 'Could not parse the recipe', 'status': 500})],
+            events)
+        self.assertIsNone(caches[views.RECIPE_CACHE].get(
+            views.recipe_cache_key(self.url, 'nodes')))
+
+    def test_stream_recipe(self):
+        request = RequestFactory().get(
+            '/stream', {'query': self.url, 'format': 'sse'})
+        with mock.patch.object(views, 'recipy', FakeRecipy()):
+            response = views.stream_recipe(request)
+            content = b''.join(response.streaming_content).decode()
+        self.assertEqual(EVENT_STREAM, response['Content-Type'])
+        self.assertEqual(
+            ['ingredient', 'instructions', 'step', 'recipe'],
+            [line[len('event: '):] for line in content.splitlines()
+             if line.startswith('event: ')])
+
+
+def scrape(response):
+    """Scrape a FakeFetcher response, finding a recipe unless the URL
+    contains 'none'."""
+    if 'none' in response:
+        return None
+    return ['2 eggs'], 'Beat the eggs.'
+
+
+class TestRecipeCache(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = caches[views.RECIPE_CACHE]
+        self.cache.clear()
+        self.fetcher = FakeFetcher()
+        for name, value in [
+                ('run_with_fetcher',
+                 lambda function: asyncio.run(function(self.fetcher))),
+                ('recipy', FakeRecipy()),
+                ('scrape_recipe_response', scrape)]:
+            patcher = mock.patch.object(views, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_payload(self, urls):
+        return views.get_recipe_payload(
+            urls, views.recipy, 'graph', views.graph_payload)
+
+    def test_cache_hit(self):
+        urls = ['https://example.com/a']
+        payload = self.get_payload(urls)
+        self.assertEqual(['ingredient0'], payload['ingredients'])
+        self.assertEqual(payload, self.get_payload(urls))
+        # equivalent URLs share an entry
+        self.assertEqual(
+            payload, self.get_payload(['https://EXAMPLE.com/a#comments']))
+        self.assertEqual(urls, self.fetcher.fetched)
+
+    def test_no_recipe(self):
+        url = 'https://example.com/none'
+        with mock.patch.object(
+                self.cache, 'set_many', wraps=self.cache.set_many) as set_many:
+            self.assertIsNone(self.get_payload([url]))
+        key = views.recipe_cache_key(url, 'graph')
+        set_many.assert_any_call(
+            {key: views.NO_RECIPE}, timeout=views.NO_RECIPE_TIMEOUT)
+        self.assertIs(views.NO_RECIPE, self.cache.get(key))
+        # only the URL that wasn't tried yet is fetched
+        self.assertEqual(
+            ['ingredient0'],
+            self.get_payload([url, 'https://example.com/a'])['ingredients'])
+        self.assertEqual(
+            [url, 'https://example.com/a'], self.fetcher.fetched)
+
+    def test_known_recipe_domains(self):
+        self.get_payload(['https://example.com/a'])
+        self.assertEqual(
+            {'example.com'},
+            views.known_recipe_domains(
+                ['https://example.com/b', 'https://example.org/b']))
+
+    def test_recipe_cache_key(self):
+        url = 'https://example.com/a'
+        key = views.recipe_cache_key(url, 'graph')
+        self.assertNotEqual(key, views.recipe_cache_key(url, 'nodes'))
+        with mock.patch.object(views.recipy_package, '__version__', '0.0.0'):
+            self.assertNotEqual(key, views.recipe_cache_key(url, 'graph'))
+
+    def test_cached_search(self):
+        urls = ['https://example.com/a']
+        with mock.patch.object(views, 'search', return_value=urls) as search:
+            self.assertEqual(urls, views.cached_search('Apple  pie'))
+            self.assertEqual(urls, views.cached_search('apple pie'))
+            self.assertEqual(urls, views.cached_search('cherry pie'))
+        self.assertEqual(
+            [mock.call('Apple  pie'), mock.call('cherry pie')],
+            search.call_args_list)
+
+    def test_find_and_parse_recipes(self):
+        response = views.find_and_parse_recipes(RequestFactory().get(
+            '/search', {'query': 'https://example.com/a'}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            ['ingredient0', 'step0'],
+            list(json.loads(response.content)['graph']))
+
+
+class TestAsyncSearch(SimpleTestCase):
+
+    def setUp(self):
+        caches[views.RECIPE_CACHE].clear()
+        fetcher = FakeFetcher()
+
+        async def get_fetcher():
+            return fetcher
+
+        for name, value in [
+                ('get_fetcher', get_fetcher),
+                ('recipy', FakeRecipy()),
+                ('scrape_recipe_response', scrape)]:
+            patcher = mock.patch.object(views, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get(self, view, query):
+        return view(RequestFactory().get('/async/search', {'query': query}))
+
+    async def test_graph_payload(self):
+        response = await self.get(
+            views.find_and_parse_recipes_async, 'https://example.com/a')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({
+            'ingredients': ['ingredient0'],
+            'steps': ['step0'],
+            'graph': {
+                'ingredient0': {'id': 'ingredient0'},
+                'step0': {'id': 'step0'}}},
+            json.loads(response.content))
+        self.assertEqual('*', response['Access-Control-Allow-Origin'])
+
+    async def test_nodes_payload(self):
+        response = await self.get(
+            views.find_and_parse_recipes2_async, 'https://example.com/a')
+        self.assertEqual(
+            {'nodes': {}, 'full_text': ['Beat']},
+            json.loads(response.content))
+
+    async def test_no_recipe(self):
+        response = await self.get(
+            views.find_and_parse_recipes2_async, 'https://example.com/none')
+        self.assertEqual(404, response.status_code)
+
+    async def test_overloaded(self):
+        executor = BoundedExecutor(max_workers=1, max_queue=0)
+        release = threading.Event()
+        busy = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0)
+        try:
+            with mock.patch.object(views, 'executor', executor):
+                response = await self.get(
+                    views.find_and_parse_recipes2_async,
+                    'https://example.com/a')
+        finally:
+            release.set()
+            await busy
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(str(views.RETRY_AFTER), response['Retry-After'])
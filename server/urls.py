@@ -6,5 +6,10 @@ from . import views
 urlpatterns = [
     path('', views.index, name='index'),
     path('search', views.find_and_parse_recipes2, name='search'),
-    path('search2', views.find_and_parse_recipes, name='search2')
+    path('search2', views.find_and_parse_recipes, name='search2'),
+    path('stream', views.stream_recipe, name='stream'),
+    path('async/search', views.find_and_parse_recipes2_async,
+         name='async_search'),
+    path('async/search2', views.find_and_parse_recipes_async,
+         name='async_search2')
 ]
\ No newline at end of file
@@ -1,10 +1,57 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import weakref
+
 import requests
-from django.http import HttpResponse, JsonResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+import recipy as recipy_package
+from recipy import instrumentation
+from recipy.fetch import Fetcher, run_with_fetcher
+from recipy.http_cache import normalize_url
+from recipy.recipy import Recipy
+from recipy.scraper import scrape_recipe_response
+
+from .executor import BoundedExecutor, Overloaded
+from .fan_out import domain_of, fan_out, prioritize_urls
+from .streaming import encode_event, stream_content_type
+
+
+logger = logging.getLogger(__name__)
 
-from .recipe_parser import RecipeParser
+if getattr(settings, 'RECIPY_INSTRUMENT', False):
+    instrumentation.enable()
 
+# loads the spacy model the first time a recipe is parsed
+recipy = Recipy()
 
-parser = RecipeParser()
+# runs scraping and parsing for the async views, off the event loop
+executor = BoundedExecutor(
+    getattr(settings, 'RECIPY_PARSE_WORKERS', 4),
+    getattr(settings, 'RECIPY_PARSE_QUEUE', 16))
+# seconds an overloaded client is asked to wait before trying again
+RETRY_AFTER = 5
+# seconds a search request can spend fetching and parsing pages
+DEADLINE = getattr(settings, 'RECIPY_DEADLINE', 10)
+
+# one Fetcher per event loop, since its connections belong to the loop
+_fetchers = weakref.WeakKeyDictionary()
+
+# name of the entry in settings.CACHES that holds parsed recipes
+RECIPE_CACHE = 'recipes'
+# cached for URLs without a recipe. False survives pickling by file and
+# database backends, unlike a sentinel object.
+NO_RECIPE = False
+# seconds to remember that a URL had no recipe. This is shorter than the
+# cache's TIMEOUT because the page may only have failed to download.
+NO_RECIPE_TIMEOUT = 10 * 60
+# seconds to keep preferring a domain after it had a recipe
+RECIPE_DOMAIN_TIMEOUT = 30 * 24 * 60 * 60
 
 ACCESS_CONTROL_HEADERS = {
     'Access-Control-Allow-Origin': '*',
@@ -19,44 +66,88 @@ def index(request):
 
 
 def find_and_parse_recipes(request):
-    print(request)
-    print(request.GET)
+    logger.debug('%s %s', request, request.GET)
 
     query = request.GET['query']
     if query.startswith('http'):
         urls = [query]
     else:
-        urls = search(query)
+        urls = cached_search(query)
 
-    recipe = get_recipes(urls, parser)[0]
+    try:
+        payload = get_recipe_payload(urls, recipy, 'graph', graph_payload)
+    except (asyncio.TimeoutError, Overloaded) as error:
+        return error_response(error)
+    if payload is None:
+        return JsonResponse({'error': 'No recipe found'}, status=404)
 
     response = JsonResponse({
-        'ingredients': [node.id for node in recipe.ingredients],
-        'steps': [node.id for node in recipe.graph],
-        'extras': [extra.id for extra in recipe.extra_info],
-        'graph': {node.id: node.as_dict() for node in recipe.ingredients + recipe.graph + recipe.extra_info},
+        **payload,
         **ACCESS_CONTROL_HEADERS
     })
 
     return response
 
 
+def error_response(error):
+    """Respond to a search that couldn't finish.
+
+    Args:
+        error (asyncio.TimeoutError or Overloaded): why it stopped
+
+    Returns:
+        JsonResponse: a 504 if no recipe was ready before DEADLINE, or a 503
+            if the executor has no room for more work
+    """
+    status, message = error_status(error)
+    response = JsonResponse({'error': message}, status=status)
+    if status == 503:
+        response['Retry-After'] = str(RETRY_AFTER)
+    for header, value in ACCESS_CONTROL_HEADERS.items():
+        response[header] = value
+    return response
+
+
+def error_status(error):
+    """Get the HTTP status and message for a search that couldn't finish."""
+    if isinstance(error, Overloaded):
+        return 503, 'Server is busy, try again later'
+    return 504, 'No recipe found in time'
+
+
+def graph_payload(recipe):
+    """Serialize a Recipe for find_and_parse_recipes."""
+    return {
+        'ingredients': [node.id for node in recipe.ingredients],
+        'steps': [node.id for node in recipe.graph],
+        'graph': {
+            node.id: node.as_dict()
+            for node in recipe.ingredients + recipe.graph},
+    }
+
+
+def nodes_payload(recipe):
+    """Serialize a Recipe for find_and_parse_recipes2."""
+    return recipe.as_dict()
+
+
 def find_and_parse_recipes2(request):
-    print(request)
-    print(request.GET)
+    logger.debug('%s %s', request, request.GET)
 
     query = request.GET['query']
     if query.startswith('http'):
         urls = [query]
     else:
-        urls = search(query)
+        urls = cached_search(query)
 
-    recipe = get_recipes(urls, parser)[0]
+    try:
+        payload = get_recipe_payload(urls, recipy, 'nodes', nodes_payload)
+    except (asyncio.TimeoutError, Overloaded) as error:
+        return error_response(error)
+    if payload is None:
+        return JsonResponse({'error': 'No recipe found'}, status=404)
 
-    response = JsonResponse({
-        'nodes': {node.id: node.as_dict() for node in recipe.ingredients + recipe.graph},
-        'full_text': [token.text for token in recipe.document],
-    })
+    response = JsonResponse(payload)
     response['Access-Control-Allow-Origin'] = '*'
     response['Access-Control-Allow-Methods'] = 'GET, OPTIONS',
     response['Access-Control-Max-Age'] = '1000',
@@ -64,6 +155,113 @@ def find_and_parse_recipes2(request):
     return response
 
 
+def stream_recipe(request):
+    """Stream a recipe as each part of it is parsed.
+
+    Each ingredient node is sent as soon as the ingredients are parsed, and
+    each step node as soon as it's resolved, so a client can show the
+    ingredients while the instructions are still being parsed. Events are
+    newline-delimited JSON, or Server-Sent Events if the client asks for
+    them with format=sse or an Accept: text/event-stream header.
+
+    Events, in order:
+        ingredient    Ingredient.as_dict(), for each ingredient
+        instructions  {'full_text': [...]}, the tokens that step indices
+                      refer to
+        step          Step.as_dict(), for each step
+        recipe        the finished recipe, as from find_and_parse_recipes2
+    or, instead of the rest of them, a single
+        error         {'error': message, 'status': HTTP status}
+
+    A cached recipe is sent as a single recipe event. An error can come
+    after some ingredients and steps if parsing fails partway, with status
+    500.
+
+    Args:
+        request (HttpRequest): with a 'query' parameter, either a URL or
+            search terms
+
+    Returns:
+        StreamingHttpResponse
+    """
+    query = request.GET['query']
+    content_type = stream_content_type(request)
+    events = (
+        encode_event(event, data, content_type)
+        for event, data in recipe_events(query, recipy))
+    response = StreamingHttpResponse(events, content_type=content_type)
+    response['Cache-Control'] = 'no-cache'
+    # keep proxies like nginx from holding events back until the end
+    response['X-Accel-Buffering'] = 'no'
+    for header, value in ACCESS_CONTROL_HEADERS.items():
+        response[header] = value
+    return response
+
+
+def recipe_events(query, recipy):
+    """Find a recipe and parse it, yielding each part as it's ready.
+
+    Pages are fetched and scraped through fan_out like the other views, but
+    the recipe is parsed right here, on the thread that writes the
+    response. Parsing is lazy, one event per next(), so running it on the
+    executor would keep a worker busy for as long as a slow client takes
+    to read the stream. The server's own worker threads bound these parses
+    instead.
+
+    Args:
+        query (string): a URL or search terms
+        recipy (Recipy): parses the recipe
+
+    Yields:
+        tuple: (event, data) pairs, as described in stream_recipe
+    """
+    urls = [query] if query.startswith('http') else cached_search(query)
+    cache = caches[RECIPE_CACHE]
+    keys = [recipe_cache_key(url, 'nodes') for url in urls]
+    payloads = cache.get_many(keys)
+    payload = first_payload(keys, payloads)
+    if payload is not None:
+        yield 'recipe', payload
+        return
+
+    pending = prioritize_urls(
+        pending_urls(urls, keys, payloads), known_recipe_domains(urls))
+    try:
+        results = run_with_fetcher(lambda fetcher: fan_out(
+            fetcher, executor, pending, scrape_recipe_response,
+            count=1, deadline=DEADLINE))
+    except (asyncio.TimeoutError, Overloaded) as error:
+        status, message = error_status(error)
+        yield 'error', {'error': message, 'status': status}
+        return
+    store_results(
+        cache, {url: None for url, scraped in results.items()
+                if scraped is None}, 'nodes')
+    found = [(url, scraped) for url, scraped in results.items()
+             if scraped is not None]
+    if not found:
+        yield 'error', {'error': 'No recipe found', 'status': 404}
+        return
+
+    url, (ingredients, instructions) = found[0]
+    # the headers are already sent, so a failure can only be reported as an
+    # event
+    try:
+        for event, value in recipy.iter_parse(ingredients, instructions):
+            if event == 'instructions':
+                yield event, {'full_text': [token.text for token in value]}
+            elif event == 'recipe':
+                with instrumentation.stage('serialization'):
+                    payload = nodes_payload(value)
+                store_results(cache, {url: payload}, 'nodes')
+                yield event, payload
+            else:
+                yield event, value.as_dict()
+    except Exception:
+        logger.exception('Could not parse the recipe at %s', url)
+        yield 'error', {'error': 'Could not parse the recipe', 'status': 500}
+
+
 def search(query, number=10):
     """Web search for a query.
 
@@ -89,19 +287,258 @@ def search(query, number=10):
     return urls
 
 
-def get_recipes(urls, parser):
+def cached_search(query):
+    """Web search for a query, reusing recent results for the same query.
+
+    Args:
+        query (string): term to search
+
+    Returns:
+        list of URL results
+    """
+    cache = caches[RECIPE_CACHE]
+    key = 'search:' + hashlib.sha256(
+        ' '.join(query.lower().split()).encode('utf-8')).hexdigest()
+    urls = cache.get(key)
+    if urls is None:
+        urls = search(query)
+        cache.set(key, urls)
+    return urls
+
+
+def recipe_cache_key(url, payload_format):
+    """Key of the cached payload for a URL.
+
+    Args:
+        url (string): URL of the recipe page
+        payload_format (string): which serialization of the recipe
+
+    Returns:
+        string: includes the recipy version, so upgrading the parser never
+            serves recipes that an older version parsed
+    """
+    digest = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+    return (
+        f'recipe:{recipy_package.__version__}:{payload_format}:{digest}')
+
+
+def get_recipe_payload(urls, recipy, payload_format, to_payload):
+    """Serialize a recipe found at one of a list of URLs, using the cache.
+
+    If no URL has a cached recipe, the others are fetched and parsed at
+    the same time, and the first recipe to be ready is used. Payloads, or
+    NO_RECIPE, are cached for each URL that finished.
+
+    Args:
+        urls (list[string]): URLs to look for a recipe at, in order
+        recipy (Recipy): parses the recipes that aren't cached
+        payload_format (string): name of the serialization, part of the key
+        to_payload (function): turns a Recipe into a JSON-serializable dict
+
+    Returns:
+        dict: payload of the recipe, or None if no URL had one
+
+    Raises:
+        asyncio.TimeoutError: if no recipe was ready before DEADLINE
+        Overloaded: if the executor has no room for the parsing work
+    """
+    cache = caches[RECIPE_CACHE]
+    keys = [recipe_cache_key(url, payload_format) for url in urls]
+    payloads = cache.get_many(keys)
+    payload = first_payload(keys, payloads)
+    if payload is not None:
+        return payload
+
+    pending = prioritize_urls(
+        pending_urls(urls, keys, payloads), known_recipe_domains(urls))
+    results = run_with_fetcher(lambda fetcher: fan_out(
+        fetcher, executor, pending,
+        functools.partial(parse_response, recipy=recipy,
+                          to_payload=to_payload),
+        count=1, deadline=DEADLINE))
+    return store_results(cache, results, payload_format)
+
+
+def pending_urls(urls, keys, payloads):
+    """List the URLs that have nothing cached.
+
+    Args:
+        urls (list[string]): URLs to look for a recipe at, in order
+        keys (list[string]): recipe_cache_key of each URL
+        payloads (dict): cached payloads by key
+
+    Returns:
+        list[string]: URLs that need scraping and parsing
+    """
+    return [url for url, key in zip(urls, keys) if key not in payloads]
+
+
+def known_recipe_domains(urls):
+    """Get the domains of urls that had a recipe before.
+
+    Args:
+        urls (list[string]): URLs about to be fetched
+
+    Returns:
+        set[string]
+    """
+    keys = {'domain:' + domain_of(url): domain_of(url) for url in urls}
+    return {keys[key] for key in caches[RECIPE_CACHE].get_many(keys)}
+
+
+def store_results(cache, results, payload_format):
+    """Cache the payload, or NO_RECIPE, of each URL that finished.
+
+    Domains that had a recipe are remembered, so they're fetched first
+    next time.
+
+    Args:
+        cache (BaseCache): the recipe cache
+        results (dict): payload, or None if there was no recipe, by URL
+        payload_format (string): name of the serialization
+
+    Returns:
+        dict: the first payload in results, or None
+    """
+    found, missing, domains = {}, {}, {}
+    for url, payload in results.items():
+        key = recipe_cache_key(url, payload_format)
+        if payload is None:
+            missing[key] = NO_RECIPE
+        else:
+            found[key] = payload
+            domains['domain:' + domain_of(url)] = True
+    cache.set_many(found)
+    cache.set_many(missing, timeout=NO_RECIPE_TIMEOUT)
+    cache.set_many(domains, timeout=RECIPE_DOMAIN_TIMEOUT)
+    return next(iter(found.values()), None)
+
+
+def first_payload(keys, payloads):
+    """Return the payload of the first key that has a recipe, or None."""
+    for key in keys:
+        if payloads.get(key, NO_RECIPE) is not NO_RECIPE:
+            return payloads[key]
+    return None
+
+
+def get_recipes(urls, recipy, count=None, deadline=None):
     """Turn a list of urls into a list of Recipe objects.
 
+    The pages are fetched at the same time, those with known scrapers
+    first, and each one is parsed as soon as it arrives.
+
     Args:
         urls (list[string]): list of urls to access
-        parser (RecipeParser): RecipeParser object that instantiates all
-            Recipes using the same spacy instance and pint unit registry.
+        recipy (Recipy): Recipy object that parses all Recipes using the
+            same spacy instance and pint unit registry.
+        count (int): stop once this many recipes are ready, and cancel the
+            rest. None parses every url.
+        deadline (float): seconds to wait at most. None waits for all.
+    Returns:
+        list[Recipe]: list of Recipe objects derived from the urls that
+            contained a recipe, in the order the urls were fetched.
+    """
+    results = run_with_fetcher(lambda fetcher: fan_out(
+        fetcher, executor, prioritize_urls(urls),
+        functools.partial(parse_response, recipy=recipy, to_payload=None),
+        count=count, deadline=deadline))
+    return [recipe for recipe in results.values() if recipe is not None]
+
+
+async def find_and_parse_recipes_async(request):
+    """Async version of find_and_parse_recipes."""
+    return await search_async(request, 'graph', graph_payload)
+
+
+async def find_and_parse_recipes2_async(request):
+    """Async version of find_and_parse_recipes2."""
+    return await search_async(request, 'nodes', nodes_payload)
+
+
+async def search_async(request, payload_format, to_payload):
+    """Find, parse and serialize a recipe without blocking the event loop.
+
+    Pages are downloaded concurrently on the event loop. Scraping and
+    parsing run on the bounded executor, so other requests keep being
+    served while one page is slow.
+
+    Args:
+        request (HttpRequest): with a 'query' parameter, either a URL or
+            search terms
+        payload_format (string): name of the serialization
+        to_payload (function): turns a Recipe into a JSON-serializable dict
+
     Returns:
-        list[Recipe]: list of Recipe objects derived from the urls.
+        JsonResponse: the payload, a 404 if no recipe was found, or an
+            error_response
     """
+    query = request.GET['query']
+    try:
+        if query.startswith('http'):
+            urls = [query]
+        else:
+            urls = await sync_to_async(cached_search)(query)
+        payload = await aget_recipe_payload(
+            urls, recipy, payload_format, to_payload)
+    except (asyncio.TimeoutError, Overloaded) as error:
+        return error_response(error)
+
+    if payload is None:
+        response = JsonResponse({'error': 'No recipe found'}, status=404)
+    else:
+        response = JsonResponse(payload)
+    for header, value in ACCESS_CONTROL_HEADERS.items():
+        response[header] = value
+    return response
+
+
+async def aget_recipe_payload(urls, recipy, payload_format, to_payload):
+    """Async version of get_recipe_payload."""
+    cache = caches[RECIPE_CACHE]
+    keys = [recipe_cache_key(url, payload_format) for url in urls]
+    payloads = await sync_to_async(cache.get_many)(keys)
+    payload = first_payload(keys, payloads)
+    if payload is not None:
+        return payload
 
-    recipes = []
+    pending = prioritize_urls(
+        pending_urls(urls, keys, payloads),
+        await sync_to_async(known_recipe_domains)(urls))
+    results = await fan_out(
+        await get_fetcher(), executor, pending,
+        functools.partial(parse_response, recipy=recipy,
+                          to_payload=to_payload),
+        count=1, deadline=DEADLINE)
+    return await sync_to_async(store_results)(cache, results, payload_format)
 
-    for url in urls:
-        recipes.append(parser.parse(url))
-    return recipes
+
+async def get_fetcher():
+    """Get the Fetcher for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _fetchers:
+        _fetchers[loop] = await Fetcher().open()
+    return _fetchers[loop]
+
+
+def parse_response(response, recipy, to_payload):
+    """Scrape, parse and serialize a downloaded page, on an executor thread.
+
+    Args:
+        response (fetch.Response): the page
+        recipy (Recipy): parses the recipe
+        to_payload (function): turns a Recipe into a JSON-serializable
+            dict. If None, the Recipe itself is returned.
+
+    Returns:
+        the payload, or None if there was no recipe
+    """
+    scraped = scrape_recipe_response(response)
+    if scraped is None:
+        return None
+    ingredients, instructions = scraped
+    recipe = recipy.parse(ingredients, instructions)
+    if to_payload is None:
+        return recipe
+    with instrumentation.stage('serialization'):
+        return to_payload(recipe)